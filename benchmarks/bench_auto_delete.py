@@ -0,0 +1,109 @@
+"""
+Auto-delete scheduler benchmark
+
+Memory held by pending file deletions: one sleeping task per file (the
+old AutoDeleteManager) against the single heap scheduler. Measured with
+tracemalloc on a fake bot. Standalone, no Telegram or MongoDB:
+
+    python benchmarks/bench_auto_delete.py
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.auto_delete import AutoDeleteManager
+
+SIZES = (1_000, 10_000, 50_000)
+USERS = 500
+DELETE_AFTER = 3600
+
+
+class FakeDB:
+    async def save_pending_deletions(self, entries):
+        return True
+
+    async def remove_pending_deletions(self, deletions):
+        return True
+
+
+class FakeBot:
+    def __init__(self):
+        self.db = FakeDB()
+
+    async def delete_messages(self, chat_id, message_ids):
+        return True
+
+
+def fake_message(user_id, message_id):
+    """What the old per-file task kept alive until it ran"""
+    return SimpleNamespace(
+        id=message_id,
+        chat=SimpleNamespace(id=user_id, type="private", first_name="User"),
+        document=SimpleNamespace(file_id=f"BQACAgQAAxkBAA{message_id}", file_unique_id=f"AgAD{message_id}",
+                                 file_name=f"Movie.{message_id}.mkv", file_size=1_500_000_000),
+        caption=f"File {message_id}"
+    )
+
+
+async def task_per_file(bot, size):
+    async def delete_later(message, delete_after):
+        await asyncio.sleep(delete_after)
+        await bot.delete_messages(message.chat.id, message.id)
+
+    tasks = []
+    for i in range(size):
+        tasks.append(asyncio.create_task(delete_later(fake_message(i % USERS, i), DELETE_AFTER)))
+    await asyncio.sleep(0)
+    return tasks
+
+
+async def heap_scheduler(bot, size):
+    manager = AutoDeleteManager(bot, persist_interval=DELETE_AFTER)
+    for i in range(size):
+        await manager.schedule_file_deletion(i % USERS, i, DELETE_AFTER)
+    await asyncio.sleep(0)
+    manager._unsaved.clear()
+    return manager
+
+
+async def measure(schedule, size):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = await schedule(FakeBot(), size)
+    seconds = time.perf_counter() - started
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    if isinstance(held, list):
+        for task in held:
+            task.cancel()
+        await asyncio.gather(*held, return_exceptions=True)
+    else:
+        await held.stop()
+    return memory, seconds
+
+
+async def main():
+    logging.disable(logging.INFO)
+    print(f"{'pending':>8}{'tasks MB':>10}{'heap MB':>9}{'saved':>8}{'tasks s':>9}{'heap s':>8}")
+    for size in SIZES:
+        task_memory, task_seconds = await measure(task_per_file, size)
+        heap_memory, heap_seconds = await measure(heap_scheduler, size)
+        print(
+            f"{size:>8}{task_memory / 2**20:>10.1f}{heap_memory / 2**20:>9.1f}"
+            f"{1 - heap_memory / task_memory:>8.0%}{task_seconds:>9.2f}{heap_seconds:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
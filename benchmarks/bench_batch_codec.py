@@ -0,0 +1,94 @@
+"""
+Batch link codec benchmark
+
+Token length and encode/decode time for typical batch shapes, against the
+legacy base64 "id,id,..." links. Standalone, no Telegram or MongoDB:
+
+    python benchmarks/bench_batch_codec.py
+"""
+
+import asyncio
+import base64
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import MAX_BATCH_SIZE
+from utils.helpers import BATCH_PREFIX, pack_batch_ids, unpack_batch_token, encode_batch_link, decode_batch_link
+
+ROUNDS = 2000
+
+
+class FakeLinkDB:
+    """In-memory links collection"""
+
+    def __init__(self):
+        self.links = {}
+
+    async def save_link(self, key, link_type, ranges, options=None):
+        self.links[key] = {"key": key, "type": link_type, "ranges": ranges}
+        return True
+
+    async def get_link(self, key):
+        return self.links.get(key)
+
+
+def shapes():
+    rng = random.Random(7)
+    base = 1_250_000
+    yield "1 file", [base]
+    yield "10 in a row", list(range(base, base + 10))
+    yield f"{MAX_BATCH_SIZE} in a row", list(range(base, base + MAX_BATCH_SIZE))
+    yield "4 runs of 25", [base + run * 40 + i for run in range(4) for i in range(25)]
+    yield "30 scattered", sorted(rng.sample(range(base, base + 5000), 30))
+    yield f"{MAX_BATCH_SIZE} scattered", sorted(rng.sample(range(base, base + 50000), MAX_BATCH_SIZE))
+
+
+def legacy_encode(ids):
+    return base64.urlsafe_b64encode(",".join(map(str, ids)).encode("ascii")).decode("ascii")
+
+
+def legacy_decode(token):
+    return [int(x) for x in base64.urlsafe_b64decode(token).decode("ascii").split(",")]
+
+
+def main():
+    db = FakeLinkDB()
+    loop = asyncio.new_event_loop()
+
+    print(f"{'batch':<18}{'legacy':>8}{'start param':>13}{'stored':>8}{'encode us':>11}{'decode us':>11}{'legacy us':>11}")
+    for name, ids in shapes():
+        start_param = loop.run_until_complete(encode_batch_link(db, ids))
+        token = start_param[len(BATCH_PREFIX):]
+        stored = unpack_batch_token(token)[1] is None
+        assert loop.run_until_complete(decode_batch_link(db, token)) == ids
+
+        encode_us = timeit.timeit(lambda: pack_batch_ids(ids), number=ROUNDS) / ROUNDS * 1e6
+        decode_us = timeit.timeit(lambda: unpack_batch_token(pack_batch_ids(ids)), number=ROUNDS) / ROUNDS * 1e6 - encode_us
+        legacy = legacy_encode(ids)
+        legacy_us = timeit.timeit(lambda: legacy_decode(legacy), number=ROUNDS) / ROUNDS * 1e6
+
+        print(
+            f"{name:<18}{len(BATCH_PREFIX + legacy):>8}{len(start_param):>13}{'yes' if stored else 'no':>8}"
+            f"{encode_us:>11.1f}{decode_us:>11.1f}{legacy_us:>11.1f}"
+        )
+
+    # Oversized tokens must fail before expanding anything
+    reject_us = timeit.timeit(lambda: _rejects("AQD___8P"), number=ROUNDS) / ROUNDS * 1e6
+    print(f"\nreject 268M-ID token: {reject_us:.1f} us")
+    loop.close()
+
+
+def _rejects(token):
+    try:
+        unpack_batch_token(token)
+    except ValueError:
+        return True
+    raise AssertionError("oversized token decoded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Batch delivery benchmark
+
+One copy request per file (the old loop) against chunked copy_messages
+(up to 100 files per request), with a fake client that charges a fixed
+round trip per API request. Standalone, no Telegram or MongoDB:
+
+    python benchmarks/bench_delivery.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.delivery import DeliveryJob, DeliveryQueue
+
+CHANNEL_ID = -1001234567890
+BATCHES = (10, 100, 1000)
+
+# Simulated API round trip (seconds)
+API_RTT = 0.004
+
+
+class FakeCatalog:
+    """media_catalog.send copies (cold catalog), record is free"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def send(self, chat_id, from_chat_id, message_id, **kwargs):
+        return await self.bot.copy_message(chat_id, from_chat_id, message_id)
+
+    async def record(self, channel_id, pairs):
+        pass
+
+
+class FakeBot:
+    """Send methods with one simulated round trip per request"""
+
+    def __init__(self, deleted=()):
+        self.deleted = set(deleted)
+        self.media_catalog = FakeCatalog(self)
+        self.requests = 0
+        self.next_id = 0
+
+    async def _request(self):
+        self.requests += 1
+        await asyncio.sleep(API_RTT)
+
+    def _sent(self):
+        self.next_id += 1
+        return SimpleNamespace(id=self.next_id)
+
+    async def copy_message(self, chat_id, from_chat_id, message_id, **kwargs):
+        await self._request()
+        if message_id in self.deleted:
+            raise ValueError("MESSAGE_ID_INVALID")
+        return self._sent()
+
+    async def copy_messages(self, chat_id, from_chat_id, message_ids, **kwargs):
+        await self._request()
+        return [self._sent() for message_id in message_ids if message_id not in self.deleted]
+
+    async def get_messages(self, chat_id, message_ids):
+        await self._request()
+        return [SimpleNamespace(id=i, empty=i in self.deleted) for i in message_ids]
+
+
+async def run(deliver, bot, size):
+    queue = DeliveryQueue(bot)
+    message_ids = list(range(1, size + 1))
+    job = DeliveryJob(42, 42, message_ids, CHANNEL_ID)
+    started = time.perf_counter()
+    await getattr(queue, deliver)(job, message_ids)
+    return time.perf_counter() - started, job
+
+
+async def main():
+    print(f"API round trip {API_RTT * 1000:.1f} ms\n")
+    print(f"{'files':>6}{'deleted':>9}{'loop s':>9}{'loop req':>10}{'bulk s':>9}{'bulk req':>10}{'speedup':>9}")
+    for size in BATCHES:
+        # Every 7th post deleted: partial chunks cost one extra lookup each
+        for deleted in ((), range(7, size + 1, 7)):
+            loop_bot, bulk_bot = FakeBot(deleted), FakeBot(deleted)
+            loop_seconds, loop_job = await run("_deliver_each", loop_bot, size)
+            bulk_seconds, bulk_job = await run("_deliver_bulk", bulk_bot, size)
+            assert loop_job.sent_ids == bulk_job.sent_ids
+
+            print(
+                f"{size:>6}{len(deleted):>9}{loop_seconds:>9.3f}{loop_bot.requests:>10}"
+                f"{bulk_seconds:>9.3f}{bulk_bot.requests:>10}{loop_seconds / bulk_seconds:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Media catalog benchmark
+
+Delivery latency of send_cached_media (catalog hit) against copy_message
+from the database channel, with a fake client that charges a fixed round
+trip per API request. Pyrogram's copy_message fetches the source message
+first, so it costs two round trips. Standalone, no Telegram or MongoDB:
+
+    python benchmarks/bench_media_catalog.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.media_catalog import MediaCatalog
+
+CHANNEL_ID = -1001234567890
+FILES = 200
+SENDS = 2000
+
+# Simulated API and MongoDB round trips (seconds)
+API_RTT = 0.004
+DB_RTT = 0.0005
+
+
+def fake_message(message_id):
+    document = SimpleNamespace(
+        file_id=f"BQACAgQAAxkBAA{message_id}",
+        file_unique_id=f"AgAD{message_id}",
+        file_size=1_500_000_000,
+        file_name=f"Movie.{message_id}.2024.1080p.mkv"
+    )
+    return SimpleNamespace(id=message_id, document=document, caption=SimpleNamespace(html=f"<b>File {message_id}</b>"))
+
+
+class FakeDB:
+    """In-memory catalog collection"""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def get_catalog_entries(self, channel_id, message_ids):
+        await asyncio.sleep(DB_RTT)
+        return {i: self.entries[i] for i in message_ids if i in self.entries}
+
+    async def save_catalog_entries(self, channel_id, entries):
+        await asyncio.sleep(DB_RTT)
+        self.entries.update(entries)
+
+
+class FakeBot:
+    """Send methods with one simulated round trip per request"""
+
+    def __init__(self):
+        self.db = FakeDB()
+        self.requests = 0
+
+    async def _request(self):
+        self.requests += 1
+        await asyncio.sleep(API_RTT)
+
+    async def send_cached_media(self, chat_id, file_id, **kwargs):
+        await self._request()
+        return SimpleNamespace(id=0)
+
+    async def copy_message(self, chat_id, from_chat_id, message_id, **kwargs):
+        # get_messages, then the send
+        await self._request()
+        await self._request()
+        return fake_message(message_id)
+
+
+async def measure(send, message_ids):
+    latencies = []
+    for i in range(SENDS):
+        started = time.perf_counter()
+        await send(1000 + i, CHANNEL_ID, message_ids[i % len(message_ids)])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(name, latencies, requests):
+    latencies.sort()
+    print(
+        f"{name:<22}{statistics.median(latencies):>9.2f}{latencies[int(len(latencies) * 0.95)]:>9.2f}"
+        f"{requests / len(latencies):>14.2f}"
+    )
+
+
+async def main():
+    message_ids = list(range(1, FILES + 1))
+    print(f"{SENDS} sends of {FILES} files, API round trip {API_RTT * 1000:.1f} ms\n")
+    print(f"{'path':<22}{'p50 ms':>9}{'p95 ms':>9}{'requests/send':>14}")
+
+    # No catalog: every send copies
+    bot = FakeBot()
+    report("copy_message", await measure(bot.copy_message, message_ids), bot.requests)
+
+    # Cold catalog: first send of each file copies and records it
+    bot = FakeBot()
+    catalog = MediaCatalog(bot)
+    report("catalog (cold)", await measure(catalog.send, message_ids), bot.requests)
+
+    # Warm: every file already recorded
+    bot.requests = 0
+    report("send_cached_media", await measure(catalog.send, message_ids), bot.requests)
+    print(f"\ncatalog: {catalog.get_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
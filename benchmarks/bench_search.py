@@ -0,0 +1,57 @@
+"""
+Search index benchmark
+
+Build time and per-query latency on the synthetic corpus, plus the memory
+held by paged results. Standalone, no Telegram or MongoDB:
+
+    python benchmarks/bench_search.py [files]
+"""
+
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.search_corpus import make_corpus, QUERIES
+from features.search_index import SearchIndex
+
+RUNS = 20
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    corpus = list(make_corpus(files))
+
+    index = SearchIndex(None)
+    started = time.perf_counter()
+    index.add(corpus)
+    print(f"index: {len(index._docs):,} files, {len(index._vocab):,} words in {time.perf_counter() - started:.2f} s\n")
+
+    print(f"{'query':<16}{'results':>9}{'p50 ms':>9}{'max ms':>9}")
+    medians = []
+    for query in QUERIES:
+        runs = []
+        for _ in range(RUNS):
+            started = time.perf_counter()
+            results, more = index.search(query)
+            runs.append((time.perf_counter() - started) * 1000)
+        medians.append(statistics.median(runs))
+        print(f"{query:<16}{len(results):>8}{'+' if more else ' '}{medians[-1]:>9.3f}{max(runs):>9.3f}")
+    print(f"\nmedian of queries: {statistics.median(medians):.3f} ms")
+
+    # Paged results of a full cache: every user searching broad words
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for user_id in range(index.max_queries):
+        results, more = index.search(QUERIES[user_id % len(QUERIES)])
+        index.remember(user_id, "q", list(results), more)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"paged results of {index.max_queries} queries: {used / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Synthetic search corpus
+
+Catalog entries shaped like a release channel: show and movie names,
+season/episode tags, quality and codec words, container extensions and
+channel captions. Word frequencies are skewed like real names, a few
+words ("mkv", "1080p") are in most files and most title words are rare.
+"""
+
+import itertools
+import random
+from typing import Dict, Iterator, List, Tuple
+
+SYLLABLES = [
+    "ka", "ri", "to", "na", "mi", "ro", "se", "yu", "ha", "shi", "ga", "den", "ko", "ra", "me",
+    "an", "el", "dra", "gon", "star", "war", "dark", "light", "sky", "blue", "fire", "ice", "wolf",
+    "king", "dom", "hero", "tale", "moon", "sun", "ash", "iron", "stone", "night", "blade", "storm"
+]
+QUALITY = ["1080p", "720p", "480p", "2160p"]
+SOURCE = ["web", "dl", "webrip", "bluray", "hdtv", "amzn", "nf"]
+CODEC = ["x264", "x265", "hevc", "10bit", "aac", "ddp5"]
+CONTAINERS = ["mkv", "mkv", "mkv", "mp4", "mp4", "avi"]
+CAPTION_TAGS = ["Join @AnimeHub", "Uploaded by @ReleaseBot", "Dual Audio", "English Sub", "Hindi Dub", ""]
+
+# Typical /search queries (exact words, prefixes, several words, broad words)
+QUERIES = [
+    "mkv", "1080p", "w1", "s01e05", "episode 12", "epi", "dragon", "dragon 1080p", "star war",
+    "kari", "dark knight", "hevc mkv", "dual audio", "s02", "movie 2019", "x265", "blade storm", "tale"
+]
+
+
+def _title_words(rng: random.Random, count: int) -> List[str]:
+    return ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize() for _ in range(count)]
+
+
+def make_corpus(files: int = 100_000, seed: int = 1) -> Iterator[Tuple[int, Dict]]:
+    """(message_id, catalog entry) pairs, message IDs ascending"""
+    rng = random.Random(seed)
+    titles = [" ".join(_title_words(rng, rng.randint(1, 3))) for _ in range(3000)]
+    # Zipf-like: a few titles have many episodes
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(titles))))
+
+    message_id = 1
+    for _ in range(files):
+        message_id += rng.choice((1, 1, 1, 2, 5))
+        title = rng.choices(titles, cum_weights=cum_weights)[0].replace(" ", ".")
+        if rng.random() < 0.7:
+            season, episode = rng.randint(1, 6), rng.randint(1, 30)
+            tag = f"S{season:02d}E{episode:02d}" if rng.random() < 0.7 else f"Episode.{episode}"
+        else:
+            tag = f"Movie.{rng.randint(1990, 2024)}"
+        extra = rng.choice(("", ".W1", ".W2", ".Part1", ".Part2", ".Uncut"))
+        name = (
+            f"{title}.{tag}{extra}.{rng.choice(QUALITY)}.{rng.choice(SOURCE)}.{rng.choice(CODEC)}"
+            f".{rng.choice(CONTAINERS)}"
+        )
+        caption = f"<b>{title.replace('.', ' ')}</b> {tag.replace('.', ' ')}\n{rng.choice(CAPTION_TAGS)}"
+        yield message_id, {
+            "message_id": message_id,
+            "media_type": "document" if rng.random() < 0.8 else "video",
+            "file_name": name,
+            "caption": caption
+        }
@@ -5,16 +5,21 @@ Bot Client - Main Bot Class
 Manages bot instance, handlers, and features
 """
 
+import html
 import logging
 import asyncio
 import datetime
-from pyrogram import Client, filters
+from pyrogram import Client, filters, raw, types
 from pyrogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from pyrogram.errors import FloodWait, UserNotParticipant
+from pyrogram.errors import UserNotParticipant
 
 # Import configurations
 from config import (
-    API_ID, API_HASH, BOT_TOKEN, WORKERS,
+    API_ID, API_HASH, BOT_TOKEN, WORKERS, BAN_SYNC_INTERVAL, DELIVERY_WORKERS, MAX_BATCH_SIZE,
+    RATE_LIMIT_GLOBAL, RATE_LIMIT_PER_CHAT, RATE_LIMIT_PER_CHAT_BURST, FLOOD_WAIT_RETRIES,
+    BROADCAST_CONCURRENCY, BROADCAST_CHUNK_SIZE, FSUB_MEMBER_TTL, FSUB_NONMEMBER_TTL, FSUB_LINK_REFRESH,
+    FSUB_PENDING_LINK_TTL, DB_CHANNEL_CHECK_INTERVAL, LINK_CACHE_SIZE,
+    DELIVERY_PLAN_TTL, CATALOG_FETCH_CONCURRENCY, INGEST_CHUNK_SIZE,
     ADMINS, CHANNELS, FORCE_SUB_CHANNELS,
     BOT_PICS, WELCOME_TEXT, HELP_TEXT, ABOUT_TEXT
 )
@@ -22,8 +27,25 @@ from config import (
 # Import database
 from database.database import Database
 
+# Import features
+from features.auto_delete import AutoDeleteManager
+from features.broadcast import BroadcastEngine
+from features.bulk_ingest import BulkIngest, summary_csv
+from features.catalog_indexer import CatalogIndexer
+from features.channel_health import ChannelHealth
+from features.delivery import DeliveryJob, DeliveryQueue
+from features.delivery_plans import DeliveryPlanCache
+from features.deliverable_ids import DeliverableIds
+from features.invite_links import InviteLinkPool
+from features.link_store import LinkStore, LINK_PREFIX
+from features.media_catalog import MediaCatalog
+from features.membership import MembershipCache, PendingDeepLinks
+from features.rate_limiter import OutboundGovernor
+from features.search_index import SearchIndex, PAGE_SIZE as SEARCH_PAGE_SIZE
+from features.recipient_pruner import RecipientPruner
+
 # Import utilities
-from utils.helpers import encode, decode, is_subscribed, get_size
+from utils.helpers import is_subscribed, get_size
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +76,22 @@ class Bot(Client):
         
         # Database channel
         self.db_channel = None
+        self.channel_health = ChannelHealth(self, interval=DB_CHANNEL_CHECK_INTERVAL)
+        
+        # file_ids of database channel messages (send_cached_media instead of copy_message)
+        self.media_catalog = MediaCatalog(self)
+        
+        # Bitmap of deliverable database channel message IDs (batches skip the rest)
+        self.deliverable_ids = DeliverableIds(self)
+        
+        # Indexes the database channel into the catalog (incremental + live posts)
+        self.catalog_indexer = CatalogIndexer(self, concurrency=CATALOG_FETCH_CONCURRENCY)
+        
+        # File name/caption search (/search), kept current by the indexer
+        self.search_index = SearchIndex(self)
+        
+        # /ingest sessions (many files forwarded to the database channel at once)
+        self.bulk_ingest = BulkIngest(self, chunk_size=INGEST_CHUNK_SIZE)
         
         # State management
         self.batch_state = {}
@@ -61,8 +99,49 @@ class Bot(Client):
         
         # Auto-delete tracking (THREE FEATURES)
         self.user_last_message = {}  # Feature 1: Clean conversation
-        self.user_file_messages = {}  # Feature 2: Auto-delete files
-        self.user_delete_tasks = {}   # Feature 3: Delete task tracking
+        self.auto_delete = AutoDeleteManager(self)  # Feature 2/3: File deletion scheduler
+        
+        # Rate limiter / FloodWait governor for all outbound calls
+        self.governor = OutboundGovernor(
+            global_rate=RATE_LIMIT_GLOBAL,
+            per_chat_rate=RATE_LIMIT_PER_CHAT,
+            per_chat_burst=RATE_LIMIT_PER_CHAT_BURST,
+            max_retries=FLOOD_WAIT_RETRIES
+        )
+        
+        # Marks users who blocked the bot / deleted their account as unreachable
+        self.pruner = RecipientPruner(self.db)
+        self.governor.error_hook = self.pruner.report
+        
+        # Force-sub membership cache
+        self.membership = MembershipCache(
+            self,
+            positive_ttl=FSUB_MEMBER_TTL,
+            negative_ttl=FSUB_NONMEMBER_TTL
+        )
+        
+        # Stored short links (LRU in front of the links collection)
+        self.link_store = LinkStore(self.db, max_entries=LINK_CACHE_SIZE)
+        
+        # Resolved start links (file IDs + delivery settings), one resolution per hot link
+        self.delivery_plans = DeliveryPlanCache(self, ttl=DELIVERY_PLAN_TTL)
+        self.db.special_link_hook = self.delivery_plans.invalidate_special
+        
+        # Links opened before joining, delivered once the user joins
+        self.pending_links = PendingDeepLinks(ttl=FSUB_PENDING_LINK_TTL)
+        
+        # Force-sub invite links and channel titles (join screen needs no API calls)
+        self.invite_links = InviteLinkPool(self, FORCE_SUB_CHANNELS, refresh_interval=FSUB_LINK_REFRESH)
+        
+        # Background batch delivery (keeps update workers free)
+        self.delivery = DeliveryQueue(self, workers=DELIVERY_WORKERS)
+        
+        # Resumable broadcast jobs
+        self.broadcaster = BroadcastEngine(
+            self,
+            concurrency=BROADCAST_CONCURRENCY,
+            chunk_size=BROADCAST_CHUNK_SIZE
+        )
         
         logger.info("Bot instance created")
     
@@ -81,6 +160,7 @@ class Bot(Client):
             
             # Connect to database
             await self.db.connect()
+            self.db.start_ban_sync(BAN_SYNC_INTERVAL)
             logger.info("Database connected")
             
             # Set database channel
@@ -88,6 +168,29 @@ class Bot(Client):
                 self.db_channel = CHANNELS[0]
                 logger.info(f"Database channel: {self.db_channel}")
             
+            # Verify admin rights once, then periodically
+            await self.channel_health.check()
+            self.channel_health.start()
+            
+            # Index channel posts added while the bot was offline
+            await self.deliverable_ids.load()
+            await self.search_index.load()
+            self.catalog_indexer.start()
+            
+            # Re-arm auto-deletes that were pending before the restart
+            await self.auto_delete.restore_schedules()
+            
+            # Load invite links, refresh stale ones in the background
+            await self.invite_links.load()
+            self.invite_links.start()
+            
+            # Start delivery workers
+            self.delivery.start()
+            self.pruner.start()
+            
+            # Resume broadcasts interrupted by a restart
+            await self.broadcaster.resume_pending()
+            
             # Register all handlers
             self.register_handlers()
             logger.info("All handlers registered")
@@ -103,14 +206,21 @@ class Bot(Client):
     async def stop(self):
         """Stop the bot"""
         try:
-            # Cancel all auto-delete tasks
-            for user_id in list(self.user_delete_tasks.keys()):
-                for task in self.user_delete_tasks[user_id]:
-                    if not task.done():
-                        task.cancel()
+            # Stop the auto-delete scheduler (schedules are persisted)
+            await self.auto_delete.stop()
+            
+            await self.delivery.stop()
+            await self.broadcaster.stop()
+            await self.pruner.stop()
+            await self.invite_links.stop()
+            await self.channel_health.stop()
+            await self.catalog_indexer.stop()
             
             logger.info("All tasks cancelled")
             
+            # Flush buffered writes and close database
+            await self.db.close()
+            
             # Stop Pyrogram client
             await super().stop()
             logger.info("Bot stopped")
@@ -118,6 +228,97 @@ class Bot(Client):
         except Exception as e:
             logger.error(f"Error stopping bot: {e}")
     
+    # ============================================
+    # OUTBOUND CALLS (rate limited via governor)
+    # ============================================
+    # Copies and forwards also resolve the source chat (sole_peer=False)
+    
+    async def send_message(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().send_message, chat_id, *args, **kwargs)
+    
+    async def send_photo(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().send_photo, chat_id, *args, **kwargs)
+    
+    async def send_document(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().send_document, chat_id, *args, **kwargs)
+    
+    async def send_cached_media(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().send_cached_media, chat_id, *args, **kwargs)
+    
+    async def send_media_group(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().send_media_group, chat_id, *args, **kwargs)
+    
+    async def copy_message(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().copy_message, chat_id, *args,
+                                        sole_peer=False, **kwargs)
+    
+    async def copy_media_group(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().copy_media_group, chat_id, *args,
+                                        sole_peer=False, **kwargs)
+    
+    async def forward_messages(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().forward_messages, chat_id, *args,
+                                        sole_peer=False, **kwargs)
+    
+    async def copy_messages(self, chat_id, from_chat_id, message_ids, protect_content: bool = False,
+                            drop_captions: bool = False):
+        """
+        Copy up to 100 messages with a single request
+        
+        Uses messages.forwardMessages with drop_author, so the result looks
+        like copy_message (no "Forwarded from" header). Missing source
+        messages are skipped by Telegram. drop_captions removes media captions.
+        
+        Returns:
+            Sent messages in source order
+        """
+        async def invoke():
+            r = await self.invoke(
+                raw.functions.messages.ForwardMessages(
+                    from_peer=await self.resolve_peer(from_chat_id),
+                    to_peer=await self.resolve_peer(chat_id),
+                    id=list(message_ids),
+                    random_id=[self.rnd_id() for _ in message_ids],
+                    drop_author=True,
+                    drop_media_captions=drop_captions or None,
+                    noforwards=protect_content or None
+                )
+            )
+            users = {i.id: i for i in r.users}
+            chats = {i.id: i for i in r.chats}
+            sent = [
+                await types.Message._parse(self, update.message, users, chats)
+                for update in r.updates
+                if isinstance(update, (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage))
+            ]
+            return sorted(sent, key=lambda message: message.id)
+        
+        return await self.governor.call(chat_id, invoke, sole_peer=False)
+    
+    async def edit_message_text(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().edit_message_text, chat_id, *args, **kwargs)
+    
+    async def edit_message_caption(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().edit_message_caption, chat_id, *args, **kwargs)
+    
+    async def delete_messages(self, chat_id, *args, **kwargs):
+        return await self.governor.call(chat_id, super().delete_messages, chat_id, *args, **kwargs)
+    
+    async def get_messages(self, chat_id, *args, **kwargs):
+        return await self.governor.call(None, super().get_messages, chat_id, *args, **kwargs)
+    
+    async def get_chat(self, chat_id, *args, **kwargs):
+        return await self.governor.call(None, super().get_chat, chat_id, *args, **kwargs)
+    
+    async def get_chat_member(self, chat_id, *args, **kwargs):
+        return await self.governor.call(None, super().get_chat_member, chat_id, *args, **kwargs)
+    
+    async def create_chat_invite_link(self, chat_id, *args, **kwargs):
+        return await self.governor.call(None, super().create_chat_invite_link, chat_id, *args, **kwargs)
+    
+    async def answer_callback_query(self, *args, **kwargs):
+        return await self.governor.call(None, super().answer_callback_query, *args, **kwargs)
+    
     def register_handlers(self):
         """Register all message and callback handlers"""
         
@@ -140,6 +341,11 @@ class Bot(Client):
             """Handle /about command"""
             await self.handle_about(message)
         
+        @self.on_message(filters.command("search") & filters.private)
+        async def search_command(client, message: Message):
+            """Handle /search command"""
+            await self.handle_search(message)
+        
         # ============================================
         # ADMIN COMMANDS
         # ============================================
@@ -158,6 +364,13 @@ class Bot(Client):
                 return
             await self.handle_broadcast(message)
         
+        @self.on_message(filters.command("cancel_broadcast") & filters.private)
+        async def cancel_broadcast_command(client, message: Message):
+            """Handle /cancel_broadcast command"""
+            if message.from_user.id not in ADMINS:
+                return
+            await self.handle_cancel_broadcast(message)
+        
         @self.on_message(filters.command("ban") & filters.private)
         async def ban_command(client, message: Message):
             """Handle /ban command"""
@@ -172,6 +385,41 @@ class Bot(Client):
                 return
             await self.handle_unban(message)
         
+        @self.on_message(filters.command("prune_users") & filters.private)
+        async def prune_users_command(client, message: Message):
+            """Handle /prune_users command"""
+            if message.from_user.id not in ADMINS:
+                return
+            await self.handle_prune_users(message)
+        
+        @self.on_message(filters.command("reindex") & filters.private)
+        async def reindex_command(client, message: Message):
+            """Handle /reindex command"""
+            if message.from_user.id not in ADMINS:
+                return
+            await self.handle_reindex(message)
+        
+        @self.on_message(filters.command("dedupe") & filters.private)
+        async def dedupe_command(client, message: Message):
+            """Handle /dedupe command"""
+            if message.from_user.id not in ADMINS:
+                return
+            await self.handle_dedupe(message)
+        
+        @self.on_message(filters.command("ingest") & filters.private)
+        async def ingest_command(client, message: Message):
+            """Handle /ingest command"""
+            if message.from_user.id not in ADMINS:
+                return
+            await self.handle_ingest(message)
+        
+        # Runs before the batch/forward handlers, only claims files of an ingest session
+        @self.on_message(filters.private & filters.media, group=-1)
+        async def ingest_file_handler(client, message: Message):
+            """Queue files sent during an /ingest session"""
+            if message.from_user and await self.bulk_ingest.add(message.from_user.id, message):
+                message.stop_propagation()
+        
         # ============================================
         # FILE COMMANDS
         # ============================================
@@ -183,11 +431,44 @@ class Bot(Client):
                 return
             await self.handle_batch_start(message)
         
-        @self.on_message(filters.private & filters.forwarded & ~filters.command(["start", "help", "about", "batch", "users", "broadcast", "ban", "unban"]))
+        @self.on_message(filters.private & filters.forwarded & ~filters.command(["start", "help", "about", "batch", "users", "broadcast", "cancel_broadcast", "ban", "unban"]))
         async def handle_forwarded(client, message: Message):
             """Handle forwarded messages for batch"""
             await self.handle_batch_messages(message)
         
+        # ============================================
+        # MEMBERSHIP UPDATES (force-sub cache invalidation)
+        # ============================================
+        
+        @self.on_chat_member_updated()
+        async def member_updated_handler(client, update):
+            """Keep the membership cache in sync with joins/leaves"""
+            self.membership.on_member_updated(update)
+            
+            member = update.new_chat_member or update.old_chat_member
+            if member and member.user:
+                await self.resume_if_subscribed(member.user.id)
+        
+        @self.on_chat_join_request()
+        async def join_request_handler(client, request):
+            """Recheck membership after a join request"""
+            self.membership.on_join_request(request)
+            await self.resume_if_subscribed(request.from_user.id)
+        
+        # ============================================
+        # DATABASE CHANNEL CATALOG
+        # ============================================
+        
+        @self.on_message(filters.channel)
+        async def channel_post_handler(client, message: Message):
+            """Index new database channel posts"""
+            await self.catalog_indexer.on_channel_post(message)
+        
+        @self.on_deleted_messages()
+        async def deleted_messages_handler(client, messages):
+            """Drop deleted database channel posts from the catalog"""
+            await self.catalog_indexer.on_deleted(messages)
+        
         # ============================================
         # CALLBACK HANDLERS
         # ============================================
@@ -212,24 +493,12 @@ class Bot(Client):
             await message.reply("❌ You are banned from using this bot!")
             return
         
-        # Add user to database
-        if not await self.db.is_user_exist(user_id):
-            await self.db.add_user(user_id)
+        # Add user to database (write-behind)
+        self.db.queue_user(user_id, message.from_user.first_name, message.from_user.username)
         
         # Check for file/batch link in start parameter
         if len(message.command) > 1:
-            arg = message.command[1]
-            
-            # Check if it's a file link
-            if arg.startswith("file_"):
-                file_id = arg.replace("file_", "")
-                await self.send_file(message, file_id)
-                return
-            
-            # Check if it's a batch link
-            elif arg.startswith("batch_"):
-                batch_data = arg.replace("batch_", "")
-                await self.send_batch(message, batch_data)
+            if await self.handle_deep_link(message, message.command[1]):
                 return
         
         # Check force subscribe
@@ -242,6 +511,62 @@ class Bot(Client):
         # Show welcome message
         await self.show_welcome(message)
     
+    async def handle_deep_link(self, message: Message, arg: str, user_id: int = None) -> bool:
+        """
+        Deliver a file/batch start link
+        
+        Returns:
+            False if arg is not a file/batch link
+        """
+        if not arg.startswith((LINK_PREFIX, "file_", "batch_")):
+            return False
+        
+        user_id = user_id or message.from_user.id
+        
+        # Check force subscribe
+        if FORCE_SUB_CHANNELS:
+            is_subscribed_all = await is_subscribed(self, user_id, FORCE_SUB_CHANNELS)
+            if not is_subscribed_all:
+                # Delivered automatically once the user joins
+                self.pending_links.park(user_id, arg)
+                await self.show_force_subscribe(message)
+                return True
+        
+        # Resolved once per link (with the delivery settings) and shared by everyone opening it
+        plan = await self.delivery_plans.get(arg)
+        if not plan:
+            await message.reply("❌ Link not found or expired!")
+        elif plan["type"] == "file":
+            await self.send_file(message, plan["ids"][0], user_id, plan)
+        else:
+            await self.send_batch(message, plan["ids"], user_id, plan)
+        return True
+    
+    async def resume_deep_link(self, user_id: int) -> bool:
+        """
+        Deliver the link a user opened before joining the force-sub channels
+        
+        Returns:
+            False if the user has no parked link
+        """
+        arg = self.pending_links.pop(user_id)
+        if not arg:
+            return False
+        
+        msg = await self.send_message(user_id, "✅ Thanks for joining! Sending your files...")
+        await self.handle_deep_link(msg, arg, user_id)
+        return True
+    
+    async def resume_if_subscribed(self, user_id: int):
+        """Resume a parked link once the user has joined every force-sub channel"""
+        if not self.pending_links.has(user_id):
+            return
+        try:
+            if await is_subscribed(self, user_id, FORCE_SUB_CHANNELS):
+                await self.resume_deep_link(user_id)
+        except Exception as e:
+            logger.error(f"Error resuming link for {user_id}: {e}")
+    
     async def show_welcome(self, message: Message):
         """Show welcome message"""
         user = message.from_user
@@ -294,19 +619,11 @@ class Bot(Client):
         
         buttons = []
         
+        # Titles and invite links come from the pool (no API calls)
         for channel_id in FORCE_SUB_CHANNELS:
-            try:
-                chat = await self.get_chat(channel_id)
-                if chat.username:
-                    url = f"https://t.me/{chat.username}"
-                else:
-                    # Create invite link for private channel
-                    invite = await self.create_chat_invite_link(channel_id)
-                    url = invite.invite_link
-                
-                buttons.append([InlineKeyboardButton(f"Join {chat.title}", url=url)])
-            except Exception as e:
-                logger.error(f"Error getting channel {channel_id}: {e}")
+            url = self.invite_links.get_url(channel_id)
+            title = self.invite_links.get_title(channel_id) or "Channel"
+            buttons.append([InlineKeyboardButton(f"Join {title}", url=url)])
         
         buttons.append([InlineKeyboardButton("🔄 Try Again", callback_data="check_fsub")])
         
@@ -349,11 +666,13 @@ class Bot(Client):
         """Handle /users command (admin only)"""
         total = await self.db.total_users_count()
         banned = len(await self.db.get_banned_users())
+        unreachable = await self.db.unreachable_users_count()
         
         text = f"📊 **User Statistics**\n\n"
         text += f"👥 Total Users: {total}\n"
         text += f"✅ Active Users: {total - banned}\n"
-        text += f"🚫 Banned Users: {banned}"
+        text += f"🚫 Banned Users: {banned}\n"
+        text += f"👻 Unreachable Users: {unreachable}"
         
         await message.reply(text)
     
@@ -363,41 +682,29 @@ class Bot(Client):
             await message.reply("❌ Please reply to a message to broadcast!")
             return
         
-        users = await self.db.get_all_users()
-        total = len(users)
-        success = 0
-        failed = 0
+        status = await message.reply("📢 Starting broadcast...")
         
-        status = await message.reply(f"📢 Broadcasting to {total} users...")
-        
-        for user_id in users:
-            try:
-                await message.reply_to_message.copy(user_id)
-                success += 1
-            except FloodWait as e:
-                await asyncio.sleep(e.value)
-                await message.reply_to_message.copy(user_id)
-                success += 1
-            except Exception as e:
-                failed += 1
-                logger.error(f"Broadcast failed for {user_id}: {e}")
-            
-            # Update status every 100 users
-            if (success + failed) % 100 == 0:
-                await status.edit_text(
-                    f"📢 Broadcasting...\n\n"
-                    f"✅ Success: {success}\n"
-                    f"❌ Failed: {failed}\n"
-                    f"📊 Total: {total}"
-                )
+        # Runs in the background; progress is checkpointed and resumable
+        job = await self.broadcaster.start_broadcast(message.reply_to_message, status)
         
         await status.edit_text(
-            f"✅ Broadcast Complete!\n\n"
-            f"✅ Success: {success}\n"
-            f"❌ Failed: {failed}\n"
-            f"📊 Total: {total}"
+            f"📢 Broadcasting to {job['total']} users...\n\n"
+            f"🆔 Job: <code>{job['job_id']}</code>\n"
+            f"Use /cancel_broadcast {job['job_id']} to stop it."
         )
     
+    async def handle_cancel_broadcast(self, message: Message):
+        """Handle /cancel_broadcast command (admin only)"""
+        if len(message.command) < 2:
+            running = ", ".join(self.broadcaster.jobs) or "none"
+            await message.reply(f"❌ Usage: /cancel_broadcast <job_id>\n\nRunning: {running}")
+            return
+        
+        if await self.broadcaster.cancel(message.command[1]):
+            await message.reply("✅ Broadcast cancelled!")
+        else:
+            await message.reply("❌ No running broadcast with that ID!")
+    
     async def handle_ban(self, message: Message):
         """Handle /ban command (admin only)"""
         if len(message.command) < 2:
@@ -428,6 +735,180 @@ class Bot(Client):
         except Exception as e:
             await message.reply(f"❌ Error: {e}")
     
+    async def handle_prune_users(self, message: Message):
+        """Handle /prune_users command (admin only) - archive or delete users marked unreachable"""
+        # /prune_users (archive) or /prune_users purge (delete without archive)
+        mode = message.command[1].lower() if len(message.command) > 1 else "archive"
+        if mode not in ("archive", "purge"):
+            await message.reply("❌ Usage: /prune_users [archive|purge]")
+            return
+        
+        # Write out recently detected dead users first
+        await self.pruner.flush()
+        
+        status = await message.reply("🧹 Pruning unreachable users...")
+        removed = await self.db.prune_unreachable_users(archive=(mode == "archive"))
+        
+        await status.edit_text(
+            f"✅ Pruned {removed:,} unreachable users!\n\n"
+            f"{'Archived to users_archive' if mode == 'archive' else 'Deleted permanently'}"
+        )
+    
+    async def handle_reindex(self, message: Message):
+        """Handle /reindex command (admin only) - index the database channel into the catalog"""
+        if not self.db_channel:
+            await message.reply("❌ Database channel not configured!")
+            return
+        
+        # /reindex (new posts only) or /reindex full (rescan, drops deleted posts)
+        full = len(message.command) > 1 and message.command[1].lower() == "full"
+        if not self.catalog_indexer.start(full=full):
+            await message.reply("⏳ Catalog indexing is already running!")
+            return
+        
+        status = await message.reply(f"📚 Indexing database channel{' (full rescan)' if full else ''}...")
+        
+        # A sync can take minutes, so it is reported from the background
+        asyncio.create_task(self.report_reindex(status))
+    
+    async def report_reindex(self, status: Message):
+        """Edit the /reindex reply once the sync has finished"""
+        try:
+            indexed = await self.catalog_indexer.wait()
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.error(f"Catalog sync failed: {e}")
+            indexed = None
+        
+        state = self.catalog_indexer.get_status()
+        if indexed is None:
+            text = "❌ Indexing failed, check the logs!"
+        elif state["last_sync_complete"]:
+            text = (
+                f"✅ **Indexed {indexed:,} messages!**\n\n"
+                f"**Time:** {state['last_sync_seconds']}s ({state['last_sync_rate']}/s)\n"
+                f"**Last Message ID:** {state['last_id']}"
+            )
+        else:
+            text = (
+                f"⚠️ **Indexed {indexed:,} messages, some could not be fetched!**\n\n"
+                f"**Time:** {state['last_sync_seconds']}s ({state['last_sync_rate']}/s)\n\n"
+                f"Run /reindex again to scan the rest."
+            )
+        
+        try:
+            await status.edit_text(text)
+        except Exception as e:
+            logger.debug(f"Could not report reindex: {e}")
+    
+    async def handle_dedupe(self, message: Message):
+        """Handle /dedupe command (admin only) - rebuild the file index and find duplicate files"""
+        if not self.db_channel:
+            await message.reply("❌ Database channel not configured!")
+            return
+        
+        status = await message.reply("♻️ Looking for duplicate files...")
+        
+        # Waits for a catalog sync first, so it runs in the background
+        asyncio.create_task(self.report_dedupe(status))
+    
+    async def report_dedupe(self, status: Message):
+        """Bring the catalog up to date, rebuild the file index and edit the /dedupe reply"""
+        try:
+            # The index is built from the catalog
+            if self.catalog_indexer.start():
+                await self.catalog_indexer.wait()
+            result = await self.media_catalog.dedupe(self.db_channel)
+            
+            await status.edit_text(
+                f"✅ **File index rebuilt!**\n\n"
+                f"**Files stored more than once:** {result['files']:,}\n"
+                f"**Extra copies:** {result['duplicates']:,}\n\n"
+                f"__Extra copies are kept, links may point at them. "
+                f"New uploads of these files reuse the first copy.__"
+            )
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.error(f"Dedupe failed: {e}")
+            try:
+                await status.edit_text("❌ Dedupe failed, check the logs!")
+            except Exception:
+                pass
+    
+    async def handle_ingest(self, message: Message):
+        """Handle /ingest command (admin only) - start, finish or cancel a bulk ingest session"""
+        user_id = message.from_user.id
+        
+        if not self.db_channel:
+            await message.reply("❌ Database channel not configured!")
+            return
+        
+        # /ingest, /ingest done or /ingest cancel
+        action = message.command[1].lower() if len(message.command) > 1 else ""
+        
+        if action == "cancel":
+            cancelled = self.bulk_ingest.cancel(user_id)
+            await message.reply("✅ Ingest cancelled!" if cancelled else "❌ No active ingest!")
+            return
+        
+        if action == "done":
+            if not self.bulk_ingest.active(user_id):
+                await message.reply("❌ No active ingest!")
+                return
+            
+            status = await message.reply("⏳ Storing files and creating links...")
+            result = await self.bulk_ingest.finish(user_id)
+            
+            if not result["rows"]:
+                await status.edit_text("❌ No files received!")
+                return
+            
+            # A caption holds 1024 characters, more batch links only go in the CSV
+            batch_links = result["batch_links"]
+            if len(batch_links) == 1:
+                batch_text = f"**Batch Link:** https://t.me/{self.username}?start={batch_links[0]['link']}\n\n"
+            elif len(batch_links) <= 5:
+                batch_text = "**Batch Links** (up to {} files each):\n{}\n\n".format(
+                    MAX_BATCH_SIZE,
+                    "\n".join(
+                        f"{batch['first']}-{batch['last']}: https://t.me/{self.username}?start={batch['link']}"
+                        for batch in batch_links
+                    )
+                )
+            elif batch_links:
+                batch_text = f"**Batch Links:** {len(batch_links)} links of up to {MAX_BATCH_SIZE} files, in the CSV\n\n"
+            else:
+                batch_text = ""
+            
+            await self.send_document(
+                message.chat.id,
+                summary_csv(result["rows"], self.username, batch_links),
+                caption=(
+                    f"✅ **Ingest Complete!**\n\n"
+                    f"**Files:** {result['files']:,}\n"
+                    f"**Stored:** {result['stored']:,}\n"
+                    f"**Already stored:** {result['existing']:,}\n"
+                    f"**Repeated:** {result['duplicates']:,}\n"
+                    f"**Failed:** {result['failed']:,}\n"
+                    f"**Time:** {result['seconds']:.1f}s ({result['rate']:.1f} files/s)\n\n"
+                    f"{batch_text}"
+                    f"__Links for every file are in the attached CSV.__"
+                )
+            )
+            await status.delete()
+            return
+        
+        status = await message.reply(
+            "📥 **Bulk Ingest Started**\n\n"
+            "Forward or upload your files here. They are stored in the database "
+            "channel in chunks, files already stored there are reused.\n\n"
+            "Send /ingest done when finished or /ingest cancel to stop."
+        )
+        if not self.bulk_ingest.begin(user_id, progress_message=status):
+            await status.edit_text("⏳ Ingest already running!\n\nSend /ingest done to finish it.")
+    
     async def handle_batch_start(self, message: Message):
         """Start batch mode"""
         user_id = message.from_user.id
@@ -468,11 +949,21 @@ class Bot(Client):
             first_id = state['first_msg']
             last_id = state['last_msg']
             
-            # Create batch data string
-            batch_data = f"{first_id}-{last_id}"
-            encoded = await encode(batch_data)
+            if last_id - first_id + 1 > MAX_BATCH_SIZE:
+                await message.reply(
+                    f"❌ **Too many files!**\n\n"
+                    f"**Requested:** {last_id - first_id + 1} files\n"
+                    f"**Maximum:** {MAX_BATCH_SIZE} files\n\n"
+                    f"Please forward the **LAST** message of a smaller range."
+                )
+                return
             
-            link = f"https://t.me/{self.username}?start=batch_{encoded}"
+            start_param = await self.link_store.create("batch", range(first_id, last_id + 1))
+            if not start_param:
+                await message.reply("❌ Could not create the batch link, please try again!")
+                return
+            
+            link = f"https://t.me/{self.username}?start={start_param}"
             
             await message.reply(
                 f"✅ **Batch Link Generated!**\n\n"
@@ -486,103 +977,158 @@ class Bot(Client):
             del self.batch_state[user_id]
     
     # ============================================
-    # FILE SENDING
+    # SEARCH
     # ============================================
     
-    async def send_file(self, message: Message, file_id_encoded: str):
-        """Send a single file"""
+    async def handle_search(self, message: Message):
+        """Handle /search command - find files by name or caption"""
         user_id = message.from_user.id
         
-        # Check force subscribe
-        if FORCE_SUB_CHANNELS:
-            is_subscribed_all = await is_subscribed(self, user_id, FORCE_SUB_CHANNELS)
-            if not is_subscribed_all:
-                await self.show_force_subscribe(message)
-                return
+        if await self.db.is_user_banned(user_id):
+            await message.reply("❌ You are banned from using this bot!")
+            return
+        
+        query = message.text.split(None, 1)[1].strip() if len(message.command) > 1 else ""
+        if not query:
+            await message.reply(
+                "🔎 <b>Search Files</b>\n\n"
+                "<code>/search episode 12</code>\n\n"
+                "<i>Words can be shortened: /search epi finds episode</i>"
+            )
+            return
+        
+        results, more = self.search_index.search(query)
+        if not results:
+            await message.reply(f"❌ No files found for <code>{html.escape(query)}</code>")
+            return
+        
+        query_id = self.search_index.remember(user_id, query, results, more)
+        text, buttons = await self.build_search_page(query_id, query, results, more, 0)
+        await message.reply(text, reply_markup=buttons, disable_web_page_preview=True)
+    
+    async def handle_search_page(self, query: CallbackQuery):
+        """Handle srch_<query_id>_<page> buttons - show another result page"""
+        query_id, _, page = query.data[len("srch_"):].rpartition("_")
+        
+        found = self.search_index.recall(query_id)
+        if not found or not page.isdigit():
+            await query.answer("⌛ Search expired, please search again!", show_alert=True)
+            return
+        
+        search_query, results, more = found
+        text, buttons = await self.build_search_page(query_id, search_query, results, more, int(page))
+        try:
+            await query.message.edit_text(text, reply_markup=buttons, disable_web_page_preview=True)
+        except Exception as e:
+            logger.debug(f"Could not show search page: {e}")
+        await query.answer()
+    
+    async def build_search_page(self, query_id: str, search_query: str, results: list, more: bool, page: int):
+        """Text and buttons of one result page (more: only the best matches were kept)"""
+        pages = (len(results) + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+        page = max(0, min(page, pages - 1))
+        
+        buttons = []
+        for message_id in results[page * SEARCH_PAGE_SIZE:(page + 1) * SEARCH_PAGE_SIZE]:
+            # The same files come up in many searches, their links are reused
+            start_param = await self.link_store.file_link(message_id)
+            if not start_param:
+                continue
+            buttons.append([InlineKeyboardButton(
+                f"📁 {self.search_index.title(message_id)}",
+                url=f"https://t.me/{self.username}?start={start_param}"
+            )])
+        
+        navigation = []
+        if page > 0:
+            navigation.append(InlineKeyboardButton("◀️ Back", callback_data=f"srch_{query_id}_{page - 1}"))
+        if page < pages - 1:
+            navigation.append(InlineKeyboardButton("Next ▶️", callback_data=f"srch_{query_id}_{page + 1}"))
+        if navigation:
+            buttons.append(navigation)
+        buttons.append([InlineKeyboardButton("❌ Close", callback_data="close")])
+        
+        text = (
+            f"🔎 <b>Results for</b> <code>{html.escape(search_query)}</code>\n\n"
+            f"📁 Found: {len(results):,}{'+' if more else ''} files\n"
+            f"📄 Page: {page + 1}/{pages}"
+        )
+        return text, InlineKeyboardMarkup(buttons)
+    
+    # ============================================
+    # FILE SENDING
+    # ============================================
+    
+    async def send_file(self, message: Message, file_id: int, user_id: int = None, plan: dict = None):
+        """Send a single file (plan: delivery plan of the link, see DeliveryPlanCache.get)"""
+        user_id = user_id or message.from_user.id
+        plan = plan or {}
         
         try:
-            # Decode file ID
-            file_id = int(await decode(file_id_encoded))
-            
             # Get file from database channel
             if not self.db_channel:
                 await message.reply("❌ Database channel not configured!")
                 return
             
-            # Copy file to user
-            msg = await self.copy_message(
-                chat_id=user_id,
-                from_chat_id=self.db_channel,
-                message_id=file_id
+            # Send file to user (by file_id when cataloged)
+            msg = await self.media_catalog.send(
+                user_id,
+                self.db_channel,
+                file_id,
+                protect_content=plan.get("protect_content", False),
+                hide_caption=plan.get("hide_caption", False)
             )
             
             # Auto-delete setup (if enabled)
-            from config import AUTO_DELETE_TIME
-            if AUTO_DELETE_TIME and AUTO_DELETE_TIME > 0:
-                # Schedule deletion
-                task = asyncio.create_task(self.auto_delete_file(msg, AUTO_DELETE_TIME))
-                
-                if user_id not in self.user_delete_tasks:
-                    self.user_delete_tasks[user_id] = []
-                self.user_delete_tasks[user_id].append(task)
+            if plan.get("delete_after"):
+                await self.auto_delete.schedule_file_deletion(user_id, msg.id, plan["delete_after"])
         
         except Exception as e:
             logger.error(f"Error sending file: {e}")
             await message.reply("❌ File not found or expired!")
     
-    async def send_batch(self, message: Message, batch_data_encoded: str):
-        """Send batch of files"""
-        user_id = message.from_user.id
-        
-        # Check force subscribe
-        if FORCE_SUB_CHANNELS:
-            is_subscribed_all = await is_subscribed(self, user_id, FORCE_SUB_CHANNELS)
-            if not is_subscribed_all:
-                await self.show_force_subscribe(message)
-                return
+    async def send_batch(self, message: Message, message_ids: list, user_id: int = None, plan: dict = None):
+        """Send batch of files (plan: delivery plan of the link, see DeliveryPlanCache.get)"""
+        user_id = user_id or message.from_user.id
+        plan = plan or {}
         
         try:
-            # Decode batch data
-            batch_data = await decode(batch_data_encoded)
-            first_id, last_id = map(int, batch_data.split('-'))
-            
             if not self.db_channel:
                 await message.reply("❌ Database channel not configured!")
                 return
             
-            total = last_id - first_id + 1
-            sent = 0
+            # Capped before any filtering or queueing, whatever the caller passed
+            message_ids = list(message_ids)[:MAX_BATCH_SIZE]
             
-            status = await message.reply(f"📤 Sending {total} files...")
+            # Skip deleted posts, service messages and stickers
+            message_ids = self.deliverable_ids.filter(self.db_channel, message_ids)
+            if not message_ids:
+                await message.reply("❌ Batch not found or expired!")
+                return
             
-            for msg_id in range(first_id, last_id + 1):
-                try:
-                    await self.copy_message(
-                        chat_id=user_id,
-                        from_chat_id=self.db_channel,
-                        message_id=msg_id
-                    )
-                    sent += 1
-                except FloodWait as e:
-                    await asyncio.sleep(e.value)
-                except Exception as e:
-                    logger.error(f"Error sending file {msg_id}: {e}")
+            total = len(message_ids)
             
-            await status.edit_text(f"✅ Sent {sent} out of {total} files!")
+            status = await message.reply(f"📤 Sending {total} files...")
+            
+            # Delivered by the background delivery workers
+            job = DeliveryJob(
+                user_id=user_id,
+                chat_id=user_id,
+                message_ids=message_ids,
+                from_chat_id=self.db_channel,
+                protect_content=plan.get("protect_content", False),
+                hide_caption=plan.get("hide_caption", False),
+                delete_after=plan.get("delete_after", 0),
+                progress_message=status,
+                album_mode=plan.get("album_mode", False)
+            )
+            if not self.delivery.submit(job):
+                await status.edit_text("⏳ Your previous files are still being sent!")
         
         except Exception as e:
             logger.error(f"Error sending batch: {e}")
             await message.reply("❌ Batch not found or expired!")
     
-    async def auto_delete_file(self, message: Message, seconds: int):
-        """Auto-delete file after specified seconds"""
-        try:
-            await asyncio.sleep(seconds)
-            await message.delete()
-            logger.info(f"Auto-deleted message {message.id}")
-        except Exception as e:
-            logger.error(f"Error auto-deleting: {e}")
-    
     # ============================================
     # CALLBACK HANDLERS
     # ============================================
@@ -613,9 +1159,16 @@ class Bot(Client):
         elif data == "check_fsub":
             # Check force subscribe again
             if FORCE_SUB_CHANNELS:
+                # They just joined: a cached "not a member" would still say no
+                self.membership.invalidate(user_id)
                 is_subscribed_all = await is_subscribed(self, user_id, FORCE_SUB_CHANNELS)
                 if is_subscribed_all:
                     await query.message.delete()
+                    
+                    # Continue with the link they originally opened
+                    if await self.resume_deep_link(user_id):
+                        return
+                    
                     msg = await self.send_message(user_id, "Loading...")
                     await self.show_welcome(msg)
                     await msg.delete()
@@ -624,6 +1177,9 @@ class Bot(Client):
             else:
                 await query.answer("✅ No force subscribe configured!", show_alert=True)
         
+        elif data.startswith("srch_"):
+            await self.handle_search_page(query)
+        
         elif data == "close":
             await query.message.delete()
             await query.answer()
@@ -40,6 +40,36 @@ REQUEST_FSUB = bool(environ.get("REQUEST_FSUB", "False") == "True")
 WORKERS = int(environ.get("WORKERS", "4"))
 PORT = int(environ.get("PORT", "8080"))
 
+DELIVERY_WORKERS = int(environ.get("DELIVERY_WORKERS", "4"))  # Background batch delivery workers
+MAX_BATCH_SIZE = int(environ.get("MAX_BATCH_SIZE", "100"))  # Files per batch link
+MAX_SPECIAL_FILES = int(environ.get("MAX_SPECIAL_FILES", "50"))  # Files per special link
+
+# ============ RATE LIMITS ============
+RATE_LIMIT_GLOBAL = float(environ.get("RATE_LIMIT_GLOBAL", "25"))  # Outbound calls per second (all chats)
+RATE_LIMIT_PER_CHAT = float(environ.get("RATE_LIMIT_PER_CHAT", "1"))  # Outbound calls per second (one chat)
+RATE_LIMIT_PER_CHAT_BURST = int(environ.get("RATE_LIMIT_PER_CHAT_BURST", "20"))
+FLOOD_WAIT_RETRIES = int(environ.get("FLOOD_WAIT_RETRIES", "3"))
+
+# ============ BROADCAST ============
+BROADCAST_CONCURRENCY = int(environ.get("BROADCAST_CONCURRENCY", "10"))  # Concurrent senders per broadcast
+BROADCAST_CHUNK_SIZE = int(environ.get("BROADCAST_CHUNK_SIZE", "500"))  # Users per chunk / checkpoint
+
+# ============ BULK INGEST ============
+INGEST_CHUNK_SIZE = int(environ.get("INGEST_CHUNK_SIZE", "100"))  # Files forwarded to the database channel per request
+
+# ============ CACHES ============
+BAN_SYNC_INTERVAL = int(environ.get("BAN_SYNC_INTERVAL", "60"))  # Seconds, 0 to disable
+USER_FLUSH_INTERVAL = int(environ.get("USER_FLUSH_INTERVAL", "1000"))  # Milliseconds
+USER_FLUSH_MAX_OPS = int(environ.get("USER_FLUSH_MAX_OPS", "500"))  # Flush early at this many queued users
+FSUB_MEMBER_TTL = int(environ.get("FSUB_MEMBER_TTL", "600"))  # Seconds a joined user is trusted
+FSUB_NONMEMBER_TTL = int(environ.get("FSUB_NONMEMBER_TTL", "30"))  # Seconds a not-joined user is trusted
+FSUB_LINK_REFRESH = int(environ.get("FSUB_LINK_REFRESH", "21600"))  # Seconds between invite link refreshes
+FSUB_PENDING_LINK_TTL = int(environ.get("FSUB_PENDING_LINK_TTL", "900"))  # Seconds a link opened before joining is kept
+DB_CHANNEL_CHECK_INTERVAL = int(environ.get("DB_CHANNEL_CHECK_INTERVAL", "300"))  # Seconds between admin checks
+LINK_CACHE_SIZE = int(environ.get("LINK_CACHE_SIZE", "10000"))  # Stored links kept in memory
+DELIVERY_PLAN_TTL = int(environ.get("DELIVERY_PLAN_TTL", "300"))  # Seconds a resolved start link is reused
+CATALOG_FETCH_CONCURRENCY = int(environ.get("CATALOG_FETCH_CONCURRENCY", "4"))  # get_messages calls in flight while indexing
+
 # ============ PICS ============
 BOT_PICS = environ.get("BOT_PICS", "https://telegra.ph/file/d8d2e9cc6d60741c7e77d.jpg").split()
 
@@ -4,13 +4,151 @@ Complete version matching bot.py requirements
 """
 
 import motor.motor_asyncio
+import asyncio
 import datetime
 import logging
-from typing import List, Dict, Optional
+import time
+from types import MappingProxyType
+from typing import List, Dict, Optional, Mapping
+from bson import ObjectId
+from pymongo import DeleteMany, UpdateOne
 
 logger = logging.getLogger(__name__)
 
 
+def _freeze_settings(settings: dict) -> Mapping:
+    """Build a read-only settings snapshot (lists become tuples)"""
+    return MappingProxyType({
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in settings.items()
+    })
+
+
+class UserActivityBuffer:
+    """
+    Write-behind buffer for user upserts and last_active updates
+    
+    Updates are coalesced per user in memory and written as one unordered
+    bulk_write every `flush_interval` seconds or once `max_pending` users
+    are queued, whichever comes first.
+    """
+    
+    def __init__(self, collection, flush_interval: float = 1.0, max_pending: int = 500):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        
+        # Format: {user_id: {"profile": {"first_name": str, "username": str} or None, "last_active": datetime}}
+        self._pending: Dict[int, Dict] = {}
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        
+        # Counters
+        self.flushes = 0
+        self.ops_written = 0
+        self.errors = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+    
+    def queue_user(self, user_id: int, first_name: str, username: str = None):
+        """Queue an upsert of the user profile (joined_date is kept on existing users)"""
+        entry = self._pending.setdefault(user_id, {"profile": None})
+        entry["profile"] = {"first_name": first_name, "username": username, "reachable": True}
+        entry["last_active"] = datetime.datetime.now(datetime.timezone.utc)
+        self._maybe_wake()
+    
+    def queue_activity(self, user_id: int):
+        """Queue a last_active update"""
+        entry = self._pending.setdefault(user_id, {"profile": None})
+        entry["last_active"] = datetime.datetime.now(datetime.timezone.utc)
+        self._maybe_wake()
+    
+    def _maybe_wake(self):
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+    
+    def start(self):
+        """Start the background flush loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the flush loop and write everything still pending"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+    
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+    
+    async def flush(self):
+        """Write all pending updates in a single bulk_write"""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            
+            pending, self._pending = self._pending, {}
+            ops = []
+            for user_id, entry in pending.items():
+                if entry["profile"] is not None:
+                    ops.append(UpdateOne(
+                        {"user_id": user_id},
+                        {
+                            "$set": {**entry["profile"], "last_active": entry["last_active"]},
+                            "$setOnInsert": {"joined_date": entry["last_active"]}
+                        },
+                        upsert=True
+                    ))
+                else:
+                    ops.append(UpdateOne(
+                        {"user_id": user_id},
+                        {"$set": {"last_active": entry["last_active"]}}
+                    ))
+            
+            started = time.perf_counter()
+            try:
+                await self.collection.bulk_write(ops, ordered=False)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error flushing {len(ops)} user updates: {e}")
+                # Put back entries that were not re-queued in the meantime
+                for user_id, entry in pending.items():
+                    current = self._pending.get(user_id)
+                    if current is None:
+                        self._pending[user_id] = entry
+                    elif current["profile"] is None:
+                        current["profile"] = entry["profile"]
+                return 0
+            
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+            self.flushes += 1
+            self.ops_written += len(ops)
+            return len(ops)
+    
+    def get_stats(self) -> Dict:
+        """Get queue depth and flush latency"""
+        return {
+            "queue_depth": len(self._pending),
+            "flushes": self.flushes,
+            "ops_written": self.ops_written,
+            "errors": self.errors,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2)
+        }
+
+
 class Database:
     """MongoDB database operations for File Sharing Bot"""
     
@@ -25,8 +163,33 @@ class Database:
         self.force_sub = None
         self.admins = None
         self.join_requests = None
+        self.broadcasts = None
+        self.users_archive = None
+        self.pending_deletions = None
+        self.links = None
+        self.catalog = None
+        self.catalog_state = None
+        self.file_uniques = None
         self.database_url = database_url
         self.database_name = database_name
+        
+        # Write-through settings cache
+        # Readers get an immutable snapshot, writers bump the version
+        self._settings_snapshot: Optional[Mapping] = None
+        self.settings_version = 0
+        self.settings_cache_hits = 0
+        self.settings_cache_misses = 0
+        
+        # Optional callback(link_id) after a special link is saved or deleted (e.g. cached delivery plans)
+        self.special_link_hook = None
+        
+        # In-memory ban index (user IDs), synced from the banned collection
+        self._banned_ids: Optional[set] = None
+        self._ban_synced_at: Optional[datetime.datetime] = None
+        self._ban_sync_task: Optional[asyncio.Task] = None
+        
+        # Write-behind user buffer (created on connect)
+        self.user_buffer: Optional[UserActivityBuffer] = None
     
     async def connect(self):
         """Connect to MongoDB"""
@@ -43,6 +206,13 @@ class Database:
             self.force_sub = self.db.force_sub
             self.admins = self.db.admins
             self.join_requests = self.db.join_requests
+            self.broadcasts = self.db.broadcasts
+            self.users_archive = self.db.users_archive
+            self.pending_deletions = self.db.pending_deletions
+            self.links = self.db.links
+            self.catalog = self.db.catalog
+            self.catalog_state = self.db.catalog_state
+            self.file_uniques = self.db.file_uniques
             
             # Create indexes for performance
             await self.users.create_index("user_id", unique=True)
@@ -53,6 +223,29 @@ class Database:
             await self.force_sub.create_index("channel_id", unique=True)
             await self.admins.create_index("user_id", unique=True)
             await self.join_requests.create_index([("user_id", 1), ("channel_id", 1)], unique=True)
+            await self.banned.create_index("banned_date")
+            await self.users.create_index("reachable")
+            await self.broadcasts.create_index("job_id", unique=True)
+            await self.broadcasts.create_index("status")
+            await self.pending_deletions.create_index([("chat_id", 1), ("message_id", 1)], unique=True)
+            await self.pending_deletions.create_index("delete_at")
+            await self.links.create_index("key", unique=True)
+            await self.links.create_index([("type", 1), ("ranges", 1)])
+            await self.catalog.create_index([("channel_id", 1), ("message_id", 1)], unique=True)
+            await self.catalog_state.create_index("channel_id", unique=True)
+            await self.file_uniques.create_index([("channel_id", 1), ("file_unique_id", 1)], unique=True)
+            
+            # Load ban index once so ban checks need no query
+            await self.load_ban_index()
+            
+            # Start write-behind buffer for user upserts/activity
+            from config import USER_FLUSH_INTERVAL, USER_FLUSH_MAX_OPS
+            self.user_buffer = UserActivityBuffer(
+                self.users,
+                flush_interval=USER_FLUSH_INTERVAL / 1000,
+                max_pending=USER_FLUSH_MAX_OPS
+            )
+            self.user_buffer.start()
             
             logger.info("✅ Connected to MongoDB successfully")
             return True
@@ -63,6 +256,10 @@ class Database:
     
     async def close(self):
         """Close database connection"""
+        if self._ban_sync_task and not self._ban_sync_task.done():
+            self._ban_sync_task.cancel()
+        if self.user_buffer:
+            await self.user_buffer.stop()
         if self.client:
             self.client.close()
             logger.info("✅ MongoDB connection closed")
@@ -72,19 +269,19 @@ class Database:
     # ===================================
     
     async def add_user(self, user_id: int, first_name: str, username: str = None):
-        """Add new user to database"""
+        """Add new user to database (keeps joined_date of existing users)"""
+        now = datetime.datetime.now(datetime.timezone.utc)
         user_data = {
-            "user_id": user_id,
             "first_name": first_name,
             "username": username,
-            "joined_date": datetime.datetime.now(datetime.timezone.utc),
-            "last_active": datetime.datetime.now(datetime.timezone.utc)
+            "last_active": now,
+            "reachable": True
         }
         
         try:
             await self.users.update_one(
                 {"user_id": user_id},
-                {"$set": user_data},
+                {"$set": user_data, "$setOnInsert": {"joined_date": now}},
                 upsert=True
             )
             return True
@@ -92,6 +289,26 @@ class Database:
             logger.error(f"Error adding user {user_id}: {e}")
             return False
     
+    def queue_user(self, user_id: int, first_name: str, username: str = None):
+        """Queue a user upsert on the write-behind buffer (no I/O)"""
+        if self.user_buffer is None:
+            asyncio.create_task(self.add_user(user_id, first_name, username))
+            return
+        self.user_buffer.queue_user(user_id, first_name, username)
+    
+    def queue_user_activity(self, user_id: int):
+        """Queue a last_active update on the write-behind buffer (no I/O)"""
+        if self.user_buffer is None:
+            asyncio.create_task(self.update_user_activity(user_id))
+            return
+        self.user_buffer.queue_activity(user_id)
+    
+    def get_user_buffer_stats(self) -> Dict:
+        """Get write-behind buffer stats"""
+        if self.user_buffer is None:
+            return {}
+        return self.user_buffer.get_stats()
+    
     async def get_user(self, user_id: int):
         """Get user data"""
         try:
@@ -123,10 +340,18 @@ class Database:
             logger.error(f"Error getting user count: {e}")
             return 0
     
+    async def reachable_users_count(self):
+        """Get count of users the bot can still message"""
+        try:
+            return await self.users.count_documents({"reachable": {"$ne": False}})
+        except Exception as e:
+            logger.error(f"Error getting reachable user count: {e}")
+            return 0
+    
     async def get_all_users(self):
-        """Get all user IDs"""
+        """Get all reachable user IDs"""
         try:
-            cursor = self.users.find({}, {"user_id": 1})
+            cursor = self.users.find({"reachable": {"$ne": False}}, {"user_id": 1})
             user_ids = []
             async for doc in cursor:
                 user_ids.append(doc["user_id"])
@@ -135,6 +360,84 @@ class Database:
             logger.error(f"Error getting all users: {e}")
             return []
     
+    async def get_user_ids_after(self, last_user_id: Optional[int], limit: int) -> List[int]:
+        """
+        Get the next chunk of user IDs in ascending order
+        
+        Used to stream the audience in chunks instead of loading every ID.
+        Users marked unreachable are skipped.
+        """
+        try:
+            query = {"reachable": {"$ne": False}}
+            if last_user_id is not None:
+                query["user_id"] = {"$gt": last_user_id}
+            cursor = self.users.find(query, {"user_id": 1, "_id": 0}).sort("user_id", 1).limit(limit)
+            return [doc["user_id"] async for doc in cursor]
+        except Exception as e:
+            logger.error(f"Error getting user chunk after {last_user_id}: {e}")
+            return []
+    
+    async def mark_users_unreachable(self, reasons: Dict[int, str]):
+        """
+        Mark users the bot can no longer message (blocked / deleted account)
+        
+        Args:
+            reasons: {user_id: error name}
+        """
+        if not reasons:
+            return 0
+        now = datetime.datetime.now(datetime.timezone.utc)
+        ops = [
+            UpdateOne(
+                {"user_id": user_id},
+                {"$set": {"reachable": False, "unreachable_reason": reason, "unreachable_date": now}}
+            )
+            for user_id, reason in reasons.items()
+        ]
+        try:
+            result = await self.users.bulk_write(ops, ordered=False)
+            return result.modified_count
+        except Exception as e:
+            logger.error(f"Error marking {len(ops)} users unreachable: {e}")
+            return 0
+    
+    async def unreachable_users_count(self):
+        """Get count of users marked unreachable"""
+        try:
+            return await self.users.count_documents({"reachable": False})
+        except Exception as e:
+            logger.error(f"Error getting unreachable user count: {e}")
+            return 0
+    
+    async def prune_unreachable_users(self, archive: bool = True):
+        """
+        Remove users marked unreachable
+        
+        Args:
+            archive: Copy them to users_archive before deleting
+        
+        Returns:
+            Number of users removed
+        """
+        try:
+            if archive:
+                batch = []
+                async for doc in self.users.find({"reachable": False}):
+                    doc.pop("_id", None)
+                    doc["archived_date"] = datetime.datetime.now(datetime.timezone.utc)
+                    batch.append(UpdateOne({"user_id": doc["user_id"]}, {"$set": doc}, upsert=True))
+                    if len(batch) >= 1000:
+                        await self.users_archive.bulk_write(batch, ordered=False)
+                        batch = []
+                if batch:
+                    await self.users_archive.bulk_write(batch, ordered=False)
+            
+            result = await self.users.delete_many({"reachable": False})
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"Error pruning unreachable users: {e}")
+            return 0
+    
     async def delete_user(self, user_id: int):
         """Delete user from database"""
         try:
@@ -162,6 +465,8 @@ class Database:
                 {"$set": ban_data},
                 upsert=True
             )
+            if self._banned_ids is not None:
+                self._banned_ids.add(user_id)
             return True
         except Exception as e:
             logger.error(f"Error banning user {user_id}: {e}")
@@ -171,13 +476,18 @@ class Database:
         """Unban a user"""
         try:
             result = await self.banned.delete_one({"user_id": user_id})
+            if self._banned_ids is not None:
+                self._banned_ids.discard(user_id)
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Error unbanning user {user_id}: {e}")
             return False
     
     async def is_user_banned(self, user_id: int):
-        """Check if user is banned"""
+        """Check if user is banned (O(1) lookup once the ban index is loaded)"""
+        if self._banned_ids is not None:
+            return user_id in self._banned_ids
+        
         try:
             ban = await self.banned.find_one({"user_id": user_id})
             return ban is not None
@@ -185,6 +495,73 @@ class Database:
             logger.error(f"Error checking ban status for {user_id}: {e}")
             return False
     
+    async def load_ban_index(self):
+        """Load all banned user IDs into memory (full reload)"""
+        try:
+            synced_at = datetime.datetime.now(datetime.timezone.utc)
+            banned_ids = set()
+            async for doc in self.banned.find({}, {"user_id": 1, "_id": 0}):
+                banned_ids.add(doc["user_id"])
+            
+            self._banned_ids = banned_ids
+            self._ban_synced_at = synced_at
+            logger.info(f"✅ Ban index loaded ({len(banned_ids)} users)")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading ban index: {e}")
+            return False
+    
+    async def sync_ban_index(self):
+        """Pick up bans written by other processes since the last sync"""
+        if self._banned_ids is None or self._ban_synced_at is None:
+            return await self.load_ban_index()
+        
+        try:
+            synced_at = datetime.datetime.now(datetime.timezone.utc)
+            cursor = self.banned.find(
+                {"banned_date": {"$gte": self._ban_synced_at}},
+                {"user_id": 1, "_id": 0}
+            )
+            added = 0
+            async for doc in cursor:
+                if doc["user_id"] not in self._banned_ids:
+                    self._banned_ids.add(doc["user_id"])
+                    added += 1
+            
+            self._ban_synced_at = synced_at
+            if added:
+                logger.info(f"✅ Ban index synced (+{added} users)")
+            return True
+        except Exception as e:
+            logger.error(f"Error syncing ban index: {e}")
+            return False
+    
+    def start_ban_sync(self, interval: int, full_every: int = 10):
+        """
+        Start periodic ban index sync
+        
+        Args:
+            interval: Seconds between delta syncs
+            full_every: Do a full reload every N syncs (catches unbans from other processes)
+        """
+        if interval <= 0 or (self._ban_sync_task and not self._ban_sync_task.done()):
+            return
+        self._ban_sync_task = asyncio.create_task(self._ban_sync_loop(interval, full_every))
+    
+    async def _ban_sync_loop(self, interval: int, full_every: int):
+        """Background loop for start_ban_sync"""
+        rounds = 0
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                rounds += 1
+                if full_every and rounds % full_every == 0:
+                    await self.load_ban_index()
+                else:
+                    await self.sync_ban_index()
+        except asyncio.CancelledError:
+            pass
+    
     async def get_banned_users(self):
         """Get all banned users"""
         try:
@@ -209,6 +586,28 @@ class Database:
     # SETTINGS OPERATIONS
     # ===================================
     
+    def _refresh_settings_cache(self, changes: dict):
+        """Apply written changes to the cached snapshot and bump the version"""
+        self.settings_version += 1
+        if self._settings_snapshot is not None:
+            merged = dict(self._settings_snapshot)
+            merged.update(changes)
+            self._settings_snapshot = _freeze_settings(merged)
+    
+    def invalidate_settings_cache(self):
+        """Drop the cached settings so the next read goes to MongoDB"""
+        self._settings_snapshot = None
+        self.settings_version += 1
+    
+    def get_settings_cache_stats(self) -> Dict:
+        """Get settings cache counters"""
+        return {
+            "version": self.settings_version,
+            "hits": self.settings_cache_hits,
+            "misses": self.settings_cache_misses,
+            "cached": self._settings_snapshot is not None
+        }
+    
     async def save_settings(self, settings: dict):
         """Save bot settings"""
         try:
@@ -217,13 +616,24 @@ class Database:
                 {"$set": settings},
                 upsert=True
             )
+            self._refresh_settings_cache(settings)
             return True
         except Exception as e:
             logger.error(f"Error saving settings: {e}")
             return False
     
     async def get_settings(self):
-        """Get bot settings with THREE separate auto-delete features"""
+        """
+        Get bot settings with THREE separate auto-delete features
+        
+        Served from the in-process snapshot after the first load.
+        The returned mapping is read-only and must not be mutated.
+        """
+        if self._settings_snapshot is not None:
+            self.settings_cache_hits += 1
+            return self._settings_snapshot
+        
+        self.settings_cache_misses += 1
         try:
             settings = await self.settings.find_one({"key": "bot_settings"})
             if not settings:
@@ -234,6 +644,7 @@ class Database:
                     # File protection settings
                     "protect_content": True,
                     "hide_caption": False,
+                    "album_mode": False,          # Send batches as media albums
                     "channel_button": True,
                     
                     # THREE SEPARATE AUTO-DELETE FEATURES
@@ -270,8 +681,9 @@ class Database:
                 }
                 await self.save_settings(default_settings)
                 logger.info("✅ Created default settings with THREE auto-delete features")
-                return default_settings
-            return settings
+                settings = default_settings
+            self._settings_snapshot = _freeze_settings(settings)
+            return self._settings_snapshot
         except Exception as e:
             logger.error(f"Error getting settings: {e}")
             return {}
@@ -284,6 +696,7 @@ class Database:
                 {"$set": {key: value}},
                 upsert=True
             )
+            self._refresh_settings_cache({key: value})
             return True
         except Exception as e:
             logger.error(f"Error updating setting {key}: {e}")
@@ -338,6 +751,9 @@ class Database:
         except Exception as e:
             logger.error(f"Error saving special link {link_id}: {e}")
             return False
+        finally:
+            if self.special_link_hook is not None:
+                self.special_link_hook(link_id)
     
     async def get_special_link(self, link_id: str):
         """Get special link data"""
@@ -355,6 +771,234 @@ class Database:
         except Exception as e:
             logger.error(f"Error deleting special link {link_id}: {e}")
             return False
+        finally:
+            if self.special_link_hook is not None:
+                self.special_link_hook(link_id)
+    
+    # ===================================
+    # STORED LINKS OPERATIONS
+    # ===================================
+    
+    async def save_link(self, key: str, link_type: str, ranges: list, options: dict = None):
+        """
+        Store a link payload under a new key
+        
+        Format: {"key": str, "type": "file" | "batch",
+                 "ranges": [[first_id, last_id], ...], "options": {...}}
+        
+        Returns:
+            False if the key is taken or the write failed
+        """
+        try:
+            await self.links.insert_one({
+                "key": key,
+                "type": link_type,
+                "ranges": ranges,
+                "options": options or {},
+                "created_date": datetime.datetime.now(datetime.timezone.utc)
+            })
+            return True
+        except Exception as e:
+            logger.error(f"Error saving link {key}: {e}")
+            return False
+    
+    async def get_link(self, key: str):
+        """Get stored link payload"""
+        try:
+            return await self.links.find_one({"key": key})
+        except Exception as e:
+            logger.error(f"Error getting link {key}: {e}")
+            return None
+    
+    async def find_link(self, link_type: str, ranges: list, options: dict = None):
+        """Key of a stored link with exactly this payload (None if there is none)"""
+        try:
+            doc = await self.links.find_one(
+                {"type": link_type, "ranges": ranges, "options": options or {}},
+                {"_id": 0, "key": 1}
+            )
+            return doc["key"] if doc else None
+        except Exception as e:
+            logger.error(f"Error finding {link_type} link: {e}")
+            return None
+    
+    # ===================================
+    # MEDIA CATALOG OPERATIONS
+    # ===================================
+    
+    async def save_catalog_entries(self, channel_id: int, entries: Dict[int, dict]):
+        """
+        Upsert catalog entries of database channel messages
+        
+        Format: {message_id: {"media_type": str, "file_id": str, "file_unique_id": str,
+                              "file_size": int, "file_name": str, "duration": int, "caption": str}}
+        """
+        if not entries:
+            return 0
+        
+        ops = [
+            UpdateOne(
+                {"channel_id": channel_id, "message_id": message_id},
+                {"$set": entry},
+                upsert=True
+            )
+            for message_id, entry in entries.items()
+        ]
+        try:
+            await self.catalog.bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.error(f"Error saving {len(ops)} catalog entries: {e}")
+            return 0
+        
+        # First stored message of each file stays the one links point to
+        unique_ops = [
+            UpdateOne(
+                {"channel_id": channel_id, "file_unique_id": entry["file_unique_id"]},
+                {"$setOnInsert": {"message_id": message_id}},
+                upsert=True
+            )
+            for message_id, entry in entries.items()
+            if entry.get("file_unique_id")
+        ]
+        if unique_ops:
+            try:
+                await self.file_uniques.bulk_write(unique_ops, ordered=False)
+            except Exception as e:
+                # Concurrent upserts of the same file can race, the first one wins
+                logger.debug(f"Error saving file_unique_id index: {e}")
+        return len(ops)
+    
+    async def get_stored_file(self, channel_id: int, file_unique_id: str) -> Optional[int]:
+        """Message ID of a file already stored in the channel (None if new)"""
+        try:
+            doc = await self.file_uniques.find_one({"channel_id": channel_id, "file_unique_id": file_unique_id})
+            return doc["message_id"] if doc else None
+        except Exception as e:
+            logger.error(f"Error looking up file {file_unique_id}: {e}")
+            return None
+    
+    async def rebuild_file_uniques(self, channel_id: int) -> Dict[int, List[int]]:
+        """
+        Rebuild the file_unique_id index from the catalog
+        
+        Each file points to its lowest message ID, entries of files no
+        longer in the catalog are deleted.
+        
+        Returns:
+            {kept message_id: [duplicate message IDs]} for files stored more than once
+        """
+        pipeline = [
+            {"$match": {"channel_id": channel_id, "file_unique_id": {"$type": "string"}}},
+            {"$group": {"_id": "$file_unique_id", "ids": {"$push": "$message_id"}}}
+        ]
+        # Every rebuilt entry gets this stamp, whatever is left without it is stale
+        rebuild_id = ObjectId()
+        ops = []
+        duplicates = {}
+        try:
+            async for group in self.catalog.aggregate(pipeline, allowDiskUse=True):
+                ids = sorted(group["ids"])
+                ops.append(UpdateOne(
+                    {"channel_id": channel_id, "file_unique_id": group["_id"]},
+                    {"$set": {"message_id": ids[0], "rebuild_id": rebuild_id}},
+                    upsert=True
+                ))
+                if len(ids) > 1:
+                    duplicates[ids[0]] = ids[1:]
+            
+            for i in range(0, len(ops), 1000):
+                await self.file_uniques.bulk_write(ops[i:i + 1000], ordered=False)
+            
+            result = await self.file_uniques.delete_many(
+                {"channel_id": channel_id, "rebuild_id": {"$ne": rebuild_id}}
+            )
+            if result.deleted_count:
+                logger.info(f"Dropped {result.deleted_count} stale file_unique_id entries of {channel_id}")
+            return duplicates
+        except Exception as e:
+            logger.error(f"Error rebuilding file_unique_id index: {e}")
+            return {}
+    
+    async def get_catalog_entries(self, channel_id: int, message_ids: List[int]) -> Dict[int, dict]:
+        """Get catalog entries by message ID"""
+        try:
+            cursor = self.catalog.find(
+                {"channel_id": channel_id, "message_id": {"$in": list(message_ids)}},
+                {"_id": 0, "channel_id": 0}
+            )
+            return {doc.pop("message_id"): doc async for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error getting catalog entries: {e}")
+            return {}
+    
+    async def delete_catalog_entries(self, channel_id: int, message_ids: List[int]):
+        """Remove entries of deleted channel messages"""
+        try:
+            query = {"channel_id": channel_id, "message_id": {"$in": list(message_ids)}}
+            result = await self.catalog.delete_many(query)
+            await self.file_uniques.delete_many(query)
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"Error deleting catalog entries: {e}")
+            return 0
+    
+    async def get_catalog_ids(self, channel_id: int, exclude_types: tuple = ()) -> List[int]:
+        """Indexed message IDs of a channel (optionally without some media types)"""
+        query = {"channel_id": channel_id}
+        if exclude_types:
+            query["media_type"] = {"$nin": list(exclude_types)}
+        try:
+            cursor = self.catalog.find(query, {"_id": 0, "message_id": 1})
+            return [doc["message_id"] async for doc in cursor]
+        except Exception as e:
+            logger.error(f"Error getting catalog IDs: {e}")
+            return []
+    
+    async def get_catalog_search_entries(self, channel_id: int) -> List[dict]:
+        """
+        Searchable fields of a channel's cataloged files, oldest first
+        
+        Format: [{"message_id": int, "media_type": str, "file_name": str, "caption": str}]
+        """
+        try:
+            cursor = self.catalog.find(
+                {"channel_id": channel_id, "file_id": {"$type": "string"}},
+                {"_id": 0, "message_id": 1, "media_type": 1, "file_name": 1, "caption": 1}
+            ).sort("message_id", 1)
+            return [doc async for doc in cursor]
+        except Exception as e:
+            logger.error(f"Error getting catalog search entries: {e}")
+            return []
+    
+    async def get_catalog_indexed_to(self, channel_id: int) -> int:
+        """Highest message ID the indexer has scanned up to (0 if never)"""
+        try:
+            doc = await self.catalog_state.find_one({"channel_id": channel_id})
+            return doc["indexed_to"] if doc else 0
+        except Exception as e:
+            logger.error(f"Error getting catalog state: {e}")
+            return 0
+    
+    async def set_catalog_indexed_to(self, channel_id: int, indexed_to: int):
+        """Save how far the indexer has scanned"""
+        try:
+            await self.catalog_state.update_one(
+                {"channel_id": channel_id},
+                {"$set": {"indexed_to": indexed_to, "updated_date": datetime.datetime.now(datetime.timezone.utc)}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving catalog state: {e}")
+            return False
+    
+    async def catalog_count(self, channel_id: int) -> int:
+        """Number of indexed messages of a channel"""
+        try:
+            return await self.catalog.count_documents({"channel_id": channel_id})
+        except Exception as e:
+            logger.error(f"Error counting catalog: {e}")
+            return 0
     
     # ===================================
     # FORCE SUBSCRIBE OPERATIONS
@@ -403,6 +1047,23 @@ class Database:
             logger.error(f"Error getting force sub channels: {e}")
             return []
     
+    async def get_force_sub_channel_info(self):
+        """Get force subscribe channels with cached invite link and metadata"""
+        try:
+            return [doc async for doc in self.force_sub.find({}, {"_id": 0})]
+        except Exception as e:
+            logger.error(f"Error getting force sub channel info: {e}")
+            return []
+    
+    async def update_force_sub_channel_info(self, channel_id: int, info: dict):
+        """Store invite link / title / username of a force subscribe channel"""
+        try:
+            await self.force_sub.update_one({"channel_id": channel_id}, {"$set": info})
+            return True
+        except Exception as e:
+            logger.error(f"Error updating force sub channel {channel_id}: {e}")
+            return False
+    
     async def clear_force_sub_channels(self):
         """Clear all force subscribe channels"""
         try:
@@ -412,6 +1073,105 @@ class Database:
             logger.error(f"Error clearing force sub channels: {e}")
             return False
     
+    # ===================================
+    # BROADCAST OPERATIONS
+    # ===================================
+    
+    async def create_broadcast(self, job: dict):
+        """Save a new broadcast job"""
+        try:
+            await self.broadcasts.insert_one(dict(job))
+            return True
+        except Exception as e:
+            logger.error(f"Error creating broadcast {job.get('job_id')}: {e}")
+            return False
+    
+    async def update_broadcast(self, job_id: str, fields: dict):
+        """Update broadcast job fields (checkpoint, counters, status)"""
+        try:
+            fields = dict(fields)
+            fields["updated_date"] = datetime.datetime.now(datetime.timezone.utc)
+            await self.broadcasts.update_one({"job_id": job_id}, {"$set": fields})
+            return True
+        except Exception as e:
+            logger.error(f"Error updating broadcast {job_id}: {e}")
+            return False
+    
+    async def get_broadcast(self, job_id: str):
+        """Get broadcast job"""
+        try:
+            return await self.broadcasts.find_one({"job_id": job_id})
+        except Exception as e:
+            logger.error(f"Error getting broadcast {job_id}: {e}")
+            return None
+    
+    async def get_running_broadcasts(self):
+        """Get broadcast jobs that have not finished (to resume after restart)"""
+        try:
+            return [doc async for doc in self.broadcasts.find({"status": "running"})]
+        except Exception as e:
+            logger.error(f"Error getting running broadcasts: {e}")
+            return []
+    
+    # ===================================
+    # PENDING DELETION OPERATIONS
+    # ===================================
+    
+    async def save_pending_deletions(self, entries: Dict[tuple, datetime.datetime]):
+        """
+        Persist scheduled file deletions (one bulk write)
+        
+        Args:
+            entries: {(chat_id, message_id): delete_at}
+        """
+        if not entries:
+            return True
+        ops = [
+            UpdateOne(
+                {"chat_id": chat_id, "message_id": message_id},
+                {"$set": {"delete_at": delete_at}},
+                upsert=True
+            )
+            for (chat_id, message_id), delete_at in entries.items()
+        ]
+        try:
+            await self.pending_deletions.bulk_write(ops, ordered=False)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving {len(ops)} pending deletions: {e}")
+            return False
+    
+    async def remove_pending_deletions(self, deletions: Dict[int, Optional[List[int]]]):
+        """
+        Remove done or cancelled deletions (one bulk write)
+        
+        Args:
+            deletions: {chat_id: [message_id]} (None removes all of the chat)
+        """
+        if not deletions:
+            return True
+        ops = []
+        for chat_id, message_ids in deletions.items():
+            query = {"chat_id": chat_id}
+            if message_ids is not None:
+                query["message_id"] = {"$in": list(message_ids)}
+            ops.append(DeleteMany(query))
+        try:
+            await self.pending_deletions.bulk_write(ops, ordered=False)
+            return True
+        except Exception as e:
+            logger.error(f"Error removing pending deletions: {e}")
+            return False
+    
+    async def get_pending_deletions(self):
+        """Get all persisted deletions ordered by delete_at"""
+        try:
+            cursor = self.pending_deletions.find({}, {"_id": 0}).sort("delete_at", 1)
+            return [doc async for doc in cursor]
+        except Exception as e:
+            logger.error(f"Error getting pending deletions: {e}")
+            return []
+    
     # ===================================
     # ADMIN OPERATIONS
     # ===================================
@@ -4,14 +4,58 @@ Features Package
 
 Advanced bot features:
 - auto_delete.py: THREE auto-delete features system
-- broadcast.py: Broadcast messaging system
+- delivery.py: Background batch delivery queue
+- delivery_plans.py: Cache of resolved start links
+- deliverable_ids.py: Bitmap of deliverable database channel messages
+- rate_limiter.py: Outbound rate limiter and FloodWait governor
+- broadcast.py: Resumable concurrent broadcast engine
+- channel_health.py: Cached admin check for the database channel
+- recipient_pruner.py: Marks blocked/deleted users unreachable
+- membership.py: Force-sub membership cache
+- invite_links.py: Force-sub invite link and channel metadata pool
+- link_store.py: Stored short links for files and batches
+- media_catalog.py: file_id catalog of database channel messages
+- catalog_indexer.py: Indexes the database channel into the catalog
+- search_index.py: File name/caption search index
+- bulk_ingest.py: Many files to links at once (/ingest)
 - batch.py: Batch file operations
 
 Each feature is self-contained and can be easily enabled/disabled.
 """
 
 from .auto_delete import AutoDeleteManager
+from .broadcast import BroadcastEngine
+from .bulk_ingest import BulkIngest
+from .catalog_indexer import CatalogIndexer
+from .channel_health import ChannelHealth
+from .deliverable_ids import DeliverableIds
+from .delivery import DeliveryJob, DeliveryQueue
+from .delivery_plans import DeliveryPlanCache
+from .invite_links import InviteLinkPool
+from .link_store import LinkStore
+from .media_catalog import MediaCatalog
+from .membership import MembershipCache, PendingDeepLinks
+from .rate_limiter import OutboundGovernor, TokenBucket
+from .recipient_pruner import RecipientPruner
+from .search_index import SearchIndex
 
 __all__ = [
     'AutoDeleteManager',
+    'BroadcastEngine',
+    'BulkIngest',
+    'CatalogIndexer',
+    'ChannelHealth',
+    'DeliverableIds',
+    'DeliveryJob',
+    'DeliveryPlanCache',
+    'DeliveryQueue',
+    'InviteLinkPool',
+    'LinkStore',
+    'MediaCatalog',
+    'MembershipCache',
+    'OutboundGovernor',
+    'PendingDeepLinks',
+    'RecipientPruner',
+    'SearchIndex',
+    'TokenBucket',
 ]
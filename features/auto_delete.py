@@ -12,7 +12,13 @@ FEATURE 1: Clean Conversation
 FEATURE 2: Auto Delete Files
     - Deletes file messages after specified time
     - User-configurable timer (60s to 1 hour)
-    - Tracks: user_file_messages = {user_id: [{"message_id": int, "delete_at": datetime, "task": Task}]}
+    - One scheduler task for all users: a heap of (deadline, chat_id, message_id)
+      that only wakes when the earliest deadline is due
+    - Messages due within the same coalesce window are deleted with one
+      delete_messages call per chat (up to 100 IDs per call)
+    - Schedules are persisted in bulk to the pending_deletions collection and
+      restored on startup, so a restart never leaves files behind
+    - Tracks: user_file_messages = {user_id: {message_id: deadline}}
 
 FEATURE 3: Show Instruction After Deletion
     - Shows instruction message with resend button after files deleted
@@ -24,14 +30,18 @@ All features work independently and can be toggled separately.
 
 import asyncio
 import datetime
+import heapq
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pyrogram import enums
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.errors import MessageDeleteForbidden, MessageIdInvalid
 
 logger = logging.getLogger(__name__)
 
+# Telegram accepts at most 100 message IDs per delete_messages call
+MAX_DELETE_IDS = 100
+
 
 class AutoDeleteManager:
     """
@@ -41,14 +51,18 @@ class AutoDeleteManager:
     All tracking dictionaries are stored in the bot instance.
     """
     
-    def __init__(self, bot):
+    def __init__(self, bot, coalesce_window: float = 1.0, persist_interval: float = 1.0):
         """
         Initialize Auto-Delete Manager
         
         Args:
             bot: Bot instance to manage auto-delete features for
+            coalesce_window: Messages due within this many seconds are deleted together
+            persist_interval: Seconds new schedules are buffered before one bulk write
         """
         self.bot = bot
+        self.coalesce_window = coalesce_window
+        self.persist_interval = persist_interval
         
         # ===================================
         # FEATURE 1: Clean Conversation
@@ -60,9 +74,22 @@ class AutoDeleteManager:
         # ===================================
         # FEATURE 2: Auto Delete Files
         # ===================================
-        # Track file messages with delete timers
-        # Format: {user_id: [{"message_id": int, "delete_at": datetime, "task": asyncio.Task}]}
-        self.user_file_messages: Dict[int, List[Dict]] = {}
+        # Track file messages with delete deadlines (event loop time)
+        # Format: {user_id: {message_id: deadline}}
+        self.user_file_messages: Dict[int, Dict[int, float]] = {}
+        
+        # Deletion heap shared by all users. Cancelled entries stay in the
+        # heap and are skipped when popped (their deadline no longer matches).
+        # Format: [(deadline, chat_id, message_id)]
+        self._deletion_heap: List[Tuple[float, int, int]] = []
+        self._scheduled_count = 0
+        self._deletion_wakeup: Optional[asyncio.Event] = None
+        self._deletion_task: Optional[asyncio.Task] = None
+        
+        # Schedules not yet written to the pending_deletions collection
+        # Format: {(chat_id, message_id): delete_at}
+        self._unsaved: Dict[Tuple[int, int], datetime.datetime] = {}
+        self._persist_task: Optional[asyncio.Task] = None
         
         # ===================================
         # FEATURE 3: Show Instruction
@@ -146,68 +173,200 @@ class AutoDeleteManager:
             delete_after: Time in seconds before deletion
         """
         try:
-            # Calculate deletion time
-            delete_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=delete_after)
-            
-            # Create deletion task
-            task = asyncio.create_task(self._delete_file_after_delay(user_id, message_id, delete_after))
+            self.start()
             
-            # Store file message info
-            if user_id not in self.user_file_messages:
-                self.user_file_messages[user_id] = []
+            # Calculate deletion time
+            deadline = asyncio.get_running_loop().time() + delete_after
+            self._arm(user_id, message_id, deadline)
             
-            self.user_file_messages[user_id].append({
-                "message_id": message_id,
-                "delete_at": delete_at,
-                "task": task
-            })
+            # Persist with the next bulk write
+            delete_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=delete_after)
+            self._unsaved[(user_id, message_id)] = delete_at
+            if self._persist_task is None or self._persist_task.done():
+                self._persist_task = asyncio.create_task(self._persist_later())
             
             logger.info(f"✓ Scheduled file message {message_id} for deletion in {delete_after}s for user {user_id}")
             
         except Exception as e:
             logger.error(f"Error scheduling file deletion: {e}")
     
-    async def _delete_file_after_delay(self, user_id: int, message_id: int, delay: int):
+    async def schedule_file_deletions(self, user_id: int, message_ids: List[int], delete_after: int):
         """
         FEATURE 2: Auto Delete Files
         
-        Internal method to delete file message after delay.
+        Schedule several file messages (e.g. an album) with one deadline.
         
         Args:
             user_id: User ID
-            message_id: Message ID to delete
-            delay: Delay in seconds
+            message_ids: Message IDs to delete
+            delete_after: Time in seconds before deletion
+        """
+        for message_id in message_ids:
+            await self.schedule_file_deletion(user_id, message_id, delete_after)
+    
+    def _arm(self, user_id: int, message_id: int, deadline: float):
+        """Put a deletion on the in-process scheduler"""
+        # Store file message info (rescheduling a message replaces its deadline)
+        pending = self.user_file_messages.setdefault(user_id, {})
+        if message_id not in pending:
+            self._scheduled_count += 1
+        pending[message_id] = deadline
+        
+        # Wake the scheduler only if this is the new earliest deadline
+        if not self._deletion_heap or deadline < self._deletion_heap[0][0]:
+            self._deletion_wakeup.set()
+        heapq.heappush(self._deletion_heap, (deadline, user_id, message_id))
+    
+    async def _persist_later(self):
+        await asyncio.sleep(self.persist_interval)
+        await self.persist_schedules()
+    
+    async def persist_schedules(self):
+        """Write buffered schedules to the pending_deletions collection"""
+        if not self._unsaved:
+            return
+        entries, self._unsaved = self._unsaved, {}
+        if not await self.bot.db.save_pending_deletions(entries):
+            # Keep them for the next write
+            for key, delete_at in entries.items():
+                self._unsaved.setdefault(key, delete_at)
+    
+    async def restore_schedules(self):
+        """
+        FEATURE 2: Auto Delete Files
+        
+        Reload persisted deletions after a restart. Overdue messages are
+        deleted right away (bulk, per chat) and the rest are re-armed.
         """
         try:
-            # Wait for the specified delay
-            await asyncio.sleep(delay)
+            self.start()
+            loop = asyncio.get_running_loop()
+            now = datetime.datetime.now(datetime.timezone.utc)
+            
+            # Format: {chat_id: [message_id]}
+            overdue: Dict[int, List[int]] = {}
+            restored = 0
+            for doc in await self.bot.db.get_pending_deletions():
+                delete_at = doc["delete_at"]
+                if delete_at.tzinfo is None:
+                    delete_at = delete_at.replace(tzinfo=datetime.timezone.utc)
+                
+                remaining = (delete_at - now).total_seconds()
+                if remaining <= 0:
+                    overdue.setdefault(doc["chat_id"], []).append(doc["message_id"])
+                else:
+                    self._arm(doc["chat_id"], doc["message_id"], loop.time() + remaining)
+                    restored += 1
+            
+            for chat_id, message_ids in overdue.items():
+                await self._delete_files(chat_id, message_ids)
+            await self.bot.db.remove_pending_deletions(overdue)
+            
+            logger.info(
+                f"✓ Restored {restored} scheduled deletions, "
+                f"deleted {sum(len(ids) for ids in overdue.values())} overdue files"
+            )
+            
+        except Exception as e:
+            logger.error(f"Error restoring scheduled deletions: {e}")
+    
+    def start(self):
+        """Start the deletion scheduler (idempotent)"""
+        if self._deletion_task is None or self._deletion_task.done():
+            self._deletion_wakeup = asyncio.Event()
+            self._deletion_task = asyncio.create_task(self._run_deletions())
+    
+    async def stop(self):
+        """Stop the deletion scheduler (persisted schedules resume on next start)"""
+        for task in (self._deletion_task, self._persist_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._deletion_task = None
+        self._persist_task = None
+        await self.persist_schedules()
+    
+    async def _run_deletions(self):
+        """
+        FEATURE 2: Auto Delete Files
+        
+        Scheduler loop: sleeps until the earliest deadline (or until an
+        earlier one is scheduled), then deletes everything due within the
+        coalesce window in one tick.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            self._deletion_wakeup.clear()
+            
+            if not self._deletion_heap:
+                await self._deletion_wakeup.wait()
+                continue
             
-            # Delete the file message
-            await self.bot.delete_messages(user_id, message_id)
-            logger.info(f"✓ Auto-deleted file message {message_id} for user {user_id}")
+            delay = self._deletion_heap[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._deletion_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
             
-            # Remove from tracking
-            if user_id in self.user_file_messages:
-                self.user_file_messages[user_id] = [
-                    msg for msg in self.user_file_messages[user_id]
-                    if msg["message_id"] != message_id
-                ]
+            # Collect everything due in this tick, grouped per chat
+            # Format: {user_id: [message_id]}
+            due: Dict[int, List[int]] = {}
+            horizon = loop.time() + self.coalesce_window
+            while self._deletion_heap and self._deletion_heap[0][0] <= horizon:
+                deadline, user_id, message_id = heapq.heappop(self._deletion_heap)
                 
-                # Clean up empty list
-                if not self.user_file_messages[user_id]:
+                # Skip cancelled / rescheduled entries
+                pending = self.user_file_messages.get(user_id)
+                if not pending or pending.get(message_id) != deadline:
+                    continue
+                
+                del pending[message_id]
+                self._scheduled_count -= 1
+                if not pending:
                     del self.user_file_messages[user_id]
+                
+                due.setdefault(user_id, []).append(message_id)
             
-            # FEATURE 3: Show instruction after files are deleted
-            await self.show_instruction_after_deletion(user_id)
+            for user_id, message_ids in due.items():
+                await self._delete_files(user_id, message_ids)
+            self._forget(due)
+            await self.bot.db.remove_pending_deletions(due)
+    
+    async def _delete_files(self, user_id: int, message_ids: List[int]):
+        """
+        FEATURE 2: Auto Delete Files
+        
+        Internal method to delete due file messages of one chat,
+        up to MAX_DELETE_IDS per API call.
+        
+        Args:
+            user_id: User ID
+            message_ids: Message IDs to delete
+        """
+        deleted = 0
+        for i in range(0, len(message_ids), MAX_DELETE_IDS):
+            chunk = message_ids[i:i + MAX_DELETE_IDS]
+            try:
+                # Delete the file messages
+                await self.bot.delete_messages(user_id, chunk)
+                deleted += len(chunk)
+            except MessageDeleteForbidden:
+                logger.warning(f"Cannot delete {len(chunk)} file messages for user {user_id}")
+            except MessageIdInvalid:
+                logger.warning(f"File messages already deleted for user {user_id}")
+            except Exception as e:
+                logger.error(f"Error deleting {len(chunk)} file messages for user {user_id}: {e}")
+        
+        if deleted:
+            logger.info(f"✓ Auto-deleted {deleted} file messages for user {user_id}")
             
-        except MessageDeleteForbidden:
-            logger.warning(f"Cannot delete file message {message_id} for user {user_id}")
-        except MessageIdInvalid:
-            logger.warning(f"File message {message_id} already deleted for user {user_id}")
-        except asyncio.CancelledError:
-            logger.info(f"File deletion cancelled for message {message_id}")
-        except Exception as e:
-            logger.error(f"Error deleting file message {message_id}: {e}")
+            # FEATURE 3: Show instruction once per deleted batch
+            await self.show_instruction_after_deletion(user_id)
     
     async def cancel_file_deletions(self, user_id: int):
         """
@@ -219,18 +378,31 @@ class AutoDeleteManager:
             user_id: User ID to cancel deletions for
         """
         try:
-            if user_id in self.user_file_messages:
-                for msg_info in self.user_file_messages[user_id]:
-                    task = msg_info.get("task")
-                    if task and not task.done():
-                        task.cancel()
+            pending = self.user_file_messages.pop(user_id, None)
+            if pending:
+                self._scheduled_count -= len(pending)
+                self._forget({user_id: pending})
+                await self.bot.db.remove_pending_deletions({user_id: None})
+                
+                # Drop cancelled entries once they make up most of the heap
+                if len(self._deletion_heap) > 1024 and len(self._deletion_heap) > 2 * self._scheduled_count:
+                    self._deletion_heap = [
+                        entry for entry in self._deletion_heap
+                        if self.user_file_messages.get(entry[1], {}).get(entry[2]) == entry[0]
+                    ]
+                    heapq.heapify(self._deletion_heap)
                 
-                del self.user_file_messages[user_id]
                 logger.info(f"✓ Cancelled all file deletions for user {user_id}")
                 
         except Exception as e:
             logger.error(f"Error cancelling file deletions for user {user_id}: {e}")
     
+    def _forget(self, deletions: Dict[int, List[int]]):
+        """Drop finished/cancelled deletions that were not written yet"""
+        for chat_id, message_ids in deletions.items():
+            for message_id in message_ids:
+                self._unsaved.pop((chat_id, message_id), None)
+    
     # ===================================
     # FEATURE 3: SHOW INSTRUCTION METHODS
     # ===================================
@@ -419,7 +591,8 @@ class AutoDeleteManager:
             },
             "auto_delete_files": {
                 "tracked_users": len(self.user_file_messages),
-                "total_scheduled": sum(len(msgs) for msgs in self.user_file_messages.values())
+                "total_scheduled": self._scheduled_count,
+                "heap_size": len(self._deletion_heap)
             },
             "show_instruction": {
                 "shown_users": len(self.user_instruction_message)
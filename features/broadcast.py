@@ -0,0 +1,199 @@
+"""
+Broadcast Engine
+================
+
+Resumable, concurrent broadcasts.
+
+- Users are streamed from MongoDB in chunks (never the whole list in memory)
+- Each chunk is sent by N concurrent senders under the outbound rate limits
+- After every chunk the job document stores a checkpoint (last user_id),
+  so a restart resumes where it left off
+- Status message edits are throttled
+- Users who blocked the bot / deleted their account are counted
+  separately from transient failures (and marked unreachable by the
+  recipient pruner, so the next broadcast skips them)
+
+Job document format (broadcasts collection):
+    {"job_id": str, "status": "running" | "done" | "cancelled",
+     "from_chat_id": int, "message_id": int,
+     "status_chat_id": int, "status_message_id": int,
+     "last_user_id": int | None, "total": int,
+     "success": int, "blocked": int, "deactivated": int, "failed": int}
+"""
+
+import asyncio
+import datetime
+import logging
+import random
+import string
+import time
+from typing import Dict
+from pyrogram.errors import UserIsBlocked, InputUserDeactivated, PeerIdInvalid
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("success", "blocked", "deactivated", "failed")
+
+
+class BroadcastEngine:
+    """Runs broadcast jobs as background tasks"""
+
+    def __init__(self, bot, concurrency: int = 10, chunk_size: int = 500, status_interval: float = 10.0):
+        """
+        Initialize Broadcast Engine
+
+        Args:
+            bot: Bot instance (outbound calls are rate limited by its governor)
+            concurrency: Concurrent senders per job
+            chunk_size: Users read from MongoDB per chunk (one checkpoint per chunk)
+            status_interval: Minimum seconds between status message edits
+        """
+        self.bot = bot
+        self.concurrency = max(1, concurrency)
+        self.chunk_size = chunk_size
+        self.status_interval = status_interval
+
+        # Format: {job_id: asyncio.Task}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        # Format: {job_id: job document}
+        self.jobs: Dict[str, Dict] = {}
+
+    async def start_broadcast(self, source_message, status_message) -> Dict:
+        """
+        Create and start a broadcast of source_message to all users
+
+        Args:
+            source_message: Message to copy to every user
+            status_message: Message edited with progress
+        """
+        job = {
+            "job_id": "".join(random.choices(string.ascii_letters + string.digits, k=8)),
+            "status": "running",
+            "from_chat_id": source_message.chat.id,
+            "message_id": source_message.id,
+            "status_chat_id": status_message.chat.id,
+            "status_message_id": status_message.id,
+            "last_user_id": None,
+            "total": await self.bot.db.reachable_users_count(),
+            "created_date": datetime.datetime.now(datetime.timezone.utc),
+        }
+        for counter in COUNTERS:
+            job[counter] = 0
+
+        await self.bot.db.create_broadcast(job)
+        self._spawn(job)
+        return job
+
+    async def resume_pending(self):
+        """Resume broadcasts that were running when the bot stopped"""
+        for job in await self.bot.db.get_running_broadcasts():
+            if job["job_id"] not in self.tasks:
+                logger.info(f"Resuming broadcast {job['job_id']} after user {job.get('last_user_id')}")
+                self._spawn(job)
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a running broadcast"""
+        task = self.tasks.get(job_id)
+        if not task:
+            return False
+        task.cancel()
+        await self.bot.db.update_broadcast(job_id, {"status": "cancelled"})
+        return True
+
+    async def stop(self):
+        """Stop all broadcast tasks (jobs stay 'running' and resume on next start)"""
+        for task in list(self.tasks.values()):
+            task.cancel()
+        for task in list(self.tasks.values()):
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _spawn(self, job: Dict):
+        self.jobs[job["job_id"]] = job
+        self.tasks[job["job_id"]] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Dict):
+        job_id = job["job_id"]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_status = 0.0
+
+        async def send(user_id: int) -> str:
+            async with semaphore:
+                return await self._send(job, user_id)
+
+        try:
+            while True:
+                user_ids = await self.bot.db.get_user_ids_after(job["last_user_id"], self.chunk_size)
+                if not user_ids:
+                    break
+
+                results = await asyncio.gather(*(send(user_id) for user_id in user_ids))
+                for result in results:
+                    job[result] += 1
+
+                # Checkpoint after the whole chunk is done
+                job["last_user_id"] = user_ids[-1]
+                await self.bot.db.update_broadcast(job_id, {
+                    "last_user_id": job["last_user_id"],
+                    **{counter: job[counter] for counter in COUNTERS}
+                })
+
+                if time.monotonic() - last_status >= self.status_interval:
+                    last_status = time.monotonic()
+                    await self._edit_status(job, "📢 <b>Broadcasting...</b>")
+
+            job["status"] = "done"
+            await self.bot.db.update_broadcast(job_id, {"status": "done"})
+            await self._edit_status(job, "✅ <b>Broadcast Complete!</b>")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast {job_id} stopped with error: {e}")
+        finally:
+            self.tasks.pop(job_id, None)
+            self.jobs.pop(job_id, None)
+
+    async def _send(self, job: Dict, user_id: int) -> str:
+        """Copy the broadcast message to one user and classify the result"""
+        try:
+            await self.bot.copy_message(
+                chat_id=user_id,
+                from_chat_id=job["from_chat_id"],
+                message_id=job["message_id"]
+            )
+            return "success"
+        except (UserIsBlocked, PeerIdInvalid):
+            return "blocked"
+        except InputUserDeactivated:
+            return "deactivated"
+        except Exception as e:
+            logger.debug(f"Broadcast {job['job_id']} failed for {user_id}: {e}")
+            return "failed"
+
+    async def _edit_status(self, job: Dict, title: str):
+        processed = sum(job[counter] for counter in COUNTERS)
+        try:
+            await self.bot.edit_message_text(
+                job["status_chat_id"],
+                job["status_message_id"],
+                f"{title}\n\n"
+                f"<blockquote>"
+                f"<b>✅ Success:</b> {job['success']:,}\n"
+                f"<b>🚫 Blocked:</b> {job['blocked']:,}\n"
+                f"<b>👻 Deleted accounts:</b> {job['deactivated']:,}\n"
+                f"<b>❌ Failed:</b> {job['failed']:,}\n"
+                f"<b>📊 Progress:</b> {processed:,} / {job['total']:,}"
+                f"</blockquote>"
+            )
+        except Exception as e:
+            logger.debug(f"Could not edit broadcast status: {e}")
+
+    def get_status(self) -> Dict:
+        """Get running broadcast jobs"""
+        return {
+            job_id: {counter: job[counter] for counter in COUNTERS + ("total",)}
+            for job_id, job in self.jobs.items()
+        }
@@ -0,0 +1,329 @@
+"""
+Bulk Ingest
+===========
+
+Turns a stream of files into links in one go (/ingest).
+
+An admin starts a session and forwards or uploads files to the bot.
+
+- Files are forwarded to the database channel in chunks of up to 100
+  with one request per chunk (paced by the outbound governor, which
+  also waits out FloodWait)
+- Files already in the channel (same file_unique_id) are not stored
+  again, and repeats within the session are skipped
+- Finishing returns one row per file, batch links of up to
+  MAX_BATCH_SIZE files covering all of them and the throughput
+- Files that failed to forward can be sent again in the same session
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import time
+from typing import Dict, List, Optional
+from pyrogram import enums
+
+from config import MAX_BATCH_SIZE
+from features.media_catalog import catalog_entry
+
+logger = logging.getLogger(__name__)
+
+# forward_messages IDs per request
+MAX_FORWARD_MESSAGES = 100
+
+# Row status
+STORED = "stored"
+EXISTING = "existing"
+FAILED = "failed"
+
+
+class IngestSession:
+    """
+    Files collected by one admin
+
+    Args:
+        user_id: Admin running the session
+        progress_message: Message edited with progress (optional)
+    """
+
+    def __init__(self, user_id: int, progress_message=None):
+        self.user_id = user_id
+        self.progress_message = progress_message
+
+        # Files waiting to be forwarded
+        self.pending: list = []
+
+        # Format: {file_unique_id: stored message_id or None while pending}
+        # (failed files are dropped, so sending them again retries)
+        self.seen: Dict[str, Optional[int]] = {}
+
+        # Format: [{"source_id", "message_id", "status", "media_type", "file_name", "file_size", "link"}]
+        self.rows: List[Dict] = []
+        self.duplicates = 0
+
+        # Format: {file_unique_id: failed row}, replaced when the file is sent again
+        self.failed: Dict[str, Dict] = {}
+
+        # Chunks are forwarded one at a time, in order
+        self.lock = asyncio.Lock()
+
+        self.started_at: Optional[float] = None
+
+    @property
+    def received(self) -> int:
+        return len(self.rows) + len(self.pending) + self.duplicates
+
+
+class BulkIngest:
+    """Bulk file ingest sessions, one per admin"""
+
+    def __init__(self, bot, chunk_size: int = MAX_FORWARD_MESSAGES):
+        """
+        Initialize Bulk Ingest
+
+        Args:
+            bot: Bot instance (uses bot.db_channel, bot.media_catalog,
+                 bot.catalog_indexer and bot.link_store)
+            chunk_size: Files forwarded per request (at most 100)
+        """
+        self.bot = bot
+        self.chunk_size = max(1, min(chunk_size, MAX_FORWARD_MESSAGES))
+
+        # Format: {user_id: IngestSession}
+        self._sessions: Dict[int, IngestSession] = {}
+
+        # Counters
+        self.ingested = 0
+        self.reused = 0
+        self.failed = 0
+
+    def active(self, user_id: int) -> bool:
+        return user_id in self._sessions
+
+    def begin(self, user_id: int, progress_message=None) -> bool:
+        """
+        Start a session
+
+        Returns:
+            False if the admin already has one
+        """
+        if user_id in self._sessions:
+            return False
+        self._sessions[user_id] = IngestSession(user_id, progress_message)
+        return True
+
+    def cancel(self, user_id: int) -> bool:
+        """Drop a session (files already forwarded stay in the channel)"""
+        return self._sessions.pop(user_id, None) is not None
+
+    async def add(self, user_id: int, message) -> bool:
+        """
+        Queue a file of the admin's session
+
+        Returns:
+            False if there is no session or the message has no file
+        """
+        session = self._sessions.get(user_id)
+        entry = catalog_entry(message)
+        if session is None or not entry or not entry["file_id"]:
+            return False
+        if session.started_at is None:
+            session.started_at = time.monotonic()
+
+        unique_id = entry["file_unique_id"]
+        if unique_id in session.seen:
+            session.duplicates += 1
+            return True
+        session.seen[unique_id] = None
+        failed_row = session.failed.pop(unique_id, None)
+        if failed_row is not None:
+            session.rows.remove(failed_row)
+
+        stored_id = await self.bot.media_catalog.find_stored(self.bot.db_channel, message)
+        if stored_id is not None:
+            session.seen[unique_id] = stored_id
+            session.rows.append(self._row(message, entry, stored_id, EXISTING))
+            self.reused += 1
+            return True
+
+        session.pending.append(message)
+        if len(session.pending) >= self.chunk_size:
+            await self._flush(session)
+        return True
+
+    async def finish(self, user_id: int) -> Optional[Dict]:
+        """
+        Forward what is left and create the links
+
+        Returns:
+            {"rows": [...], "batch_links": [{"first": row number, "last": row number,
+             "link": start parameter}, ...] (MAX_BATCH_SIZE files each), "files": int,
+             "stored": int, "existing": int, "duplicates": int, "failed": int,
+             "seconds": float, "rate": files per second}
+            or None if there is no session
+        """
+        session = self._sessions.pop(user_id, None)
+        if session is None:
+            return None
+
+        while session.pending:
+            await self._flush(session, final=True)
+        session.rows.sort(key=lambda row: row["source_id"])
+
+        # Links are created concurrently, they are independent inserts
+        rows = [row for row in session.rows if row["message_id"]]
+        start_params = await asyncio.gather(
+            *(self.bot.link_store.create("file", [row["message_id"]]) for row in rows)
+        )
+        for row, start_param in zip(rows, start_params):
+            row["link"] = start_param
+
+        # Links hold at most MAX_BATCH_SIZE files, so larger sessions get several
+        message_ids = list(dict.fromkeys(row["message_id"] for row in rows))
+        batch_links = []
+        for i in range(0, len(message_ids), MAX_BATCH_SIZE):
+            start_param = await self.bot.link_store.create("batch", message_ids[i:i + MAX_BATCH_SIZE])
+            if start_param:
+                batch_links.append({
+                    "first": i + 1,
+                    "last": min(i + MAX_BATCH_SIZE, len(message_ids)),
+                    "link": start_param
+                })
+
+        seconds = time.monotonic() - session.started_at if session.started_at else 0.0
+        files = session.received
+        counts = {status: sum(1 for row in session.rows if row["status"] == status)
+                  for status in (STORED, EXISTING, FAILED)}
+
+        logger.info(
+            f"Ingest by {user_id}: {files} files in {seconds:.1f}s, "
+            f"{counts[STORED]} stored, {counts[EXISTING]} existing, {counts[FAILED]} failed"
+        )
+        return {
+            "rows": session.rows,
+            "batch_links": batch_links,
+            "files": files,
+            "stored": counts[STORED],
+            "existing": counts[EXISTING],
+            "duplicates": session.duplicates,
+            "failed": counts[FAILED],
+            "seconds": seconds,
+            "rate": files / seconds if seconds else 0.0
+        }
+
+    async def _flush(self, session: IngestSession, final: bool = False):
+        """Forward one chunk of pending files to the database channel"""
+        async with session.lock:
+            # Checked under the lock, so concurrent adds don't forward partial chunks
+            if not session.pending or (not final and len(session.pending) < self.chunk_size):
+                return
+            chunk = session.pending[:self.chunk_size]
+            del session.pending[:self.chunk_size]
+            chunk.sort(key=lambda message: message.id)
+
+            try:
+                forwarded = await self.bot.forward_messages(
+                    self.bot.db_channel,
+                    from_chat_id=session.user_id,
+                    message_ids=[message.id for message in chunk]
+                )
+            except Exception as e:
+                logger.error(f"Error forwarding {len(chunk)} ingested files: {e}")
+                self.bot.channel_health.report_error(e)
+                forwarded = []
+
+            if not isinstance(forwarded, list):
+                forwarded = [forwarded]
+            await self.bot.catalog_indexer.on_stored(self.bot.db_channel, forwarded)
+
+            # Files Telegram skipped are missing from the result, so match by file
+            stored = {}
+            for message in forwarded:
+                entry = catalog_entry(message)
+                if entry:
+                    stored[entry["file_unique_id"]] = message.id
+
+            for message in chunk:
+                entry = catalog_entry(message)
+                message_id = stored.get(entry["file_unique_id"])
+                row = self._row(message, entry, message_id, STORED if message_id else FAILED)
+                session.rows.append(row)
+                if message_id:
+                    session.seen[entry["file_unique_id"]] = message_id
+                    self.ingested += 1
+                else:
+                    session.seen.pop(entry["file_unique_id"], None)
+                    session.failed[entry["file_unique_id"]] = row
+                    self.failed += 1
+
+        await self._report(session)
+
+    async def _report(self, session: IngestSession):
+        """Edit the progress message (after each chunk)"""
+        if session.progress_message is None:
+            return
+        try:
+            await self.bot.edit_message_text(
+                session.progress_message.chat.id,
+                session.progress_message.id,
+                f"📥 <b>Ingesting...</b>\n\n"
+                f"<blockquote>"
+                f"<b>📁 Received:</b> {session.received}\n"
+                f"<b>✅ Processed:</b> {len(session.rows)}"
+                f"</blockquote>\n"
+                f"Send /ingest done when finished.",
+                parse_mode=enums.ParseMode.HTML
+            )
+        except Exception as e:
+            logger.debug(f"Could not update ingest progress: {e}")
+
+    @staticmethod
+    def _row(message, entry: Dict, message_id: Optional[int], status: str) -> Dict:
+        return {
+            "source_id": message.id,
+            "message_id": message_id,
+            "status": status,
+            "media_type": entry["media_type"],
+            "file_name": entry["file_name"] or "",
+            "file_size": entry["file_size"],
+            "link": None
+        }
+
+    def get_stats(self) -> Dict:
+        """Get ingest counters"""
+        return {
+            "sessions": len(self._sessions),
+            "ingested": self.ingested,
+            "reused": self.reused,
+            "failed": self.failed
+        }
+
+
+def summary_csv(rows: List[Dict], bot_username: str, batch_links: Optional[List[Dict]] = None) -> io.BytesIO:
+    """Ingest rows (then the batch links) as a CSV file (for send_document)"""
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(["file_name", "media_type", "file_size", "message_id", "status", "link"])
+    for row in rows:
+        writer.writerow([
+            row["file_name"],
+            row["media_type"],
+            row["file_size"],
+            row["message_id"] or "",
+            row["status"],
+            f"https://t.me/{bot_username}?start={row['link']}" if row.get("link") else ""
+        ])
+    for batch in batch_links or []:
+        writer.writerow([
+            f"Files {batch['first']}-{batch['last']}",
+            "batch",
+            "",
+            "",
+            "",
+            f"https://t.me/{bot_username}?start={batch['link']}"
+        ])
+
+    document = io.BytesIO(text.getvalue().encode("utf-8"))
+    document.name = f"ingest_{int(time.time())}.csv"
+    return document
@@ -0,0 +1,312 @@
+"""
+Catalog Indexer
+===============
+
+Indexes what is actually in the database channel into the catalog
+collection (see media_catalog.py for the entry format).
+
+- sync() pages through the channel with utils.helpers.get_messages,
+  200 IDs per request and several requests at a time
+- Incremental: a sync continues from how far the last one scanned
+  (a full sync starts at 1 and drops entries of deleted messages)
+- The scan stops at the channel's last message ID, found with a probe
+  post (when that fails, once whole windows come back empty; windows
+  with failed chunks don't count)
+- New channel posts and deletions are applied live, posts the bot makes
+  itself (no update arrives for them) through on_stored()
+- Live posts only extend coverage while it stays contiguous, a gap
+  starts a sync instead
+- The deliverable ID bitmap (deliverable_ids.py) and the search index
+  (search_index.py) are updated alongside
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from features.deliverable_ids import is_deliverable
+from features.media_catalog import catalog_entry
+from utils.helpers import get_messages
+
+logger = logging.getLogger(__name__)
+
+# get_messages IDs per request
+FETCH_CHUNK = 200
+
+
+class CatalogIndexer:
+    """Keeps the catalog collection in sync with the database channel"""
+
+    def __init__(self, bot, concurrency: int = 4, empty_windows: int = 2):
+        """
+        Initialize Catalog Indexer
+
+        Args:
+            bot: Bot instance (uses bot.db_channel, bot.db, bot.media_catalog,
+                 bot.deliverable_ids and bot.search_index)
+            concurrency: get_messages requests in flight at once
+            empty_windows: Consecutive empty windows that mean the end of the channel
+        """
+        self.bot = bot
+        self.concurrency = max(1, concurrency)
+        self.window = FETCH_CHUNK * self.concurrency
+        self.empty_windows = empty_windows
+
+        self._task: Optional[asyncio.Task] = None
+
+        # Highest message ID seen in the channel
+        self.last_id = 0
+
+        # Counters
+        self.indexed = 0
+        self.removed = 0
+        self.live_posts = 0
+        self.last_sync_seconds = 0.0
+        self.last_sync_rate = 0.0
+        self.last_sync_complete = True
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, full: bool = False) -> bool:
+        """
+        Start a sync in the background
+
+        Returns:
+            False if a sync is already running
+        """
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self.sync(full))
+        return True
+
+    async def wait(self) -> int:
+        """Wait for the current sync and get the number of messages it indexed"""
+        if self._task is None:
+            return 0
+        return await asyncio.shield(self._task)
+
+    async def stop(self):
+        """Cancel a running sync"""
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def sync(self, full: bool = False) -> int:
+        """
+        Index the channel from the last indexed message (or from 1 if full)
+
+        Returns:
+            Number of messages indexed
+        """
+        channel_id = self.bot.db_channel
+        if not channel_id:
+            return 0
+
+        started = time.monotonic()
+        next_id = 1 if full else await self.bot.db.get_catalog_indexed_to(channel_id) + 1
+        end_id = await self._channel_end(channel_id)
+        indexed = 0
+        empty = 0
+        failed = 0
+
+        # Coverage only advances while every chunk was fetched
+        complete = True
+
+        logger.info(f"Catalog sync of {channel_id} from message {next_id} to {end_id or 'the end'}")
+
+        while True:
+            if end_id is not None and next_id > end_id:
+                break
+            # End unknown: whole windows coming back empty mean the end
+            if end_id is None and empty >= self.empty_windows:
+                break
+
+            last_id = next_id + self.window - 1 if end_id is None else min(next_id + self.window - 1, end_id)
+            messages = await get_messages(self.bot, range(next_id, last_id + 1), concurrency=self.concurrency)
+            window_complete = len(messages) == last_id - next_id + 1
+            next_id = last_id + 1
+            complete = complete and window_complete
+
+            if not messages:
+                # Every chunk failed - retrying the same way won't help
+                failed += 1
+                if failed >= self.empty_windows:
+                    logger.warning(f"Catalog sync of {channel_id} stopped at message {next_id}: fetches failing")
+                    break
+                continue
+            failed = 0
+
+            # Failed chunks are missing from the result, so only messages
+            # returned as empty/service count as gone
+            pairs = []
+            entries = []
+            deliverable: List[int] = []
+            gone: List[int] = []
+            for message in messages:
+                if is_deliverable(message):
+                    deliverable.append(message.id)
+                entry = catalog_entry(message)
+                if entry:
+                    pairs.append((message.id, message))
+                    entries.append((message.id, entry))
+                else:
+                    gone.append(message.id)
+
+            self.bot.deliverable_ids.add(deliverable)
+            self.bot.deliverable_ids.discard(gone)
+            self.bot.search_index.add(entries)
+            self.bot.search_index.remove(gone)
+
+            if pairs:
+                empty = 0
+                self.last_id = max(self.last_id, pairs[-1][0])
+                await self.bot.media_catalog.record(channel_id, pairs, cache=False)
+                indexed += len(pairs)
+            elif window_complete:
+                # A window with failed chunks says nothing about the end
+                empty += 1
+
+            if complete and (pairs or end_id is not None):
+                # Below a known end the whole window was scanned, past the last post it wasn't
+                await self._set_covered(channel_id, last_id if end_id is not None else pairs[-1][0])
+
+            if full and gone:
+                self.removed += await self.bot.db.delete_catalog_entries(channel_id, gone)
+
+        self.indexed += indexed
+        self.last_sync_seconds = time.monotonic() - started
+        self.last_sync_rate = indexed / self.last_sync_seconds if self.last_sync_seconds else 0.0
+        self.last_sync_complete = complete
+        logger.info(
+            f"✓ Catalog sync done: {indexed} messages in {self.last_sync_seconds:.1f}s "
+            f"({self.last_sync_rate:.0f}/s){'' if complete else ', some chunks failed'}"
+        )
+        return indexed
+
+    async def _channel_end(self, channel_id: int) -> Optional[int]:
+        """
+        Current last message ID of the channel (None if it can't be found)
+
+        Bots can't read a channel's history, so a silent probe post is sent
+        and deleted right away, its ID is the newest in the channel.
+        """
+        try:
+            probe = await self.bot.send_message(channel_id, "⏳", disable_notification=True)
+        except Exception as e:
+            logger.warning(f"Could not find the end of {channel_id}, scanning until empty: {e}")
+            self.bot.channel_health.report_error(e)
+            return None
+
+        try:
+            await self.bot.delete_messages(channel_id, probe.id)
+        except Exception as e:
+            logger.warning(f"Could not delete catalog probe {probe.id}: {e}")
+        self.last_id = max(self.last_id, probe.id)
+        return self.last_id
+
+    async def _set_covered(self, channel_id: int, message_id: int):
+        """Record that everything up to message_id has been scanned"""
+        deliverable_ids = self.bot.deliverable_ids
+        if deliverable_ids.channel_id == channel_id:
+            deliverable_ids.covered_to = max(deliverable_ids.covered_to, message_id)
+        await self.bot.db.set_catalog_indexed_to(channel_id, message_id)
+
+    async def _extend_covered(self, channel_id: int, message_ids: List[int]):
+        """
+        Move coverage over new posts while it stays contiguous
+
+        Channel message IDs are sequential, so a post right after covered_to
+        leaves nothing unscanned. Anything else (a sync still running, a
+        missed update, posts arriving out of order) leaves coverage where
+        it is and a sync scans the gap; IDs above covered_to are kept by
+        the bitmap meanwhile.
+        """
+        deliverable_ids = self.bot.deliverable_ids
+        if self.running or deliverable_ids.channel_id != channel_id or not deliverable_ids.covered_to:
+            return
+
+        covered = deliverable_ids.covered_to
+        for message_id in sorted(message_ids):
+            if message_id == covered + 1:
+                covered = message_id
+            elif message_id > covered:
+                break
+        if covered > deliverable_ids.covered_to:
+            await self._set_covered(channel_id, covered)
+
+        if self.last_id > covered:
+            self.start()
+
+    # ===================================
+    # LIVE UPDATES
+    # ===================================
+
+    async def on_channel_post(self, message):
+        """Index a new post in the database channel"""
+        if message.chat.id != self.bot.db_channel:
+            return
+        entry = catalog_entry(message)
+        if entry:
+            await self.bot.media_catalog.record(message.chat.id, [(message.id, message)], cache=False)
+            if is_deliverable(message):
+                self.bot.deliverable_ids.add([message.id])
+            self.bot.search_index.add([(message.id, entry)])
+            self.live_posts += 1
+        self.last_id = max(self.last_id, message.id)
+        await self._extend_covered(message.chat.id, [message.id])
+
+    async def on_stored(self, channel_id: int, messages):
+        """Index posts the bot made in the database channel (/genlink, /ingest)"""
+        pairs = []
+        entries = []
+        deliverable: List[int] = []
+        for message in messages:
+            entry = catalog_entry(message)
+            if entry:
+                pairs.append((message.id, message))
+                entries.append((message.id, entry))
+                if is_deliverable(message):
+                    deliverable.append(message.id)
+        if not pairs:
+            return
+        await self.bot.media_catalog.record(channel_id, pairs)
+        self.bot.search_index.add(entries)
+
+        # Must be set before a later post moves coverage past them
+        if self.bot.deliverable_ids.channel_id == channel_id:
+            self.bot.deliverable_ids.add(deliverable)
+        self.last_id = max(self.last_id, max(message_id for message_id, _ in pairs))
+        await self._extend_covered(channel_id, [message_id for message_id, _ in pairs])
+
+    async def on_deleted(self, messages):
+        """Drop deleted database channel messages from the catalog"""
+        message_ids = [
+            message.id for message in messages
+            if message.chat and message.chat.id == self.bot.db_channel
+        ]
+        if not message_ids:
+            return
+        self.bot.media_catalog.forget(self.bot.db_channel, message_ids)
+        self.bot.deliverable_ids.discard(message_ids)
+        self.bot.search_index.remove(message_ids)
+        self.removed += await self.bot.db.delete_catalog_entries(self.bot.db_channel, message_ids)
+
+    def get_status(self) -> Dict:
+        """Get indexer state"""
+        return {
+            "running": self.running,
+            "last_id": self.last_id,
+            "indexed": self.indexed,
+            "removed": self.removed,
+            "live_posts": self.live_posts,
+            "last_sync_seconds": round(self.last_sync_seconds, 1),
+            "last_sync_rate": round(self.last_sync_rate, 1),
+            "last_sync_complete": self.last_sync_complete
+        }
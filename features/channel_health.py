@@ -0,0 +1,133 @@
+"""
+Database Channel Health
+=======================
+
+Caches whether the bot is admin in the database (storage) channel.
+
+- Checked at startup and then on a timer (more often while unhealthy)
+- ChatAdminRequired / ChannelPrivate errors from real calls mark the
+  channel unhealthy right away, and the next check follows after the
+  retry interval instead of the rest of the healthy one
+- File links read the cached state instead of calling get_me +
+  get_chat_member before every copy
+"""
+
+import asyncio
+import datetime
+import logging
+from typing import Dict, Optional
+from pyrogram.errors import ChatAdminRequired, ChannelPrivate
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the bot lost access to the channel
+CHANNEL_ACCESS_ERRORS = (ChatAdminRequired, ChannelPrivate)
+
+# ChatMemberStatus values with admin rights ("creator" on older Pyrogram)
+ADMIN_STATUSES = ("administrator", "owner", "creator")
+
+
+class ChannelHealth:
+    """Cached admin status of the bot in the database channel"""
+
+    def __init__(self, bot, interval: int = 300, retry_interval: int = 30):
+        """
+        Initialize Channel Health
+
+        Args:
+            bot: Bot instance (uses bot.db_channel and bot.id)
+            interval: Seconds between checks while healthy
+            retry_interval: Seconds between checks while unhealthy
+        """
+        self.bot = bot
+        self.interval = interval
+        self.retry_interval = retry_interval
+
+        # None until the first check
+        self.healthy: Optional[bool] = None
+        self.status: Optional[str] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[datetime.datetime] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+        # Counters
+        self.checks = 0
+        self.invalidations = 0
+
+    def start(self):
+        """Start the periodic check"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic check"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=self.interval if self.healthy else self.retry_interval
+                )
+            except asyncio.TimeoutError:
+                await self.check()
+            else:
+                # Marked unhealthy by report_error: wait the retry interval from now
+                self._wakeup.clear()
+
+    async def check(self) -> bool:
+        """Check admin rights in the database channel now"""
+        self.checks += 1
+        self.checked_at = datetime.datetime.now(datetime.timezone.utc)
+
+        if not self.bot.db_channel:
+            self.healthy, self.status, self.error = False, None, "not configured"
+            return False
+
+        try:
+            bot_id = self.bot.id or (await self.bot.get_me()).id
+            member = await self.bot.get_chat_member(self.bot.db_channel, bot_id)
+            self.status = getattr(member.status, "value", member.status)
+            self.healthy = self.status in ADMIN_STATUSES
+            self.error = None if self.healthy else "not admin"
+        except Exception as e:
+            self.healthy, self.status, self.error = False, None, type(e).__name__
+
+        if not self.healthy:
+            logger.warning(f"Database channel {self.bot.db_channel} unhealthy: {self.error}")
+        return self.healthy
+
+    async def ensure(self) -> bool:
+        """Cached health (checks once if never checked)"""
+        if self.healthy is None:
+            return await self.check()
+        return self.healthy
+
+    def report_error(self, error: Exception):
+        """Mark the channel unhealthy if error means the bot lost access"""
+        if isinstance(error, CHANNEL_ACCESS_ERRORS) and self.healthy is not False:
+            self.healthy = False
+            self.error = type(error).__name__
+            self.invalidations += 1
+            self._wakeup.set()
+            logger.warning(f"Database channel access lost: {self.error}")
+
+    def get_status(self) -> Dict:
+        """Get health state"""
+        return {
+            "healthy": self.healthy,
+            "status": self.status,
+            "error": self.error,
+            "checked_at": self.checked_at,
+            "checks": self.checks,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,121 @@
+"""
+Deliverable Message IDs
+=======================
+
+Bitmap of the database channel message IDs that can be delivered
+(bit N set = message N exists and is not a service message or sticker,
+see is_deliverable()).
+
+- Loaded from the catalog collection on startup
+- Kept current by the catalog indexer (syncs, new posts, deletions)
+- Only authoritative up to covered_to (how far the indexer has scanned);
+  IDs above it are always kept
+- Batch ranges are filtered before sending, so deleted posts and
+  service messages no longer cost a failing copy each
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Catalog media types that are not delivered
+SKIPPED_MEDIA = ("sticker",)
+
+
+def is_deliverable(message) -> bool:
+    """
+    Whether a fetched channel message can be delivered
+
+    Anything that exists and is not a service message or a sticker (polls,
+    locations, contacts, dice, ... are copied like any other post).
+    """
+    return not (
+        message is None
+        or getattr(message, "empty", False)
+        or getattr(message, "service", None)
+        or getattr(message, "sticker", None)
+    )
+
+
+class DeliverableIds:
+    """Deliverable message ID bitmap of the database channel"""
+
+    def __init__(self, bot):
+        """
+        Initialize Deliverable IDs
+
+        Args:
+            bot: Bot instance (uses bot.db_channel and bot.db)
+        """
+        self.bot = bot
+
+        self.channel_id: Optional[int] = None
+        self._bits = bytearray()
+        self.count = 0
+
+        # Highest message ID the bitmap is authoritative for (0 = not loaded)
+        self.covered_to = 0
+
+        # Counters
+        self.filtered = 0
+        self.skipped = 0
+
+    async def load(self):
+        """Build the bitmap from the catalog collection"""
+        self.channel_id = self.bot.db_channel
+        self._bits = bytearray()
+        self.count = 0
+        self.covered_to = 0
+        if not self.channel_id:
+            return
+
+        self.add(await self.bot.db.get_catalog_ids(self.channel_id, exclude_types=SKIPPED_MEDIA))
+        self.covered_to = await self.bot.db.get_catalog_indexed_to(self.channel_id)
+        logger.info(f"✓ Loaded {self.count} deliverable IDs (indexed to {self.covered_to})")
+
+    def _grow(self, message_id: int):
+        needed = (message_id >> 3) + 1
+        if needed > len(self._bits):
+            # Grow in 4 KB steps so appending new posts rarely reallocates
+            self._bits.extend(bytes(needed - len(self._bits) + 4096))
+
+    def add(self, message_ids: Iterable[int]):
+        """Mark messages deliverable"""
+        for message_id in message_ids:
+            self._grow(message_id)
+            mask = 1 << (message_id & 7)
+            if not self._bits[message_id >> 3] & mask:
+                self._bits[message_id >> 3] |= mask
+                self.count += 1
+
+    def discard(self, message_ids: Iterable[int]):
+        """Mark messages not deliverable"""
+        for message_id in message_ids:
+            if (message_id >> 3) < len(self._bits) and self._bits[message_id >> 3] & (1 << (message_id & 7)):
+                self._bits[message_id >> 3] &= ~(1 << (message_id & 7)) & 0xFF
+                self.count -= 1
+
+    def __contains__(self, message_id: int) -> bool:
+        return (message_id >> 3) < len(self._bits) and bool(self._bits[message_id >> 3] & (1 << (message_id & 7)))
+
+    def filter(self, channel_id: int, message_ids: Iterable[int]) -> List[int]:
+        """Drop IDs known not to be deliverable (order is kept)"""
+        message_ids = list(message_ids)
+        if channel_id != self.channel_id or not self.covered_to:
+            return message_ids
+
+        kept = [message_id for message_id in message_ids if message_id > self.covered_to or message_id in self]
+        self.filtered += 1
+        self.skipped += len(message_ids) - len(kept)
+        return kept
+
+    def get_stats(self) -> Dict:
+        """Get bitmap counters"""
+        return {
+            "deliverable": self.count,
+            "covered_to": self.covered_to,
+            "bitmap_bytes": len(self._bits),
+            "filtered": self.filtered,
+            "skipped": self.skipped
+        }
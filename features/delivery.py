@@ -0,0 +1,421 @@
+"""
+Delivery Queue
+==============
+
+Background delivery of batch/special link files.
+
+Handlers enqueue a DeliveryJob and return immediately. A fixed pool of
+async delivery workers drains the queue, so long batch sends never pin
+the Pyrogram update workers and interactive commands stay responsive.
+
+Each job reports its own progress by editing its progress message.
+
+Files are copied in chunks of up to 100 with one request per chunk
+(Bot.copy_messages); a chunk is retried one by one only if it fails.
+
+Album mode packs photos/videos, documents and audio into media groups of
+up to 10 items (sent by file_id), so a batch costs about a tenth of the
+API calls. Anything that can't be grouped is copied one by one.
+"""
+
+import asyncio
+import datetime
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from pyrogram.errors import UserIsBlocked, InputUserDeactivated
+from pyrogram.types import InputMediaAudio, InputMediaDocument, InputMediaPhoto, InputMediaVideo
+
+logger = logging.getLogger(__name__)
+
+# Telegram limits
+MAX_ALBUM_SIZE = 10
+MAX_GET_MESSAGES = 200
+MAX_COPY_MESSAGES = 100
+
+# Media type -> (album group, InputMedia class)
+# Photos and videos can share an album, documents and audio only with their own kind
+ALBUM_MEDIA = {
+    "photo": ("visual", InputMediaPhoto),
+    "video": ("visual", InputMediaVideo),
+    "document": ("document", InputMediaDocument),
+    "audio": ("audio", InputMediaAudio),
+}
+
+# Errors that end a job (the user can't receive anything)
+DEAD_RECIPIENT_ERRORS = (UserIsBlocked, InputUserDeactivated)
+
+
+class DeliveryJob:
+    """
+    A single file delivery job
+
+    Args:
+        user_id: User the files are delivered for
+        chat_id: Chat to send the files to
+        message_ids: Message IDs in the database channel
+        from_chat_id: Database channel ID
+        protect_content: Protect delivered files from forwarding
+        hide_caption: Send files without their captions
+        delete_after: FEATURE 2 auto-delete time in seconds (0 = off)
+        progress_message: Message edited with progress (optional)
+        on_complete: Coroutine called with the job when it finishes (optional)
+        album_mode: Send groupable media as albums
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        user_id: int,
+        chat_id: int,
+        message_ids: List[int],
+        from_chat_id: int,
+        protect_content: bool = True,
+        hide_caption: bool = False,
+        delete_after: int = 0,
+        progress_message=None,
+        on_complete: Optional[Callable[["DeliveryJob"], Awaitable[None]]] = None,
+        album_mode: bool = False
+    ):
+        self.id = next(self._ids)
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.message_ids = list(message_ids)
+        self.from_chat_id = from_chat_id
+        self.protect_content = protect_content
+        self.hide_caption = hide_caption
+        self.delete_after = delete_after
+        self.progress_message = progress_message
+        self.on_complete = on_complete
+        self.album_mode = album_mode
+
+        # Progress
+        self.status = "queued"
+        self.sent_ids: List[int] = []          # Source message IDs delivered (for resend)
+        self.sent_message_ids: List[int] = []  # Message IDs in the user's chat
+        self.failed = 0
+        self.created_at = datetime.datetime.now(datetime.timezone.utc)
+        self.finished_at: Optional[datetime.datetime] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.message_ids)
+
+    @property
+    def sent(self) -> int:
+        return len(self.sent_message_ids)
+
+    @property
+    def done(self) -> int:
+        return self.sent + self.failed
+
+
+class DeliveryQueue:
+    """
+    Pool of async delivery workers draining a shared job queue
+
+    Only one active job is allowed per user, so a single user cannot
+    occupy every worker by opening many batch links at once.
+    """
+
+    def __init__(self, bot, workers: int = 4, progress_interval: float = 3.0):
+        """
+        Initialize Delivery Queue
+
+        Args:
+            bot: Bot instance used to send files
+            workers: Number of delivery workers
+            progress_interval: Minimum seconds between progress edits
+        """
+        self.bot = bot
+        self.workers = max(1, workers)
+        self.progress_interval = progress_interval
+
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+        # Format: {user_id: DeliveryJob}
+        self.active_jobs: Dict[int, DeliveryJob] = {}
+
+        # Counters
+        self.completed = 0
+        self.files_sent = 0
+        self.files_failed = 0
+        self.albums_sent = 0
+
+    def start(self):
+        """Start delivery workers"""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(i))
+            for i in range(self.workers)
+        ]
+        logger.info(f"✓ Delivery queue started with {self.workers} workers")
+
+    async def stop(self):
+        """Cancel delivery workers (queued jobs are dropped)"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def submit(self, job: DeliveryJob) -> bool:
+        """
+        Enqueue a job
+
+        Returns:
+            False if the user already has a delivery in progress
+        """
+        if job.user_id in self.active_jobs:
+            return False
+        self.active_jobs[job.user_id] = job
+        self.queue.put_nowait(job)
+        return True
+
+    def get_user_job(self, user_id: int) -> Optional[DeliveryJob]:
+        """Get the active job of a user"""
+        return self.active_jobs.get(user_id)
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.status = "failed"
+                logger.error(f"Delivery job {job.id} failed: {e}")
+            finally:
+                job.finished_at = datetime.datetime.now(datetime.timezone.utc)
+                self.active_jobs.pop(job.user_id, None)
+                self.queue.task_done()
+
+    async def _run_job(self, job: DeliveryJob):
+        job.status = "running"
+        job.last_progress = time.monotonic()
+
+        try:
+            if job.album_mode:
+                await self._deliver_albums(job)
+            else:
+                await self._deliver_bulk(job, job.message_ids)
+        except DEAD_RECIPIENT_ERRORS as e:
+            # The user is gone, the rest of the job would fail too
+            remaining = job.total - job.done
+            job.failed += remaining
+            self.files_failed += remaining
+            logger.info(f"Delivery job {job.id} stopped: {type(e).__name__}")
+
+        job.status = "done"
+        self.completed += 1
+
+        if job.on_complete:
+            await job.on_complete(job)
+        elif job.progress_message:
+            try:
+                await job.progress_message.edit_text(f"✅ Sent {job.sent} out of {job.total} files!")
+            except Exception:
+                pass
+
+    async def _deliver_bulk(self, job: DeliveryJob, message_ids: List[int]):
+        """Copy messages in chunks of MAX_COPY_MESSAGES, one request per chunk"""
+        for i in range(0, len(message_ids), MAX_COPY_MESSAGES):
+            chunk = message_ids[i:i + MAX_COPY_MESSAGES]
+            try:
+                responses = await self.bot.copy_messages(
+                    job.chat_id,
+                    job.from_chat_id,
+                    chunk,
+                    protect_content=job.protect_content,
+                    drop_captions=job.hide_caption
+                )
+            except DEAD_RECIPIENT_ERRORS:
+                raise
+            except Exception as e:
+                logger.debug(f"Delivery job {job.id}: bulk copy failed, copying one by one: {e}")
+                await self._deliver_each(job, chunk)
+                continue
+
+            # Deleted source messages are skipped by Telegram
+            missing = len(chunk) - len(responses)
+            job.failed += missing
+            self.files_failed += missing
+
+            # Copies come back in chunk order, so they map to their sources by position
+            sources = chunk if not missing else await self._copied_sources(job, chunk, len(responses))
+            if sources and not job.hide_caption:
+                await self.bot.media_catalog.record(job.from_chat_id, zip(sources, responses))
+            await self._on_sent(job, sources, [r.id for r in responses])
+            await self._maybe_report(job)
+
+    async def _copied_sources(self, job: DeliveryJob, chunk: List[int], copied: int) -> List[int]:
+        """
+        Source IDs of a chunk that Telegram copied (some were skipped)
+
+        Returns:
+            The sources that still exist, or [] if they don't add up to the copies
+        """
+        try:
+            messages = await self.bot.get_messages(job.from_chat_id, chunk)
+        except Exception as e:
+            logger.debug(f"Delivery job {job.id}: could not fetch sources of a partial copy: {e}")
+            return []
+        sources = [message.id for message in messages if not getattr(message, "empty", False)]
+        return sources if len(sources) == copied else []
+
+    async def _deliver_each(self, job: DeliveryJob, message_ids: List[int]):
+        """Send messages one by one (by file_id when cataloged)"""
+        for message_id in message_ids:
+            try:
+                response = await self.bot.media_catalog.send(
+                    job.chat_id,
+                    job.from_chat_id,
+                    message_id,
+                    protect_content=job.protect_content,
+                    hide_caption=job.hide_caption
+                )
+                await self._on_sent(job, [message_id], [response.id])
+
+            except DEAD_RECIPIENT_ERRORS:
+                raise
+            except Exception as e:
+                job.failed += 1
+                self.files_failed += 1
+                logger.debug(f"Delivery job {job.id}: message {message_id} failed: {e}")
+
+            await self._maybe_report(job)
+
+    async def _deliver_albums(self, job: DeliveryJob):
+        """Send groupable media as albums, everything else one by one"""
+        for i in range(0, job.total, MAX_GET_MESSAGES):
+            chunk_ids = job.message_ids[i:i + MAX_GET_MESSAGES]
+            try:
+                messages = await self.bot.get_messages(job.from_chat_id, chunk_ids)
+            except Exception as e:
+                logger.debug(f"Delivery job {job.id}: could not fetch sources, copying one by one: {e}")
+                await self._deliver_each(job, chunk_ids)
+                continue
+
+            # Consecutive messages that don't form an album are copied in bulk
+            singles: List[int] = []
+            for group in _album_groups(messages):
+                if len(group) == 1:
+                    singles.append(group[0].id)
+                    continue
+
+                if singles:
+                    await self._deliver_bulk(job, singles)
+                    singles = []
+
+                try:
+                    responses = await self.bot.send_media_group(
+                        job.chat_id,
+                        [_input_media(msg, job.hide_caption) for msg in group],
+                        protect_content=job.protect_content
+                    )
+                    self.albums_sent += 1
+                    await self._on_sent(job, [msg.id for msg in group], [r.id for r in responses])
+                    await self._maybe_report(job)
+
+                except DEAD_RECIPIENT_ERRORS:
+                    raise
+                except Exception as e:
+                    logger.debug(f"Delivery job {job.id}: album failed, copying one by one: {e}")
+                    await self._deliver_each(job, [msg.id for msg in group])
+
+            if singles:
+                await self._deliver_bulk(job, singles)
+
+    async def _on_sent(self, job: DeliveryJob, source_ids: List[int], sent_ids: List[int]):
+        job.sent_ids.extend(source_ids)
+        job.sent_message_ids.extend(sent_ids)
+        self.files_sent += len(sent_ids)
+
+        # FEATURE 2: Auto-delete (one call per album)
+        if job.delete_after:
+            await self.bot.auto_delete.schedule_file_deletions(job.user_id, sent_ids, job.delete_after)
+
+    async def _maybe_report(self, job: DeliveryJob):
+        if job.progress_message and time.monotonic() - job.last_progress >= self.progress_interval:
+            job.last_progress = time.monotonic()
+            await self._report_progress(job)
+
+    async def _report_progress(self, job: DeliveryJob):
+        try:
+            await job.progress_message.edit_text(
+                f"📤 <b>Sending files...</b> {job.done}/{job.total}"
+            )
+        except Exception:
+            pass
+
+    def get_status(self) -> Dict:
+        """Get delivery queue status"""
+        return {
+            "workers": len(self._tasks),
+            "queued": self.queue.qsize(),
+            "active": len(self.active_jobs),
+            "completed": self.completed,
+            "files_sent": self.files_sent,
+            "files_failed": self.files_failed,
+            "albums_sent": self.albums_sent
+        }
+
+
+def _media_type(message) -> Optional[str]:
+    """Album media type of a message (None if it can't go in an album)"""
+    if getattr(message, "empty", False):
+        return None
+    for media_type in ALBUM_MEDIA:
+        if getattr(message, media_type, None):
+            return media_type
+    return None
+
+
+def _album_groups(messages) -> List[List]:
+    """
+    Split messages (in order) into albums of compatible media
+
+    Messages that can't be grouped come out as single-item groups.
+    """
+    groups: List[List] = []
+    current: List = []
+    current_kind = None
+
+    for message in messages:
+        media_type = _media_type(message)
+        kind = ALBUM_MEDIA[media_type][0] if media_type else None
+
+        if current and (kind is None or kind != current_kind or len(current) >= MAX_ALBUM_SIZE):
+            groups.append(current)
+            current, current_kind = [], None
+
+        if kind is None:
+            groups.append([message])
+        else:
+            current.append(message)
+            current_kind = kind
+
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _input_media(message, hide_caption: bool = False):
+    """InputMedia for a source message, reusing its file_id"""
+    media_type = _media_type(message)
+    media_class = ALBUM_MEDIA[media_type][1]
+    if hide_caption:
+        return media_class(media=getattr(message, media_type).file_id)
+    return media_class(
+        media=getattr(message, media_type).file_id,
+        caption=message.caption or "",
+        caption_entities=message.caption_entities
+    )
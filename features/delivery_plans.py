@@ -0,0 +1,165 @@
+"""
+Delivery Plan Cache
+===================
+
+Caches what a start link resolves to, so a viral link is resolved once
+instead of once per user.
+
+A plan holds the file IDs plus everything needed to deliver them:
+protect_content, hide_caption, auto-delete time, album mode and the
+special link's custom message.
+
+- Bounded LRU with a TTL; invalid links are kept for a much shorter
+  miss TTL, since the database returns None on errors too and a failed
+  lookup must not break a link for the whole TTL
+- Plans built under an older settings version are rebuilt
+- Special links are invalidated when they are saved or deleted
+  (Database.special_link_hook)
+- Concurrent requests for the same link share one resolution (single-flight)
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import MAX_SPECIAL_FILES
+
+logger = logging.getLogger(__name__)
+
+SPECIAL_PREFIX = "link_"
+
+
+class DeliveryPlanCache:
+    """LRU + TTL cache of resolved start links"""
+
+    def __init__(self, bot, ttl: float = 300, max_entries: int = 5000, miss_ttl: float = 10):
+        """
+        Initialize Delivery Plan Cache
+
+        Args:
+            bot: Bot instance (uses bot.db and bot.link_store)
+            ttl: Seconds a plan is reused
+            miss_ttl: Seconds an invalid link is remembered as invalid
+            max_entries: Plans kept in memory (least recently used are dropped)
+        """
+        self.bot = bot
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+
+        # Format: {start_arg: (plan or None, settings_version, expires_at)}
+        self._plans: "OrderedDict[str, Tuple[Optional[Dict], int, float]]" = OrderedDict()
+
+        # Format: {start_arg: Future} for plans being built
+        self._loading: Dict[str, asyncio.Future] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get(self, start_arg: str) -> Optional[Dict]:
+        """
+        Get the delivery plan of a start link
+
+        Returns:
+            {"type": "file" | "batch" | "special", "ids": [...], "protect_content": bool,
+             "hide_caption": bool, "delete_after": int, "album_mode": bool,
+             "message": str or None, "link": special link document or None}
+            or None if the link is invalid
+        """
+        entry = self._plans.get(start_arg)
+        if entry and entry[2] > time.monotonic() and entry[1] == self.bot.db.settings_version:
+            self.hits += 1
+            self._plans.move_to_end(start_arg)
+            return entry[0]
+
+        future = self._loading.get(start_arg)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[start_arg] = future
+        try:
+            version = self.bot.db.settings_version
+            plan = await self._build(start_arg)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here, waiters re-raise it
+            raise
+        else:
+            future.set_result(plan)
+            self._store(start_arg, plan, version)
+            return plan
+        finally:
+            self._loading.pop(start_arg, None)
+
+    def _store(self, start_arg: str, plan: Optional[Dict], version: int):
+        ttl = self.ttl if plan is not None else self.miss_ttl
+        self._plans[start_arg] = (plan, version, time.monotonic() + ttl)
+        self._plans.move_to_end(start_arg)
+        if len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+
+    async def _build(self, start_arg: str) -> Optional[Dict]:
+        settings = await self.bot.db.get_settings()
+        plan = {
+            "protect_content": settings.get("protect_content", True),
+            "hide_caption": settings.get("hide_caption", False),
+            "delete_after": settings.get("auto_delete_time", 300) if settings.get("auto_delete", False) else 0,
+            "album_mode": settings.get("album_mode", False),
+            "message": None,
+            "link": None
+        }
+
+        if start_arg.startswith(SPECIAL_PREFIX):
+            link_data = await self.bot.db.get_special_link(start_arg[len(SPECIAL_PREFIX):])
+            if not link_data:
+                return None
+            plan.update(
+                type="special",
+                ids=link_data.get("files", [])[:MAX_SPECIAL_FILES],
+                message=link_data.get("message"),
+                link=link_data
+            )
+            return plan
+
+        link = await self.bot.link_store.resolve(start_arg)
+        if not link:
+            return None
+        plan.update(type=link["type"], ids=link["ids"])
+        for key in ("protect_content", "hide_caption"):
+            if key in link["options"]:
+                plan[key] = link["options"][key]
+        return plan
+
+    def invalidate(self, start_arg: Optional[str] = None):
+        """Drop one plan (or all)"""
+        if start_arg is None:
+            self.invalidations += len(self._plans)
+            self._plans.clear()
+        elif self._plans.pop(start_arg, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_special(self, link_id: str):
+        """Drop the plan of a special link (it was saved or deleted)"""
+        self.invalidate(SPECIAL_PREFIX + link_id)
+
+    def get_stats(self) -> Dict:
+        """Get cache counters"""
+        return {
+            "plans": len(self._plans),
+            "loading": len(self._loading),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,158 @@
+"""
+Force Subscribe Invite Link Pool
+================================
+
+Keeps one invite link and the chat metadata (title, username) per
+force-sub channel, so the join screen is rendered without API calls.
+
+- Links are created with an expiry and refreshed before they expire
+- Title/username are refreshed on the same schedule
+- Data is stored on the channel's document in the force_sub collection
+  and loaded on startup (channels only set in config stay in memory)
+"""
+
+import asyncio
+import datetime
+import logging
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InviteLinkPool:
+    """Cached invite links and metadata for force-sub channels"""
+
+    def __init__(self, bot, channel_ids: Iterable[int] = (), refresh_interval: int = 21600):
+        """
+        Initialize Invite Link Pool
+
+        Args:
+            bot: Bot instance
+            channel_ids: Force-sub channels from config (channels in the database are added on load)
+            refresh_interval: Seconds between refreshes (links live for twice as long)
+        """
+        self.bot = bot
+        self.config_channels = [channel_id for channel_id in channel_ids if channel_id]
+        self.refresh_interval = refresh_interval
+
+        # Format: {channel_id: {"title": str, "username": str, "invite_link": str,
+        #                       "invite_expire_date": datetime, "refreshed_date": datetime}}
+        self.channels: Dict[int, Dict] = {}
+
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.links_created = 0
+        self.refresh_errors = 0
+
+    async def load(self):
+        """Load cached links from the force_sub collection"""
+        for doc in await self.bot.db.get_force_sub_channel_info():
+            self.channels[doc["channel_id"]] = doc
+        for channel_id in self.config_channels:
+            self.channels.setdefault(channel_id, {"channel_id": channel_id})
+        logger.info(f"✓ Loaded invite links for {len(self.channels)} force-sub channels")
+
+    def start(self):
+        """Start the refresh loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the refresh loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.refresh_stale()
+            await asyncio.sleep(min(self.refresh_interval, 600))
+
+    def _is_stale(self, info: Dict) -> bool:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        refreshed = _as_utc(info.get("refreshed_date"))
+        if not refreshed or (now - refreshed).total_seconds() >= self.refresh_interval:
+            return True
+        if info.get("username"):
+            return False
+        expires = _as_utc(info.get("invite_expire_date"))
+        return not info.get("invite_link") or (expires and (expires - now).total_seconds() < self.refresh_interval)
+
+    async def refresh_stale(self):
+        """Refresh channels whose metadata is old or whose link expires soon"""
+        for channel_id, info in list(self.channels.items()):
+            if self._is_stale(info):
+                await self.refresh(channel_id)
+
+    async def refresh(self, channel_id: int) -> Optional[Dict]:
+        """Fetch title/username and (for private channels) create a new invite link"""
+        try:
+            chat = await self.bot.get_chat(channel_id)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            info = {
+                "title": chat.title,
+                "username": chat.username,
+                "refreshed_date": now
+            }
+
+            if not chat.username:
+                expire_date = now + datetime.timedelta(seconds=self.refresh_interval * 2)
+                invite = await self.bot.create_chat_invite_link(channel_id, expire_date=expire_date)
+                info["invite_link"] = invite.invite_link
+                info["invite_expire_date"] = expire_date
+                self.links_created += 1
+
+            self.channels.setdefault(channel_id, {"channel_id": channel_id}).update(info)
+            await self.bot.db.update_force_sub_channel_info(channel_id, info)
+            return self.channels[channel_id]
+
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.error(f"Error refreshing invite link for {channel_id}: {e}")
+            return None
+
+    def forget(self, channel_id: int):
+        """Drop a removed channel"""
+        self.channels.pop(channel_id, None)
+
+    def get_title(self, channel_id: int) -> Optional[str]:
+        """Cached channel title"""
+        return self.channels.get(channel_id, {}).get("title")
+
+    def get_url(self, channel_id: int, username: Optional[str] = None) -> str:
+        """
+        Join URL for a channel (no API call)
+
+        Unknown channels get a fallback URL and are refreshed in the background.
+        """
+        info = self.channels.get(channel_id)
+        if info is None:
+            self.channels[channel_id] = info = {"channel_id": channel_id}
+            asyncio.create_task(self.refresh(channel_id))
+
+        username = username or info.get("username")
+        if username:
+            return f"https://t.me/{username}"
+        if info.get("invite_link"):
+            return info["invite_link"]
+        return f"https://t.me/c/{str(channel_id)[4:]}"
+
+    def get_stats(self) -> Dict:
+        """Get pool counters"""
+        return {
+            "channels": len(self.channels),
+            "links_created": self.links_created,
+            "refresh_errors": self.refresh_errors
+        }
+
+
+def _as_utc(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    """MongoDB returns naive UTC datetimes"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
@@ -0,0 +1,190 @@
+"""
+Short Link Store
+================
+
+File and batch links are stored in the links collection under a short
+random key and shared as "l_<key>".
+
+- Keys are random (not enumerable) and the same length for any batch size
+- Payload is compact: ID ranges, link type and options
+- Lookups go through a bounded LRU, so hot links cost no DB query
+- resolve() also understands the older link formats (file_<base64>,
+  bare base64, batch_<token>), so links already shared keep working
+- Links of more than MAX_BATCH_SIZE files are neither created nor resolved
+"""
+
+import logging
+import secrets
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from config import MAX_BATCH_SIZE
+from utils.helpers import (
+    BATCH_PREFIX, id_ranges, ranges_to_ids,
+    encode_batch_link, decode_batch_link, encode, decode
+)
+
+logger = logging.getLogger(__name__)
+
+LINK_PREFIX = "l_"
+FILE_PREFIX = "file_"
+
+# Link types
+LINK_FILE = "file"
+LINK_BATCH = "batch"
+
+
+class LinkStore:
+    """Stored short links with an LRU cache in front"""
+
+    def __init__(self, db, max_entries: int = 10000, key_bytes: int = 6):
+        """
+        Initialize Link Store
+
+        Args:
+            db: Database instance
+            max_entries: Links kept in the LRU cache
+            key_bytes: Random bytes per key (6 bytes = 8 characters)
+        """
+        self.db = db
+        self.max_entries = max_entries
+        self.key_bytes = key_bytes
+
+        # Format: {key: {"type": str, "ranges": [[first, last], ...], "options": dict}}
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+        # Format: {message_id: start parameter} for file_link()
+        self._file_links: "OrderedDict[int, str]" = OrderedDict()
+
+        # Counters
+        self.created = 0
+        self.hits = 0
+        self.misses = 0
+        self.legacy = 0
+
+    def _remember(self, key: str, link: Dict):
+        self._cache[key] = link
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def create(self, link_type: str, message_ids: Iterable[int], options: Optional[Dict] = None) -> Optional[str]:
+        """
+        Store a link
+
+        Returns:
+            Start parameter for the link, a self-contained link if the
+            database is unavailable, or None if neither works or the
+            link has more than MAX_BATCH_SIZE files
+        """
+        message_ids = list(message_ids)
+        if len(set(message_ids)) > MAX_BATCH_SIZE:
+            logger.warning(f"Not creating a {link_type} link of {len(message_ids)} files (max {MAX_BATCH_SIZE})")
+            return None
+        ranges = [list(run) for run in id_ranges(message_ids)]
+        options = options or {}
+
+        for _ in range(3):
+            key = secrets.token_urlsafe(self.key_bytes)
+            if await self.db.save_link(key, link_type, ranges, options):
+                self.created += 1
+                self._remember(key, {"type": link_type, "ranges": ranges, "options": options})
+                return LINK_PREFIX + key
+
+        # Database unavailable - fall back to links that carry their IDs
+        logger.warning(f"Could not store {link_type} link, using a self-contained link")
+        if link_type == LINK_FILE and len(message_ids) == 1:
+            # "=" is not allowed in start parameters
+            return FILE_PREFIX + (await encode(str(message_ids[0]))).rstrip("=")
+        if link_type == LINK_BATCH:
+            return await encode_batch_link(self.db, message_ids)
+        return None
+
+    async def file_link(self, message_id: int) -> Optional[str]:
+        """
+        Start parameter of a plain file link, reusing a stored one
+
+        For links generated over and over (search results): an existing
+        link with the same payload is looked up before a new one is stored.
+        """
+        start_param = self._file_links.get(message_id)
+        if start_param is not None:
+            self._file_links.move_to_end(message_id)
+            return start_param
+
+        key = await self.db.find_link(LINK_FILE, [[message_id, message_id]])
+        start_param = LINK_PREFIX + key if key else await self.create(LINK_FILE, [message_id])
+        if start_param:
+            self._file_links[message_id] = start_param
+            if len(self._file_links) > self.max_entries:
+                self._file_links.popitem(last=False)
+        return start_param
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Get a stored link by key"""
+        link = self._cache.get(key)
+        if link is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return link
+
+        self.misses += 1
+        doc = await self.db.get_link(key)
+        if not doc:
+            return None
+        link = {"type": doc["type"], "ranges": doc.get("ranges", []), "options": doc.get("options", {})}
+        self._remember(key, link)
+        return link
+
+    async def resolve(self, start_arg: str) -> Optional[Dict]:
+        """
+        Resolve a start parameter of any link format
+
+        Returns:
+            {"type": "file" | "batch", "ids": [message_id, ...], "options": dict}
+            or None if the link is invalid, gone or holds more than
+            MAX_BATCH_SIZE files
+        """
+        if start_arg.startswith(LINK_PREFIX):
+            link = await self.get(start_arg[len(LINK_PREFIX):])
+            return self._expand(link)
+
+        # Migration shim for links created before the store
+        self.legacy += 1
+
+        if start_arg.startswith(BATCH_PREFIX):
+            ids = await decode_batch_link(self.db, start_arg[len(BATCH_PREFIX):])
+            return {"type": LINK_BATCH, "ids": ids, "options": {}} if ids else None
+
+        if start_arg.startswith(FILE_PREFIX):
+            start_arg = start_arg[len(FILE_PREFIX):]
+        try:
+            decoded = await decode(start_arg + "=" * (-len(start_arg) % 4))
+        except Exception:
+            return None
+        if not decoded.isdigit():
+            return None
+        return {"type": LINK_FILE, "ids": [int(decoded)], "options": {}}
+
+    def _expand(self, link: Optional[Dict]) -> Optional[Dict]:
+        if not link:
+            return None
+        try:
+            # Sized before expanding, a single range can span millions of IDs
+            ids = ranges_to_ids(link["ranges"], max_ids=MAX_BATCH_SIZE)
+        except ValueError as e:
+            logger.warning(f"Rejected stored link: {e}")
+            return None
+        if not ids:
+            return None
+        return {"type": link["type"], "ids": ids, "options": link["options"]}
+
+    def get_stats(self) -> Dict:
+        """Get store counters"""
+        return {
+            "cached": len(self._cache),
+            "created": self.created,
+            "hits": self.hits,
+            "misses": self.misses,
+            "legacy": self.legacy
+        }
@@ -0,0 +1,228 @@
+"""
+Media Catalog
+=============
+
+Remembers the Telegram file_id (plus media type, caption and size) of
+each message in the database channel, so files can be sent with
+send_cached_media instead of copy_message.
+
+- Filled on /genlink and lazily from the first delivery of a message
+- Stored in the catalog collection, with an LRU in front
+- Delivery falls back to copy_message on a miss or if the file_id has gone stale
+- file_unique_id -> message_id index, so a file already in the channel
+  is not stored again (dedupe() rebuilds it for an existing channel)
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from pyrogram import enums
+from pyrogram.errors import FileReferenceExpired, FileIdInvalid, MediaEmpty
+
+logger = logging.getLogger(__name__)
+
+# Media that can be sent by file_id with send_cached_media
+CATALOG_MEDIA = (
+    "document", "video", "audio", "photo", "animation", "voice", "video_note", "sticker"
+)
+
+# send_cached_media errors that mean the stored file_id is no longer usable
+STALE_FILE_ERRORS = (FileReferenceExpired, FileIdInvalid, MediaEmpty)
+
+
+def catalog_entry(message) -> Optional[Dict]:
+    """
+    Catalog metadata of a message (None for deleted and service messages)
+
+    Format: {"media_type": str, "file_id": str, "file_unique_id": str,
+             "file_size": int, "file_name": str, "duration": int, "caption": str (HTML)}
+
+    Text messages get media_type "text", other messages (polls, locations,
+    contacts, dice, ...) their Pyrogram media type, both without a file_id.
+    """
+    if message is None or getattr(message, "empty", False) or getattr(message, "service", None):
+        return None
+    for media_type in CATALOG_MEDIA:
+        media = getattr(message, media_type, None)
+        if media:
+            caption = getattr(message, "caption", None)
+            return {
+                "media_type": media_type,
+                "file_id": media.file_id,
+                "file_unique_id": media.file_unique_id,
+                "file_size": getattr(media, "file_size", None) or 0,
+                "file_name": getattr(media, "file_name", None),
+                "duration": getattr(media, "duration", None),
+                "caption": caption.html if caption else None
+            }
+    media = getattr(message, "media", None)
+    return {
+        "media_type": "text" if getattr(message, "text", None) else getattr(media, "value", None) or "other",
+        "file_id": None,
+        "file_unique_id": None,
+        "file_size": 0,
+        "file_name": None,
+        "duration": None,
+        "caption": None
+    }
+
+
+class MediaCatalog:
+    """file_id cache of database channel messages"""
+
+    def __init__(self, bot, max_entries: int = 20000):
+        """
+        Initialize Media Catalog
+
+        Args:
+            bot: Bot instance (uses bot.db and the send methods)
+            max_entries: Entries kept in memory (least recently used are dropped)
+        """
+        self.bot = bot
+        self.max_entries = max_entries
+
+        # Format: {(channel_id, message_id): entry}
+        self._entries: "OrderedDict[Tuple[int, int], Dict]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.cached_sends = 0
+        self.copy_sends = 0
+        self.fallbacks = 0
+
+    def _remember(self, key: Tuple[int, int], entry: Dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, channel_id: int, message_id: int) -> Optional[Dict]:
+        """Catalog entry of a message (memory, then MongoDB)"""
+        key = (channel_id, message_id)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        found = await self.bot.db.get_catalog_entries(channel_id, [message_id])
+        entry = found.get(message_id)
+        if entry:
+            self._remember(key, entry)
+        return entry
+
+    async def record(self, channel_id: int, pairs: Iterable[Tuple[int, object]], cache: bool = True):
+        """
+        Store file_ids from messages
+
+        Args:
+            channel_id: Database channel the source messages are in
+            pairs: (source message_id, message carrying the same media) - the
+                   message can be the source itself or a copy sent by the bot
+            cache: Also keep the entries in memory (off for bulk indexing)
+        """
+        entries = {}
+        for message_id, message in pairs:
+            entry = catalog_entry(message)
+            if entry:
+                entries[message_id] = entry
+                if cache or (channel_id, message_id) in self._entries:
+                    self._remember((channel_id, message_id), entry)
+        if entries:
+            await self.bot.db.save_catalog_entries(channel_id, entries)
+
+    async def find_stored(self, channel_id: int, message) -> Optional[int]:
+        """
+        Message ID of the same file already stored in the channel
+
+        Returns:
+            None if the file is new (or its stored copy was deleted)
+        """
+        entry = catalog_entry(message)
+        if not entry or not entry["file_unique_id"]:
+            return None
+        message_id = await self.bot.db.get_stored_file(channel_id, entry["file_unique_id"])
+        if message_id is None:
+            return None
+
+        # Deleted since it was indexed
+        deliverable_ids = self.bot.deliverable_ids
+        if (deliverable_ids.channel_id == channel_id and message_id <= deliverable_ids.covered_to
+                and message_id not in deliverable_ids):
+            return None
+        return message_id
+
+    async def dedupe(self, channel_id: int) -> Dict:
+        """
+        Rebuild the file_unique_id index from the catalog (run /reindex first)
+
+        Duplicate posts are only reported: links (stored, special and
+        legacy) point at them by message ID, so deleting them would break
+        those links.
+
+        Returns:
+            {"files": files stored more than once, "duplicates": extra copies}
+        """
+        duplicates = await self.bot.db.rebuild_file_uniques(channel_id)
+        extra = sum(len(ids) for ids in duplicates.values())
+
+        logger.info(f"Dedupe of {channel_id}: {extra} duplicates of {len(duplicates)} files")
+        return {"files": len(duplicates), "duplicates": extra}
+
+    def forget(self, channel_id: int, message_ids: Iterable[int]):
+        """Drop entries from memory (e.g. stale file_ids)"""
+        for message_id in message_ids:
+            self._entries.pop((channel_id, message_id), None)
+
+    async def send(self, chat_id: int, from_chat_id: int, message_id: int,
+                   protect_content: bool = False, hide_caption: bool = False):
+        """
+        Send a database channel message to chat_id
+
+        Uses send_cached_media when the file_id is known, copy_message otherwise.
+        """
+        entry = await self.get(from_chat_id, message_id)
+        if entry and entry["file_id"]:
+            try:
+                response = await self.bot.send_cached_media(
+                    chat_id,
+                    entry["file_id"],
+                    caption="" if hide_caption else (entry["caption"] or ""),
+                    parse_mode=enums.ParseMode.HTML,
+                    protect_content=protect_content
+                )
+                self.cached_sends += 1
+                return response
+            except STALE_FILE_ERRORS as e:
+                # Stale file_id - copy and re-record below (other errors are
+                # about the recipient or the request, a copy would fail too)
+                self.fallbacks += 1
+                self.forget(from_chat_id, [message_id])
+                logger.debug(f"Cached send of {message_id} failed, copying: {e}")
+
+        response = await self.bot.copy_message(
+            chat_id=chat_id,
+            from_chat_id=from_chat_id,
+            message_id=message_id,
+            caption="" if hide_caption else None,
+            protect_content=protect_content
+        )
+        self.copy_sends += 1
+
+        # The copy carries the same media (its caption is missing if hidden).
+        # Posts without a file (text, polls, ...) are recorded already, a copy adds nothing
+        if not hide_caption and (entry is None or entry["file_id"]):
+            await self.record(from_chat_id, [(message_id, response)])
+        return response
+
+    def get_stats(self) -> Dict:
+        """Get catalog counters"""
+        return {
+            "cached": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached_sends": self.cached_sends,
+            "copy_sends": self.copy_sends,
+            "fallbacks": self.fallbacks
+        }
@@ -0,0 +1,201 @@
+"""
+Force Subscribe Membership Cache
+================================
+
+Caches force-sub membership per (user_id, channel_id).
+
+- Members are cached for positive_ttl, non-members for the (shorter) negative_ttl
+- Cache misses for several channels are looked up concurrently
+- chat_member_updated / chat_join_request updates from checked channels
+  update or invalidate entries, so joins are seen without waiting for the TTL
+- Lookup errors are not cached
+
+PendingDeepLinks parks the start link a non-subscribed user opened, so the
+delivery can resume once they join instead of the link being lost.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+from pyrogram.errors import UserNotParticipant
+
+logger = logging.getLogger(__name__)
+
+# ChatMemberStatus values that mean "not subscribed"
+NOT_MEMBER_STATUSES = ("left", "kicked", "banned")
+
+
+def is_member_status(status) -> bool:
+    """True if a chat member status counts as subscribed"""
+    return getattr(status, "value", status) not in NOT_MEMBER_STATUSES
+
+
+class MembershipCache:
+    """TTL cache of force-sub channel membership"""
+
+    def __init__(self, bot, positive_ttl: float = 600, negative_ttl: float = 30, max_entries: int = 100000):
+        """
+        Initialize Membership Cache
+
+        Args:
+            bot: Bot instance used for get_chat_member
+            positive_ttl: Seconds a "member" result is trusted
+            negative_ttl: Seconds a "not member" result is trusted
+            max_entries: Expired entries are swept once the cache grows past this
+        """
+        self.bot = bot
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        # Format: {(user_id, channel_id): (is_member, expires_at)}
+        self._entries: Dict[Tuple[int, int], Tuple[bool, float]] = {}
+
+        # Channels membership was checked for (updates from other chats are ignored)
+        self._channels: Set[int] = set()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def check(self, user_id: int, channel_ids: Iterable[int]) -> Dict[int, bool]:
+        """
+        Get membership of a user in each channel
+
+        Returns:
+            {channel_id: is_member}
+        """
+        now = time.monotonic()
+        result: Dict[int, bool] = {}
+        missing = []
+
+        for channel_id in channel_ids:
+            self._channels.add(channel_id)
+            entry = self._entries.get((user_id, channel_id))
+            if entry and entry[1] > now:
+                self.hits += 1
+                result[channel_id] = entry[0]
+            else:
+                self.misses += 1
+                missing.append(channel_id)
+
+        if missing:
+            fetched = await asyncio.gather(*(self._fetch(user_id, channel_id) for channel_id in missing))
+            result.update(zip(missing, fetched))
+
+        return result
+
+    async def _fetch(self, user_id: int, channel_id: int) -> bool:
+        try:
+            member = await self.bot.get_chat_member(channel_id, user_id)
+            is_member = is_member_status(member.status)
+        except UserNotParticipant:
+            is_member = False
+        except Exception as e:
+            logger.debug(f"Membership check failed for {user_id} in {channel_id}: {e}")
+            return False
+
+        self.set(user_id, channel_id, is_member)
+        return is_member
+
+    def set(self, user_id: int, channel_id: int, is_member: bool):
+        """Store a membership result"""
+        ttl = self.positive_ttl if is_member else self.negative_ttl
+        self._entries[(user_id, channel_id)] = (is_member, time.monotonic() + ttl)
+
+        if len(self._entries) > self.max_entries:
+            now = time.monotonic()
+            self._entries = {key: entry for key, entry in self._entries.items() if entry[1] > now}
+
+    def invalidate(self, user_id: int, channel_id: Optional[int] = None):
+        """Drop cached membership of a user (in one channel or all)"""
+        if channel_id is not None:
+            if self._entries.pop((user_id, channel_id), None):
+                self.invalidations += 1
+            return
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+            self.invalidations += 1
+
+    # ===================================
+    # UPDATE HANDLERS
+    # ===================================
+
+    def on_member_updated(self, update):
+        """Apply a chat_member_updated update"""
+        channel_id = update.chat.id
+        if channel_id not in self._channels:
+            return
+        member = update.new_chat_member or update.old_chat_member
+        if not member or not member.user:
+            return
+        is_member = bool(update.new_chat_member) and is_member_status(update.new_chat_member.status)
+        self.set(member.user.id, channel_id, is_member)
+
+    def on_join_request(self, request):
+        """Apply a chat_join_request update"""
+        if request.chat.id in self._channels:
+            self.invalidate(request.from_user.id, request.chat.id)
+
+    def get_stats(self) -> Dict:
+        """Get cache counters"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
+
+
+class PendingDeepLinks:
+    """Start-link arguments parked per user until they join the force-sub channels"""
+
+    def __init__(self, ttl: float = 900, max_entries: int = 50000):
+        """
+        Initialize Pending Deep Links
+
+        Args:
+            ttl: Seconds a parked link stays valid
+            max_entries: Expired links are swept once this many are parked
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # Format: {user_id: (start_arg, expires_at)}
+        self._links: Dict[int, Tuple[str, float]] = {}
+
+        # Counters
+        self.parked = 0
+        self.resumed = 0
+
+    def park(self, user_id: int, start_arg: str):
+        """Remember the link a user opened (replaces an older one)"""
+        self._links[user_id] = (start_arg, time.monotonic() + self.ttl)
+        self.parked += 1
+
+        if len(self._links) > self.max_entries:
+            now = time.monotonic()
+            self._links = {key: entry for key, entry in self._links.items() if entry[1] > now}
+
+    def has(self, user_id: int) -> bool:
+        """True if the user has a parked, unexpired link"""
+        entry = self._links.get(user_id)
+        return bool(entry) and entry[1] > time.monotonic()
+
+    def pop(self, user_id: int) -> Optional[str]:
+        """Take the parked link of a user (None if missing or expired)"""
+        entry = self._links.pop(user_id, None)
+        if not entry or entry[1] <= time.monotonic():
+            return None
+        self.resumed += 1
+        return entry[0]
+
+    def get_stats(self) -> Dict:
+        """Get counters"""
+        return {
+            "pending": len(self._links),
+            "parked": self.parked,
+            "resumed": self.resumed
+        }
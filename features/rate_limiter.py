@@ -0,0 +1,243 @@
+"""
+Outbound Rate Limiter
+=====================
+
+One governor for every outbound Telegram call.
+
+- Global token bucket caps total calls per second across the bot
+- Per-chat token buckets cap calls into a single chat
+- FloodWait backs off AIMD-style on the bucket it hit: a call into a chat
+  halves that chat's rate and pauses only that chat, a call without a
+  chat does the same for the whole bot; rates recover additively on success
+- FloodWait is retried automatically (up to max_retries)
+- Re-entrant: calls made from inside a governed call (copy_message
+  fetches its source with get_messages, then sends it) run straight
+  through, the outer call already holds a token and retries as a whole
+
+Counters in get_status() show how close the bot runs to Telegram's limits.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from pyrogram.errors import FloodWait
+
+logger = logging.getLogger(__name__)
+
+# True while the current task is inside a governed call
+_governed: contextvars.ContextVar = contextvars.ContextVar("governed", default=False)
+
+
+class TokenBucket:
+    """Token bucket with AIMD rate adjustment"""
+
+    def __init__(self, rate: float, capacity: float, min_rate: float = 0.1):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+        # No calls until this monotonic time after a FloodWait
+        self.paused_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        """
+        Take one token
+
+        Returns:
+            Seconds the caller must wait before its call (0 if a token was free)
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def decrease(self, factor: float = 0.5):
+        """Multiplicative decrease after a FloodWait"""
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.tokens = min(self.tokens, 0)
+
+    def increase(self, step: float):
+        """Additive increase after a successful call"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + step / self.rate)
+
+
+class OutboundGovernor:
+    """
+    Rate limits and retries outbound Telegram API calls
+
+    Usage:
+        await governor.call(chat_id, client_method, *args, **kwargs)
+
+    chat_id=None only counts against the global bucket. Calls that also
+    touch another peer (copy/forward from a channel) pass sole_peer=False,
+    so their errors are not pinned on chat_id alone.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 25.0,
+        per_chat_rate: float = 1.0,
+        per_chat_burst: int = 20,
+        max_retries: int = 3,
+        max_chats: int = 10000
+    ):
+        """
+        Initialize Outbound Governor
+
+        Args:
+            global_rate: Calls per second across all chats
+            per_chat_rate: Calls per second into a single chat
+            per_chat_burst: Calls a chat may receive back-to-back
+            max_retries: FloodWait retries per call
+            max_chats: Per-chat buckets kept in memory (least recently used are dropped)
+        """
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+
+        # Format: {chat_id: TokenBucket}
+        self.chat_buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+
+        # Whole bot is paused until this monotonic time after a FloodWait outside a chat
+        self.paused_until = 0.0
+
+        # Optional callback(chat_id, exception, sole_peer) for failed calls (e.g. dead recipient pruning)
+        self.error_hook = None
+
+        # Counters
+        self.calls = 0
+        self.throttled = 0
+        self.flood_waits = 0
+        self.retries = 0
+        self.nested = 0
+        self.flood_wait_seconds = 0
+        self.throttle_seconds = 0.0
+        self.max_flood_wait = 0
+        self._window_start = time.monotonic()
+        self._window_calls = 0
+        self.calls_per_second = 0.0
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+            self.chat_buckets[chat_id] = bucket
+            if len(self.chat_buckets) > self.max_chats:
+                self.chat_buckets.popitem(last=False)
+        else:
+            self.chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    async def acquire(self, chat_id: Optional[int] = None):
+        """Wait until a call into chat_id is allowed"""
+        now = time.monotonic()
+        wait = max(0.0, self.paused_until - now)
+        wait = max(wait, self.global_bucket.reserve(now))
+        if chat_id is not None:
+            bucket = self._chat_bucket(chat_id)
+            wait = max(wait, bucket.paused_until - now, bucket.reserve(now))
+
+        if wait > 0:
+            self.throttled += 1
+            self.throttle_seconds += wait
+            await asyncio.sleep(wait)
+
+    async def call(self, chat_id: Optional[int], func, *args, sole_peer: bool = True, **kwargs):
+        """
+        Run func(*args, **kwargs) under the rate limits, retrying on FloodWait
+
+        Args:
+            sole_peer: False if the call also resolves a peer other than chat_id
+        """
+        # Nested in another governed call: its errors belong to the outer call
+        if _governed.get():
+            self.nested += 1
+            return await func(*args, **kwargs)
+
+        attempt = 0
+        while True:
+            await self.acquire(chat_id)
+            token = _governed.set(True)
+            try:
+                result = await func(*args, **kwargs)
+            except FloodWait as e:
+                self._on_flood_wait(chat_id, e.value)
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                continue
+            except Exception as e:
+                if self.error_hook is not None:
+                    self.error_hook(chat_id, e, sole_peer)
+                raise
+            finally:
+                _governed.reset(token)
+
+            self._on_success(chat_id)
+            return result
+
+    def _on_flood_wait(self, chat_id: Optional[int], seconds: int):
+        self.flood_waits += 1
+        self.flood_wait_seconds += seconds
+        self.max_flood_wait = max(self.max_flood_wait, seconds)
+        until = time.monotonic() + seconds
+
+        # A chat's FloodWait only slows that chat, the rest of the bot keeps going
+        if chat_id is None:
+            bucket = self.global_bucket
+            self.paused_until = max(self.paused_until, until)
+        else:
+            bucket = self._chat_bucket(chat_id)
+            bucket.paused_until = max(bucket.paused_until, until)
+        bucket.decrease()
+
+        logger.warning(
+            f"FloodWait {seconds}s ({f'chat {chat_id}' if chat_id is not None else 'global'}) - "
+            f"rate now {bucket.rate:.2f}/s"
+        )
+
+    def _on_success(self, chat_id: Optional[int]):
+        self.calls += 1
+        self._window_calls += 1
+
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self.calls_per_second = self._window_calls / (now - self._window_start)
+            self._window_start = now
+            self._window_calls = 0
+
+        self.global_bucket.increase(1.0)
+        if chat_id is not None:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is not None:
+                bucket.increase(0.1)
+
+    def get_status(self) -> Dict:
+        """Get governor counters"""
+        return {
+            "calls": self.calls,
+            "calls_per_second": round(self.calls_per_second, 1),
+            "global_rate": round(self.global_bucket.rate, 1),
+            "global_max_rate": self.global_bucket.max_rate,
+            "utilization": round(self.calls_per_second / self.global_bucket.max_rate * 100, 1),
+            "throttled": self.throttled,
+            "throttle_seconds": round(self.throttle_seconds, 1),
+            "flood_waits": self.flood_waits,
+            "flood_wait_seconds": self.flood_wait_seconds,
+            "max_flood_wait": self.max_flood_wait,
+            "retries": self.retries,
+            "nested": self.nested,
+            "tracked_chats": len(self.chat_buckets)
+        }
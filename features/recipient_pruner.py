@@ -0,0 +1,115 @@
+"""
+Dead Recipient Pruner
+=====================
+
+Users who blocked the bot or deleted their account are detected from
+outbound send errors (reported by the outbound governor) and marked
+reachable=False in MongoDB.
+
+- Errors are buffered and written with one bulk_write per flush
+- Broadcast audiences skip unreachable users
+- A user who sends /start again is marked reachable again
+- Admins can archive or purge unreachable users (/prune_users)
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+from pyrogram.errors import UserIsBlocked, InputUserDeactivated, PeerIdInvalid
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the user can never receive messages from the bot again
+DEAD_RECIPIENT_ERRORS = (UserIsBlocked, InputUserDeactivated, PeerIdInvalid)
+
+# Errors that may be about any peer of the call, only counted when the user is the only one
+AMBIGUOUS_PEER_ERRORS = (PeerIdInvalid,)
+
+
+class RecipientPruner:
+    """Buffers dead recipients and marks them unreachable in bulk"""
+
+    def __init__(self, db, flush_interval: float = 5.0, max_pending: int = 500):
+        """
+        Initialize Recipient Pruner
+
+        Args:
+            db: Database instance
+            flush_interval: Seconds between flushes
+            max_pending: Flush early once this many users are pending
+        """
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        # Format: {user_id: error name}
+        self._pending: Dict[int, str] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.reported = 0
+        self.marked = 0
+
+    def report(self, chat_id: Optional[int], error: Exception, sole_peer: bool = True):
+        """
+        Governor error hook: record chat_id if error means a dead recipient
+
+        Args:
+            sole_peer: False if the call also touched another peer (copying
+                       from the database channel), whose PeerIdInvalid is
+                       not the user's
+        """
+        # Only private chats are users (groups/channels have negative IDs)
+        if chat_id is None or not isinstance(chat_id, int) or chat_id <= 0:
+            return
+        if not isinstance(error, DEAD_RECIPIENT_ERRORS):
+            return
+        if not sole_peer and isinstance(error, AMBIGUOUS_PEER_ERRORS):
+            return
+
+        self._pending[chat_id] = type(error).__name__
+        self.reported += 1
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write what is pending"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Mark all pending users unreachable with a single bulk write"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self.marked += await self.db.mark_users_unreachable(pending)
+        logger.info(f"Marked {len(pending)} users unreachable")
+
+    def get_stats(self) -> Dict:
+        """Get pruner counters"""
+        return {
+            "pending": len(self._pending),
+            "reported": self.reported,
+            "marked": self.marked
+        }
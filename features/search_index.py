@@ -0,0 +1,352 @@
+"""
+Search Index
+============
+
+In-memory inverted index over the file names and captions of the
+database channel files, for /search.
+
+- Built from the catalog collection on startup, then kept current by
+  the catalog indexer (syncs, new posts, the bot's own posts, deletions)
+- Query words of MIN_PREFIX letters or more also match as a prefix
+  ("epi" finds "episode"), through a sorted vocabulary with bisect and
+  up to MAX_EXPANSIONS words
+- Results must match every word and are ranked by word rarity (IDF),
+  file name matches count double, exact words beat prefixes, then
+  newest first
+- Matches are collected newest first from the rarest query word and
+  collection stops at MAX_CANDIDATES, so a broad word ("mkv") ranks its
+  newest matches instead of the whole channel
+- Postings are kept in message ID order: a word that gets an older
+  message (an edit, a sync window finishing out of order) is re-sorted
+  once, on its next query
+- At most MAX_RESULTS ranked results are kept per query (MAX_USER_QUERIES
+  per user), so paging costs no new search
+"""
+
+import bisect
+import heapq
+import html
+import logging
+import math
+import re
+import secrets
+import time
+from collections import OrderedDict, deque
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from features.deliverable_ids import SKIPPED_MEDIA
+from features.media_catalog import CATALOG_MEDIA
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+TAG_RE = re.compile(r"<[^>]+>")
+
+# Field weights (a word in both adds up)
+NAME_WEIGHT = 2
+CAPTION_WEIGHT = 1
+
+# Prefix matches count less than whole words
+PREFIX_FACTOR = 0.6
+
+TITLE_LENGTH = 60
+
+# New words in one add() above which the vocabulary is re-sorted
+BULK_WORDS = 256
+
+# Shorter query words only match whole words
+MIN_PREFIX = 3
+
+# Vocabulary words one query word can match as a prefix
+MAX_EXPANSIONS = 32
+
+# Prefix matches of other query words are merged up to this many postings
+MERGE_LIMIT = 2000
+
+# Query words used (the rest are ignored)
+MAX_QUERY_WORDS = 8
+
+# Matches ranked per query, and ranked results kept for paging
+MAX_CANDIDATES = 1000
+MAX_RESULTS = 500
+
+# Paged queries kept per user (older ones expire first)
+MAX_USER_QUERIES = 5
+
+# Results per page
+PAGE_SIZE = 10
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase words of a text (letters and digits, "_" and punctuation split words)"""
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _caption_text(caption: Optional[str]) -> str:
+    """Plain text of an HTML caption"""
+    return html.unescape(TAG_RE.sub(" ", caption)) if caption else ""
+
+
+class SearchIndex:
+    """Inverted index of the database channel files"""
+
+    def __init__(self, bot, max_queries: int = 1000):
+        """
+        Initialize Search Index
+
+        Args:
+            bot: Bot instance (uses bot.db_channel and bot.db)
+            max_queries: Ranked results kept for paging
+        """
+        self.bot = bot
+        self.max_queries = max_queries
+
+        self.channel_id: Optional[int] = None
+
+        # Format: {word: {message_id: field weight}}
+        self._postings: Dict[str, Dict[int, int]] = {}
+
+        # Sorted words, for prefix lookups
+        self._vocab: List[str] = []
+
+        # Words whose postings are no longer in message ID order
+        self._unsorted: set = set()
+
+        # Format: {message_id: (title, words)}
+        self._docs: Dict[int, Tuple[str, Tuple[str, ...]]] = {}
+
+        # Format: {query_id: (user_id, query, ranked message IDs, more)}
+        self._queries: "OrderedDict[str, Tuple[int, str, List[int], bool]]" = OrderedDict()
+
+        # Format: {user_id: deque of query IDs, oldest first}
+        self._user_queries: Dict[int, deque] = {}
+
+        # Counters
+        self.searches = 0
+        self.search_ms = 0.0
+
+    async def load(self):
+        """Build the index from the catalog collection"""
+        self.channel_id = self.bot.db_channel
+        self._postings = {}
+        self._vocab = []
+        self._unsorted = set()
+        self._docs = {}
+        self._queries.clear()
+        self._user_queries.clear()
+        if not self.channel_id:
+            return
+
+        entries = await self.bot.db.get_catalog_search_entries(self.channel_id)
+        self.add((entry["message_id"], entry) for entry in entries)
+        logger.info(f"✓ Search index: {len(self._docs)} files, {len(self._vocab)} words")
+
+    def add(self, pairs: Iterable[Tuple[int, Dict]]):
+        """Index (message_id, catalog entry) pairs (re-adding a message replaces it)"""
+        new_words: List[str] = []
+        for message_id, entry in pairs:
+            if message_id in self._docs:
+                self.remove([message_id])
+            # Only files (not text posts, polls, ...)
+            if entry.get("media_type") not in CATALOG_MEDIA or entry.get("media_type") in SKIPPED_MEDIA:
+                continue
+
+            caption = _caption_text(entry.get("caption"))
+            weights: Dict[str, int] = {}
+            for word in set(tokenize(entry.get("file_name"))):
+                weights[word] = NAME_WEIGHT
+            for word in set(tokenize(caption)):
+                weights[word] = weights.get(word, 0) + CAPTION_WEIGHT
+            if not weights:
+                continue
+
+            for word, weight in weights.items():
+                postings = self._postings.get(word)
+                if postings is None:
+                    postings = self._postings[word] = {}
+                    new_words.append(word)
+                elif message_id < next(reversed(postings)):
+                    self._unsorted.add(word)
+                postings[message_id] = weight
+
+            title = entry.get("file_name") or caption.strip().split("\n", 1)[0] or entry.get("media_type", "file")
+            self._docs[message_id] = (title[:TITLE_LENGTH], tuple(weights))
+
+        # Inserting one by one is quadratic for a big load, sort once instead
+        if len(new_words) > BULK_WORDS:
+            self._vocab = sorted(self._postings)
+        else:
+            for word in new_words:
+                bisect.insort(self._vocab, word)
+
+    def remove(self, message_ids: Iterable[int]):
+        """Drop messages from the index"""
+        for message_id in message_ids:
+            doc = self._docs.pop(message_id, None)
+            if doc is None:
+                continue
+            for word in doc[1]:
+                postings = self._postings.get(word)
+                if postings is None:
+                    continue
+                postings.pop(message_id, None)
+                if not postings:
+                    del self._postings[word]
+                    del self._vocab[bisect.bisect_left(self._vocab, word)]
+                    self._unsorted.discard(word)
+
+    def _sorted_postings(self, word: str) -> Optional[Dict[int, int]]:
+        """Postings of a word, in message ID order"""
+        if word in self._unsorted:
+            self._unsorted.discard(word)
+            self._postings[word] = dict(sorted(self._postings[word].items()))
+        return self._postings.get(word)
+
+    def _expand(self, term: str) -> List[Tuple[float, Dict[int, int]]]:
+        """(IDF, postings) of the word and, for long enough terms, words starting with it"""
+        total = len(self._docs)
+        if len(term) < MIN_PREFIX:
+            postings = self._sorted_postings(term)
+            return [(math.log(1 + total / len(postings)), postings)] if postings else []
+
+        matches = []
+        start = bisect.bisect_left(self._vocab, term)
+        for word in self._vocab[start:start + MAX_EXPANSIONS]:
+            if not word.startswith(term):
+                break
+            postings = self._sorted_postings(word)
+            idf = math.log(1 + total / len(postings))
+            matches.append((idf if word == term else idf * PREFIX_FACTOR, postings))
+        return matches
+
+    @staticmethod
+    def _merge(matches: List[Tuple[float, Dict[int, int]]]) -> List[Tuple[float, Dict[int, float]]]:
+        """One (1.0, best score per message) entry for the words of a prefix"""
+        merged: Dict[int, float] = {}
+        for idf, postings in matches:
+            for message_id, weight in postings.items():
+                score = weight * idf
+                if score > merged.get(message_id, 0.0):
+                    merged[message_id] = score
+        return [(1.0, merged)]
+
+    @staticmethod
+    def _newest(idf: float, postings: Dict[int, int]) -> Iterator[Tuple[int, float]]:
+        """(message_id, score) of one word, newest first"""
+        for message_id in reversed(postings):
+            yield message_id, postings[message_id] * idf
+
+    def search(self, query: str) -> Tuple[List[int], bool]:
+        """
+        Ranked message IDs matching every word of the query
+
+        Returns:
+            (message IDs best match first, at most MAX_RESULTS;
+             True if more files match than were ranked or returned)
+        """
+        started = time.perf_counter()
+        words = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_WORDS]
+        terms = [self._expand(word) for word in words]
+        scores: Dict[int, float] = {}
+        more = False
+
+        if terms and all(terms):
+            # The rarest word drives, the others are looked up per candidate
+            terms.sort(key=lambda matches: sum(len(postings) for _, postings in matches))
+            others = [
+                self._merge(matches) if len(matches) > 1 and sum(len(p) for _, p in matches) <= MERGE_LIMIT
+                else matches
+                for matches in terms[1:]
+            ]
+
+            # Postings are in message ID order (_sorted_postings), the words
+            # of a prefix are merged newest first
+            candidates = heapq.merge(
+                *(self._newest(idf, postings) for idf, postings in terms[0]),
+                key=itemgetter(0), reverse=True
+            ) if len(terms[0]) > 1 else self._newest(*terms[0][0])
+
+            previous = None
+            for message_id, score in candidates:
+                # Also in an earlier (closer) word of the prefix
+                if message_id == previous:
+                    continue
+                previous = message_id
+                for matches in others:
+                    best = 0.0
+                    for idf, postings in matches:
+                        weight = postings.get(message_id)
+                        if weight and weight * idf > best:
+                            best = weight * idf
+                    if not best:
+                        break
+                    score += best
+                else:
+                    scores[message_id] = score
+                    if len(scores) >= MAX_CANDIDATES:
+                        more = True
+                        break
+
+        # Newest first among equal scores (the sort is stable)
+        results = sorted(scores, reverse=True)
+        results.sort(key=scores.__getitem__, reverse=True)
+        if len(results) > MAX_RESULTS:
+            del results[MAX_RESULTS:]
+            more = True
+
+        self.searches += 1
+        self.search_ms += (time.perf_counter() - started) * 1000
+        return results, more
+
+    def title(self, message_id: int) -> str:
+        """Display title of an indexed message"""
+        doc = self._docs.get(message_id)
+        return doc[0] if doc else str(message_id)
+
+    # ===================================
+    # RESULT PAGING
+    # ===================================
+
+    def remember(self, user_id: int, query: str, results: List[int], more: bool = False) -> str:
+        """Keep ranked results for paging buttons, returns their query ID"""
+        query_id = secrets.token_urlsafe(6)
+        self._queries[query_id] = (user_id, query, results[:MAX_RESULTS], more)
+
+        user_queries = self._user_queries.setdefault(user_id, deque())
+        user_queries.append(query_id)
+        if len(user_queries) > MAX_USER_QUERIES:
+            self._queries.pop(user_queries.popleft(), None)
+
+        if len(self._queries) > self.max_queries:
+            dropped_id, (dropped_user, *_) = self._queries.popitem(last=False)
+            self._forget(dropped_user, dropped_id)
+        return query_id
+
+    def _forget(self, user_id: int, query_id: str):
+        user_queries = self._user_queries.get(user_id)
+        if user_queries is None:
+            return
+        try:
+            user_queries.remove(query_id)
+        except ValueError:
+            pass
+        if not user_queries:
+            del self._user_queries[user_id]
+
+    def recall(self, query_id: str) -> Optional[Tuple[str, List[int], bool]]:
+        """(query, ranked results, more) of an earlier query (None once dropped)"""
+        found = self._queries.get(query_id)
+        if found is None:
+            return None
+        self._queries.move_to_end(query_id)
+        return found[1:]
+
+    def get_stats(self) -> Dict:
+        """Get index counters"""
+        return {
+            "files": len(self._docs),
+            "words": len(self._vocab),
+            "searches": self.searches,
+            "avg_ms": round(self.search_ms / self.searches, 2) if self.searches else 0.0
+        }
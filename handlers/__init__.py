@@ -12,6 +12,7 @@ Structure:
 - settings.py: Settings panel commands
 - fsub.py: Force subscribe management
 - callback.py: All callback query handlers
+- search.py: /search and result paging
 - messages.py: Text message handlers
 
 Usage:
@@ -23,6 +24,7 @@ register_all_handlers(bot)
 from .admin import register_admin_handlers
 from .settings import register_settings_handlers
 from .fsub import register_fsub_handlers
+from .search import register_search_handlers
 from .messages import register_message_handlers
 
 def register_all_handlers(bot):
@@ -41,6 +43,9 @@ def register_all_handlers(bot):
     # Register force subscribe handlers
     register_fsub_handlers(bot)
     
+    # Register search handlers
+    register_search_handlers(bot)
+    
     # Register message handlers (must be last - catches non-command text)
     register_message_handlers(bot)
     
@@ -54,5 +59,6 @@ __all__ = [
     'register_admin_handlers',
     'register_settings_handlers',
     'register_fsub_handlers',
+    'register_search_handlers',
     'register_message_handlers',
 ]
@@ -511,6 +511,7 @@ async def users_command(bot, message: Message):
         # Get counts
         total_users = await bot.db.total_users_count()
         banned_users = await bot.db.get_banned_count()
+        unreachable_users = await bot.db.unreachable_users_count()
         active_users = total_users - banned_users
         
         # Get stats picture
@@ -523,7 +524,8 @@ async def users_command(bot, message: Message):
             "<blockquote>"
             f"<b>📊 Total Users:</b> {total_users:,}\n"
             f"<b>✅ Active Users:</b> {active_users:,}\n"
-            f"<b>🚫 Banned Users:</b> {banned_users:,}\n\n"
+            f"<b>🚫 Banned Users:</b> {banned_users:,}\n"
+            f"<b>👻 Unreachable Users:</b> {unreachable_users:,}\n\n"
             f"<i>Last updated: {datetime.datetime.now().strftime('%H:%M:%S')}</i>"
             "</blockquote>"
         )
@@ -595,6 +597,29 @@ async def stats_command(bot, message: Message):
         # Get db channel
         db_channel = await bot.db.get_db_channel()
         
+        # Settings cache counters
+        cache_stats = bot.db.get_settings_cache_stats()
+        
+        # Write-behind user buffer
+        buffer_stats = bot.db.get_user_buffer_stats()
+        
+        # Outbound rate limiter
+        governor_stats = bot.governor.get_status()
+        
+        # Force-sub membership cache
+        membership_stats = bot.membership.get_stats()
+        link_stats = bot.link_store.get_stats()
+        plan_stats = bot.delivery_plans.get_stats()
+        catalog_stats = bot.media_catalog.get_stats()
+        indexer_status = bot.catalog_indexer.get_status()
+        deliverable_stats = bot.deliverable_ids.get_stats()
+        search_stats = bot.search_index.get_stats()
+        catalog_count = await bot.db.catalog_count(bot.db_channel) if bot.db_channel else 0
+        
+        # Database channel admin check (cached)
+        channel_health = bot.channel_health.get_status()
+        channel_checked = channel_health["checked_at"].strftime('%H:%M:%S') if channel_health["checked_at"] else "never"
+        
         # Get stats picture
         welcome_pics = settings.get("welcome_pics", Config.WELCOME_PICS)
         stats_pic = get_random_pic(welcome_pics)
@@ -608,7 +633,25 @@ async def stats_command(bot, message: Message):
             f"<b>🚫 Banned:</b> {banned_users:,}\n"
             f"<b>👑 Admins:</b> {len(all_admins)}\n"
             f"<b>📢 Force Sub:</b> {len(force_sub_channels)}\n"
-            f"<b>💾 DB Channel:</b> {'✅' if db_channel else '❌'}\n\n"
+            f"<b>💾 DB Channel:</b> {'✅' if db_channel else '❌'}"
+            f" ({'admin' if channel_health['healthy'] else channel_health['error'] or 'unchecked'}, checked {channel_checked})\n"
+            f"<b>⚙️ Settings Cache:</b> {cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses\n"
+            f"<b>📝 User Writes:</b> {buffer_stats.get('queue_depth', 0)} queued, "
+            f"{buffer_stats.get('last_flush_ms', 0)}ms last flush\n"
+            f"<b>🚦 API Rate:</b> {governor_stats['calls_per_second']}/s "
+            f"({governor_stats['utilization']}% of {governor_stats['global_rate']}/s), "
+            f"{governor_stats['flood_waits']} FloodWaits\n"
+            f"<b>📢 FSub Cache:</b> {membership_stats['hits']:,} hits / {membership_stats['misses']:,} misses\n"
+            f"<b>🔗 Link Cache:</b> {link_stats['hits']:,} hits / {link_stats['misses']:,} misses\n"
+            f"<b>📦 Plan Cache:</b> {plan_stats['hits']:,} hits / {plan_stats['misses']:,} misses, "
+            f"{plan_stats['coalesced']:,} coalesced\n"
+            f"<b>🗂 Cached Sends:</b> {catalog_stats['cached_sends']:,} by file_id / "
+            f"{catalog_stats['copy_sends']:,} copied\n"
+            f"<b>📚 Catalog:</b> {catalog_count:,} messages"
+            f"{' (indexing...)' if indexer_status['running'] else ''}, "
+            f"{deliverable_stats['skipped']:,} dead IDs skipped\n"
+            f"<b>🔎 Search:</b> {search_stats['files']:,} files, {search_stats['searches']:,} searches "
+            f"({search_stats['avg_ms']}ms avg)\n\n"
             f"<i>Updated: {datetime.datetime.now().strftime('%H:%M:%S')}</i>"
             "</blockquote>"
         )
@@ -724,6 +767,12 @@ async def logs_command(bot, message: Message):
         await bot.store_bot_message(user_id, response.id)
 
 
+async def prune_users_command(bot, message: Message):
+    """Archive or delete users marked unreachable (Bot.handle_prune_users)"""
+    if await bot.is_user_admin(message.from_user.id):
+        await bot.handle_prune_users(message)
+
+
 # ==========================================
 # HANDLER REGISTRATION
 # ==========================================
@@ -774,4 +823,30 @@ def register_admin_handlers(bot):
     async def logs_handler(client, message):
         await logs_command(bot, message)
     
+    # Prune, catalog and ingest commands live on the bot (also registered by Bot.register_handlers)
+    @bot.on_message(filters.command("prune_users") & filters.private)
+    async def prune_users_handler(client, message):
+        await prune_users_command(bot, message)
+    
+    @bot.on_message(filters.command("reindex") & filters.private)
+    async def reindex_handler(client, message):
+        if await bot.is_user_admin(message.from_user.id):
+            await bot.handle_reindex(message)
+    
+    @bot.on_message(filters.command("dedupe") & filters.private)
+    async def dedupe_handler(client, message):
+        if await bot.is_user_admin(message.from_user.id):
+            await bot.handle_dedupe(message)
+    
+    @bot.on_message(filters.command("ingest") & filters.private)
+    async def ingest_handler(client, message):
+        if await bot.is_user_admin(message.from_user.id):
+            await bot.handle_ingest(message)
+    
+    # Runs before the batch/forward handlers, only claims files of an ingest session
+    @bot.on_message(filters.private & filters.media, group=-1)
+    async def ingest_file_handler(client, message):
+        if message.from_user and await bot.bulk_ingest.add(message.from_user.id, message):
+            message.stop_propagation()
+    
     logger.info("✓ Admin handlers registered")
@@ -40,7 +40,7 @@ async def handle_callback_query(bot, query: CallbackQuery):
             "stats_menu", "users_menu", "add_fsub_menu", "del_fsub_menu",
             "refresh_fsub", "test_fsub", "reqfsub_on", "reqfsub_off",
             "refresh_users", "refresh_stats", "refresh_autodel", 
-            "toggle_protect_content", "toggle_hide_caption", 
+            "toggle_protect_content", "toggle_hide_caption", "toggle_album_mode",
             "toggle_channel_button", "toggle_auto_delete", 
             "toggle_clean_conversation", "toggle_show_instruction",
             "custom_buttons_menu", "custom_texts_menu", "more_stats",
@@ -176,6 +176,8 @@ async def handle_callback_query(bot, query: CallbackQuery):
         elif data == "check_fsub":
             await query.answer("🔄 Checking subscription...")
             
+            # They just joined: a cached "not a member" would still say no
+            bot.membership.invalidate(user_id)
             user_is_subscribed = await is_subscribed(bot, user_id, bot.force_sub_channels)
             
             if user_is_subscribed:
@@ -184,6 +186,10 @@ async def handle_callback_query(bot, query: CallbackQuery):
                 except:
                     pass
                 
+                # Continue with the link they originally opened
+                if await bot.resume_deep_link(user_id):
+                    return
+                
                 await show_welcome_callback(bot, query)
             else:
                 await query.answer("❌ Please join all channels first!", show_alert=True)
@@ -535,6 +541,7 @@ async def show_files_settings(bot, query: CallbackQuery):
     protect_content = settings.get("protect_content", True)
     hide_caption = settings.get("hide_caption", False)
     channel_button = settings.get("channel_button", True)
+    album_mode = settings.get("album_mode", False)
     files_pics = settings.get("files_pics", Config.FILES_PICS)
     files_pic = get_random_pic(files_pics)
 
@@ -549,6 +556,9 @@ async def show_files_settings(bot, query: CallbackQuery):
             InlineKeyboardButton(f"📘 ʙᴜᴛᴛᴏɴ: {'✅' if channel_button else '❌'}", callback_data="toggle_channel_button"),
             InlineKeyboardButton("📘 ᴄᴜsᴛᴏᴍ ʙᴜᴛᴛᴏɴ", callback_data="custom_buttons_menu")
         ],
+        [
+            InlineKeyboardButton(f"🗂 ᴀʟʙᴜᴍ ᴍᴏᴅᴇ: {'✅' if album_mode else '❌'}", callback_data="toggle_album_mode")
+        ],
         [
             InlineKeyboardButton("🔙 ʙᴀᴄᴋ", callback_data="settings_menu"),
             InlineKeyboardButton("❌ ᴄʟᴏsᴇ", callback_data="close")
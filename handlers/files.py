@@ -10,7 +10,6 @@ import logging
 from pyrogram import filters, enums
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from config import Config, MAX_BATCH_SIZE, MAX_SPECIAL_FILES, MAX_CUSTOM_BATCH
-from utils.helpers import encode, decode
 
 logger = logging.getLogger(__name__)
 
@@ -48,34 +47,38 @@ async def genlink_handler(bot, message: Message):
         await bot.auto_delete.store_bot_message(user_id, response.id)
         return
 
-    try:
-        # Check if bot is admin in database channel
-        me = await bot.get_me()
-        bot_id = me.id
-        member = await bot.get_chat_member(bot.db_channel, bot_id)
-        if member.status not in ["administrator", "creator"]:
-            response = await message.reply("❌ <b>Bot is not admin in the database channel!</b>", parse_mode=enums.ParseMode.HTML)
-            await bot.auto_delete.store_bot_message(user_id, response.id)
-            return
-    except Exception as e:
-        logger.error(f"Error checking admin status: {e}")
-        response = await message.reply("❌ <b>Cannot access database channel!</b>", parse_mode=enums.ParseMode.HTML)
+    # Check if bot is admin in database channel (cached, refreshed in the background)
+    if not await bot.channel_health.ensure():
+        response = await message.reply("❌ <b>Bot is not admin in the database channel!</b>", parse_mode=enums.ParseMode.HTML)
         await bot.auto_delete.store_bot_message(user_id, response.id)
         return
 
     try:
-        forwarded = await message.reply_to_message.forward(bot.db_channel)
+        # Reuse the stored copy if this file is already in the database channel
+        file_msg_id = await bot.media_catalog.find_stored(bot.db_channel, message.reply_to_message)
+        if file_msg_id is None:
+            forwarded = await message.reply_to_message.forward(bot.db_channel)
+            await bot.catalog_indexer.on_stored(bot.db_channel, [forwarded])
+            file_msg_id = forwarded.id
+            stored_text = ""
+        else:
+            stored_text = "\n♻️ <i>Already stored, not forwarded again</i>"
         
-        base64_id = await encode(str(forwarded.id))
+        start_param = await bot.link_store.create("file", [file_msg_id])
+        if not start_param:
+            response = await message.reply("❌ <b>Failed to save file link!</b>", parse_mode=enums.ParseMode.HTML)
+            await bot.auto_delete.store_bot_message(user_id, response.id)
+            return
         bot_username = Config.BOT_USERNAME
-        link = f"https://t.me/{bot_username}?start={base64_id}"
+        link = f"https://t.me/{bot_username}?start={start_param}"
 
         response = await message.reply(
             f"✅ <b>Link Generated!</b>\n\n"
             f"<blockquote>"
             f"<b>🔗 Link:</b>\n"
             f"<code>{link}</code>\n\n"
-            f"<b>📝 File ID:</b> <code>{forwarded.id}</code>"
+            f"<b>📝 File ID:</b> <code>{file_msg_id}</code>"
+            f"{stored_text}"
             f"</blockquote>",
             parse_mode=enums.ParseMode.HTML,
             disable_web_page_preview=True
@@ -85,6 +88,7 @@ async def genlink_handler(bot, message: Message):
 
     except Exception as e:
         logger.error(f"Error forwarding message: {e}")
+        bot.channel_health.report_error(e)
         response = await message.reply("❌ <b>Error forwarding message to database channel!</b>", parse_mode=enums.ParseMode.HTML)
         await bot.auto_delete.store_bot_message(user_id, response.id)
 
@@ -277,10 +281,13 @@ async def finish_custom_batch(bot, message: Message):
         return
     
     # Generate batch link
-    file_ids_str = ",".join(map(str, files))
-    encoded = await encode(file_ids_str)
+    start_param = await bot.link_store.create("batch", files)
+    if not start_param:
+        response = await message.reply("❌ <b>Failed to save batch link!</b>", parse_mode=enums.ParseMode.HTML)
+        await bot.auto_delete.store_bot_message(user_id, response.id)
+        return
     
-    link = f"https://t.me/{Config.BOT_USERNAME}?start=batch_{encoded}"
+    link = f"https://t.me/{Config.BOT_USERNAME}?start={start_param}"
     
     response = await message.reply(
         f"✅ <b>CUSTOM BATCH LINK GENERATED!</b>\n\n"
@@ -375,12 +382,13 @@ async def handle_regular_batch_message(bot, message: Message):
             await bot.auto_delete.store_bot_message(user_id, response.id)
             return
         
-        # Create file IDs list
-        file_ids = list(range(first_id, last_id + 1))
-        file_ids_str = ",".join(map(str, file_ids))
-        encoded = await encode(file_ids_str)
+        start_param = await bot.link_store.create("batch", range(first_id, last_id + 1))
+        if not start_param:
+            response = await message.reply("❌ <b>Failed to save batch link!</b>", parse_mode=enums.ParseMode.HTML)
+            await bot.auto_delete.store_bot_message(user_id, response.id)
+            return
         
-        link = f"https://t.me/{Config.BOT_USERNAME}?start=batch_{encoded}"
+        link = f"https://t.me/{Config.BOT_USERNAME}?start={start_param}"
         
         response = await message.reply(
             f"✅ <b>BATCH LINK GENERATED!</b>\n\n"
@@ -362,6 +362,7 @@ async def add_fsub_command(bot, message: Message):
         
         # Update local cache
         bot.force_sub_channels = await bot.db.get_force_sub_channels()
+        await bot.invite_links.refresh(channel_id)
         
         response = await message.reply(
             f"✅ <b>Channel Added!</b>\n\n"
@@ -424,6 +425,7 @@ async def del_fsub_command(bot, message: Message):
         
         # Update local cache
         bot.force_sub_channels = await bot.db.get_force_sub_channels()
+        bot.invite_links.forget(channel_id)
         
         response = await message.reply(
             f"✅ <b>Channel Removed!</b>\n\n"
@@ -15,14 +15,12 @@ This handler processes all non-command text messages based on user state.
 import logging
 from pyrogram import filters, enums
 from pyrogram.types import Message
-from config import Config
+from config import Config, MAX_BATCH_SIZE, MAX_SPECIAL_FILES
 
 logger = logging.getLogger(__name__)
 
 # Maximum limits
-MAX_BATCH_SIZE = 100
 MAX_CUSTOM_BATCH = 50
-MAX_SPECIAL_FILES = 50
 
 
 # ==========================================
@@ -45,8 +43,8 @@ async def text_message_handler(bot, message: Message):
     if await bot.db.is_user_banned(user_id):
         return
     
-    # Update user activity
-    await bot.db.update_user_activity(user_id)
+    # Update user activity (write-behind)
+    bot.db.queue_user_activity(user_id)
     
     # ==========================================
     # BATCH STATE HANDLING
@@ -173,16 +171,13 @@ async def handle_batch_state(bot, message: Message):
             return
         
         # Generate batch link
-        from utils.helpers import encode
-        
-        # Create file IDs list
-        file_ids = list(range(first_id, last_id + 1))
-        file_ids_str = ",".join(str(x) for x in file_ids)
-        
-        # Encode batch
-        batch_encoded = await encode(file_ids_str)
+        start_param = await bot.link_store.create("batch", range(first_id, last_id + 1))
+        if not start_param:
+            response = await message.reply("❌ <b>Failed to save batch link!</b>", parse_mode=enums.ParseMode.HTML)
+            await bot.store_bot_message(user_id, response.id)
+            return
         bot_username = Config.BOT_USERNAME
-        batch_link = f"https://t.me/{bot_username}?start=batch_{batch_encoded}"
+        batch_link = f"https://t.me/{bot_username}?start={start_param}"
         
         # Clear state
         del bot.batch_state[user_id]
@@ -306,6 +301,7 @@ async def handle_button_setting_state(bot, message: Message):
             # Add to database
             await bot.db.add_force_sub_channel(channel_id, username)
             bot.force_sub_channels = await bot.db.get_force_sub_channels()
+            await bot.invite_links.refresh(channel_id)
             
             # Clear state
             del bot.button_setting_state[user_id]
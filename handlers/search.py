@@ -0,0 +1,37 @@
+"""
+Search Handlers
+===============
+
+File search over the database channel:
+- /search <words> - Find files by name or caption
+- srch_<query_id>_<page> - Result page buttons
+
+The commands live on the bot (Bot.handle_search, Bot.handle_search_page)
+and are registered by Bot.register_handlers; this module registers the
+same handlers for register_all_handlers.
+"""
+
+import logging
+from pyrogram import filters
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# HANDLER REGISTRATION
+# ==========================================
+
+def register_search_handlers(bot):
+    """Register all search handlers"""
+    
+    @bot.on_message(filters.command("search") & filters.private)
+    async def search_handler(client, message):
+        await bot.handle_search(message)
+    
+    # Runs before the general callback handler, which doesn't know these buttons
+    @bot.on_callback_query(filters.regex(r"^srch_"), group=-1)
+    async def search_page_handler(client, query):
+        await bot.handle_search_page(query)
+        query.stop_propagation()
+    
+    logger.info("✓ Search handlers registered")
@@ -192,6 +192,7 @@ async def files_command(bot, message: Message):
     protect_content = settings.get("protect_content", True)
     hide_caption = settings.get("hide_caption", False)
     channel_button = settings.get("channel_button", True)
+    album_mode = settings.get("album_mode", False)
     files_pics = settings.get("files_pics", Config.FILES_PICS)
 
     # Get random files picture
@@ -210,6 +211,9 @@ async def files_command(bot, message: Message):
             InlineKeyboardButton(f"📘 ʙᴜᴛᴛᴏɴ: {'✅' if channel_button else '❌'}", callback_data="toggle_channel_button"),
             InlineKeyboardButton("📘 ᴄᴜsᴛᴏᴍ ʙᴜᴛᴛᴏɴ", callback_data="custom_buttons_menu")
         ],
+        [
+            InlineKeyboardButton(f"🗂 ᴀʟʙᴜᴍ ᴍᴏᴅᴇ: {'✅' if album_mode else '❌'}", callback_data="toggle_album_mode")
+        ],
         [
             InlineKeyboardButton("🔙 ʙᴀᴄᴋ", callback_data="settings_menu"),
             InlineKeyboardButton("❌ ᴄʟᴏsᴇ", callback_data="close")
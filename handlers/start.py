@@ -32,16 +32,13 @@ async def start_handler(bot, message: Message):
         await bot.auto_delete.store_bot_message(user_id, response.id)
         return
 
-    # Add user to database
-    await bot.db.add_user(
+    # Add user to database and update activity (write-behind)
+    bot.db.queue_user(
         user_id=user_id,
         first_name=message.from_user.first_name,
         username=message.from_user.username
     )
 
-    # Update activity
-    await bot.db.update_user_activity(user_id)
-
     # Send reaction using user account
     try:
         await bot.send_reaction(chat_id, message.id)
@@ -137,18 +134,12 @@ async def show_force_subscribe(bot, message: Message):
     force_sub_pics = settings.get("force_sub_pics", Config.FORCE_SUB_PICS)
     force_sub_pic = get_random_pic(force_sub_pics)
 
-    # Count joined/total channels
+    # Count joined/total channels (one cached lookup for all channels)
     total_channels = len(bot.force_sub_channels)
-    joined_count = 0
 
-    from utils.helpers import is_subscribed
-    for channel in bot.force_sub_channels:
-        try:
-            user_is_sub = await is_subscribed(bot, user.id, [channel])
-            if user_is_sub:
-                joined_count += 1
-        except:
-            pass
+    from utils.helpers import get_subscription_statuses
+    statuses = await get_subscription_statuses(bot, user.id, bot.force_sub_channels)
+    joined_count = sum(statuses.values())
 
     # Create force sub text
     from utils.helpers import create_force_sub_text
@@ -160,19 +151,9 @@ async def show_force_subscribe(bot, message: Message):
         channel_id = channel.get("channel_id")
         username = channel.get("channel_username")
     
-        if username:
-            button_text = "ᴊᴏɪɴ ᴄʜᴀɴɴᴇʟ"
-            button_url = f"https://t.me/{username}"
-        else:
-            button_text = "ᴘʀɪᴠᴀᴛᴇ ᴄʜᴀɴɴᴇʟ"
-            try:
-                invite_link = await bot.create_invite_link(channel_id)
-                if invite_link:
-                    button_url = invite_link
-                else:
-                    button_url = f"https://t.me/c/{str(channel_id)[4:]}"
-            except:
-                button_url = f"https://t.me/c/{str(channel_id)[4:]}"
+        # Invite links are pooled and refreshed in the background
+        button_text = "ᴊᴏɪɴ ᴄʜᴀɴɴᴇʟ" if username else "ᴘʀɪᴠᴀᴛᴇ ᴄʜᴀɴɴᴇʟ"
+        button_url = bot.invite_links.get_url(channel_id, username)
     
         buttons.append([InlineKeyboardButton(button_text, url=button_url)])
 
@@ -203,154 +184,123 @@ async def handle_start_argument(bot, message: Message, start_arg: str):
     try:
         user_id = message.from_user.id
         
-        # Check if it's a special link
-        if start_arg.startswith("link_"):
-            link_id = start_arg.replace("link_", "")
-            await handle_special_link(bot, message, link_id)
-        # Check if it's a file link
-        elif start_arg.startswith("file_"):
-            file_id_encoded = start_arg.replace("file_", "")
-            await handle_file_link(bot, message, file_id_encoded)
-        # Check if it's a batch link
-        elif start_arg.startswith("batch_"):
-            batch_id = start_arg.replace("batch_", "")
-            await handle_batch_link(bot, message, batch_id)
+        # Resolved once per link and shared by everyone opening it
+        plan = await bot.delivery_plans.get(start_arg)
+        if not plan:
+            error_msg = await message.reply("❌ <b>Invalid or expired link!</b>", parse_mode=enums.ParseMode.HTML)
+            await bot.auto_delete.store_bot_message(user_id, error_msg.id)
+        elif plan["type"] == "special":
+            await handle_special_link(bot, message, plan)
+        elif plan["type"] == "file":
+            await handle_file_link(bot, message, plan)
         else:
-            # Try to decode as file ID
-            try:
-                from utils.helpers import decode
-                decoded = await decode(start_arg)
-                if decoded:
-                    await handle_file_link(bot, message, start_arg)
-                else:
-                    raise ValueError("Invalid link")
-            except:
-                error_msg = await message.reply("❌ <b>Invalid or expired link!</b>", parse_mode=enums.ParseMode.HTML)
-                await bot.auto_delete.store_bot_message(user_id, error_msg.id)
+            await handle_batch_link(bot, message, plan)
                 
     except Exception as e:
         error_msg = await message.reply("❌ <b>Error processing link!</b>", parse_mode=enums.ParseMode.HTML)
         await bot.auto_delete.store_bot_message(message.from_user.id, error_msg.id)
 
 
-async def handle_special_link(bot, message: Message, link_id: str):
+async def handle_special_link(bot, message: Message, plan: dict):
     """Handle special link access - ALL FEATURES PRESERVED"""
     user_id = message.from_user.id
     
-    link_data = await bot.db.get_special_link(link_id)
-    if not link_data:
-        error_msg = await message.reply("❌ <b>Link not found or expired!</b>", parse_mode=enums.ParseMode.HTML)
-        await bot.auto_delete.store_bot_message(user_id, error_msg.id)
-        return
-    
-    custom_msg = link_data.get("message")
+    custom_msg = plan["message"]
     if custom_msg:
         msg = await message.reply(custom_msg, parse_mode=enums.ParseMode.HTML)
         await bot.auto_delete.store_bot_message(user_id, msg.id)
     
-    files = link_data.get("files", [])
+    # Skip deleted posts, service messages and stickers
+    files = bot.deliverable_ids.filter(bot.db_channel, plan["ids"])
     if files:
-        file_ids = []
-        sent_message_ids = []
-        
-        from config import MAX_SPECIAL_FILES
-        for file_id in files[:MAX_SPECIAL_FILES]:
-            try:
-                response = await bot.copy_message(
-                    chat_id=message.chat.id,
-                    from_chat_id=bot.db_channel,
-                    message_id=file_id,
-                    protect_content=bot.settings.get("protect_content", True)
-                )
-                file_ids.append(file_id)
-                sent_message_ids.append(response.id)
-                
-                # FEATURE 2: Schedule file for auto-deletion
-                settings = await bot.db.get_settings()
-                auto_delete = settings.get("auto_delete", False)
-                if auto_delete:
-                    delete_time = settings.get("auto_delete_time", 300)
-                    await bot.auto_delete.schedule_file_deletion(user_id, response.id, delete_time)
-                
-            except Exception:
-                pass
-        
-        if file_ids:
-            await bot.auto_delete.track_user_files(user_id, file_ids, link_data)
+        async def on_complete(job):
+            if job.sent_ids:
+                await bot.auto_delete.track_user_files(user_id, job.sent_ids, plan["link"])
+            
+            success_msg = await message.reply(
+                f"✅ <b>Files sent successfully!</b>\n\n📁 Total: {job.sent} files",
+                parse_mode=enums.ParseMode.HTML
+            )
+            await bot.auto_delete.store_bot_message(user_id, success_msg.id)
         
-        success_msg = await message.reply(
-            f"✅ <b>Files sent successfully!</b>\n\n📁 Total: {len(file_ids)} files",
-            parse_mode=enums.ParseMode.HTML
+        from features.delivery import DeliveryJob
+        job = DeliveryJob(
+            user_id=user_id,
+            chat_id=message.chat.id,
+            message_ids=files,
+            from_chat_id=bot.db_channel,
+            protect_content=plan["protect_content"],
+            hide_caption=plan["hide_caption"],
+            delete_after=plan["delete_after"],
+            on_complete=on_complete,
+            album_mode=plan["album_mode"]
         )
-        await bot.auto_delete.store_bot_message(user_id, success_msg.id)
+        await submit_delivery(bot, message, job)
 
 
-async def handle_file_link(bot, message: Message, file_id_encoded: str):
-    """Handle single file link - ALL FEATURES PRESERVED"""
-    user_id = message.from_user.id
+async def submit_delivery(bot, message: Message, job) -> bool:
+    """Hand a delivery job to the background delivery workers"""
+    if bot.delivery.submit(job):
+        return True
     
-    from utils.helpers import decode
-    decoded = await decode(file_id_encoded)
-    if not decoded or not decoded.isdigit():
-        error_msg = await message.reply("❌ <b>Invalid file link!</b>", parse_mode=enums.ParseMode.HTML)
-        await bot.auto_delete.store_bot_message(user_id, error_msg.id)
-        return
+    if job.progress_message:
+        try:
+            await job.progress_message.delete()
+        except:
+            pass
     
-    file_id = int(decoded)
+    error_msg = await message.reply(
+        "⏳ <b>Your previous files are still being sent!</b>\n\nPlease wait for them to finish.",
+        parse_mode=enums.ParseMode.HTML
+    )
+    await bot.auto_delete.store_bot_message(job.user_id, error_msg.id)
+    return False
+
+
+async def handle_file_link(bot, message: Message, plan: dict):
+    """Handle single file link - ALL FEATURES PRESERVED"""
+    user_id = message.from_user.id
+    file_id = plan["ids"][0]
     
     if not bot.db_channel:
         error_msg = await message.reply("❌ <b>Database channel not set!</b>", parse_mode=enums.ParseMode.HTML)
         await bot.auto_delete.store_bot_message(user_id, error_msg.id)
         return
     
-    # Check if bot is admin
-    try:
-        me = await bot.get_me()
-        bot_id = me.id
-        member = await bot.get_chat_member(bot.db_channel, bot_id)
-        if member.status not in ["administrator", "creator"]:
-            error_msg = await message.reply("❌ <b>Bot is not admin in database channel!</b>", parse_mode=enums.ParseMode.HTML)
-            await bot.auto_delete.store_bot_message(user_id, error_msg.id)
-            return
-    except Exception:
-        error_msg = await message.reply("❌ <b>Cannot access database channel!</b>", parse_mode=enums.ParseMode.HTML)
+    # Check if bot is admin (cached, refreshed in the background)
+    if not await bot.channel_health.ensure():
+        error_msg = await message.reply("❌ <b>Bot is not admin in database channel!</b>", parse_mode=enums.ParseMode.HTML)
         await bot.auto_delete.store_bot_message(user_id, error_msg.id)
         return
     
     try:
-        response = await bot.copy_message(
-            chat_id=message.chat.id,
-            from_chat_id=bot.db_channel,
-            message_id=file_id,
-            protect_content=bot.settings.get("protect_content", True)
+        # Sent by file_id when cataloged, copied from the channel otherwise
+        response = await bot.media_catalog.send(
+            message.chat.id,
+            bot.db_channel,
+            file_id,
+            protect_content=plan["protect_content"],
+            hide_caption=plan["hide_caption"]
         )
         
         # FEATURE 2: Auto-delete
-        settings = await bot.db.get_settings()
-        auto_delete = settings.get("auto_delete", False)
-        if auto_delete:
-            delete_time = settings.get("auto_delete_time", 300)
-            await bot.auto_delete.schedule_file_deletion(user_id, response.id, delete_time)
+        if plan["delete_after"]:
+            await bot.auto_delete.schedule_file_deletion(user_id, response.id, plan["delete_after"])
         
         await bot.auto_delete.track_user_files(user_id, [file_id])
         
-    except Exception:
+    except Exception as e:
+        bot.channel_health.report_error(e)
         error_msg = await message.reply("❌ <b>File not found or access denied!</b>", parse_mode=enums.ParseMode.HTML)
         await bot.auto_delete.store_bot_message(user_id, error_msg.id)
 
 
-async def handle_batch_link(bot, message: Message, batch_id: str):
+async def handle_batch_link(bot, message: Message, plan: dict):
     """Handle batch file link - ALL FEATURES PRESERVED"""
     user_id = message.from_user.id
     
-    from utils.helpers import decode
-    decoded = await decode(batch_id)
-    if not decoded:
-        error_msg = await message.reply("❌ <b>Invalid batch link!</b>", parse_mode=enums.ParseMode.HTML)
-        await bot.auto_delete.store_bot_message(user_id, error_msg.id)
-        return
-    
-    file_ids = [int(x) for x in decoded.split(",") if x.isdigit()]
+    # Skip deleted posts, service messages and stickers
+    file_ids = bot.deliverable_ids.filter(bot.db_channel, plan["ids"])
     
     if not file_ids:
         error_msg = await message.reply("❌ <b>No files found in batch!</b>", parse_mode=enums.ParseMode.HTML)
@@ -367,42 +317,36 @@ async def handle_batch_link(bot, message: Message, batch_id: str):
         parse_mode=enums.ParseMode.HTML
     )
     
-    sent_file_ids = []
-    
-    from config import MAX_BATCH_SIZE
-    for file_id in file_ids[:MAX_BATCH_SIZE]:
+    async def on_complete(job):
         try:
-            response = await bot.copy_message(
-                chat_id=message.chat.id,
-                from_chat_id=bot.db_channel,
-                message_id=file_id,
-                protect_content=bot.settings.get("protect_content", True)
-            )
-            sent_file_ids.append(file_id)
-            
-            # FEATURE 2: Auto-delete
-            settings = await bot.db.get_settings()
-            auto_delete = settings.get("auto_delete", False)
-            if auto_delete:
-                delete_time = settings.get("auto_delete_time", 300)
-                await bot.auto_delete.schedule_file_deletion(user_id, response.id, delete_time)
-            
-        except Exception:
+            await progress_msg.delete()
+        except:
             pass
+        
+        if job.sent_ids:
+            await bot.auto_delete.track_user_files(user_id, job.sent_ids)
+        
+        success_msg = await message.reply(
+            f"✅ <b>Batch sent successfully!</b>\n\n📁 Total: {job.sent} files",
+            parse_mode=enums.ParseMode.HTML
+        )
+        await bot.auto_delete.store_bot_message(user_id, success_msg.id)
     
-    try:
-        await progress_msg.delete()
-    except:
-        pass
-    
-    if sent_file_ids:
-        await bot.auto_delete.track_user_files(user_id, sent_file_ids)
-    
-    success_msg = await message.reply(
-        f"✅ <b>Batch sent successfully!</b>\n\n📁 Total: {len(sent_file_ids)} files",
-        parse_mode=enums.ParseMode.HTML
+    from config import MAX_BATCH_SIZE
+    from features.delivery import DeliveryJob
+    job = DeliveryJob(
+        user_id=user_id,
+        chat_id=message.chat.id,
+        message_ids=file_ids[:MAX_BATCH_SIZE],
+        from_chat_id=bot.db_channel,
+        protect_content=plan["protect_content"],
+        hide_caption=plan["hide_caption"],
+        delete_after=plan["delete_after"],
+        progress_message=progress_msg,
+        on_complete=on_complete,
+        album_mode=plan["album_mode"]
     )
-    await bot.auto_delete.store_bot_message(user_id, success_msg.id)
+    await submit_delivery(bot, message, job)
 
 
 async def help_handler(bot, message: Message):
@@ -0,0 +1,144 @@
+"""
+Batch link codec tests
+
+Round trips over random ID sets (seeded, so failures reproduce) plus the
+size limits that keep short tokens from expanding to huge ID lists.
+"""
+
+import asyncio
+import base64
+import random
+import time
+
+import pytest
+
+from config import MAX_BATCH_SIZE
+from utils.helpers import (
+    BATCH_PREFIX, START_PARAM_LIMIT,
+    id_ranges, ranges_to_ids, pack_batch_ids, unpack_batch_token,
+    encode_batch_link, decode_batch_link
+)
+
+SEEDS = range(200)
+
+
+class FakeLinkDB:
+    """links collection stand-in for stored tokens"""
+
+    def __init__(self):
+        self.links = {}
+
+    async def save_link(self, key, link_type, ranges, options=None):
+        if key in self.links:
+            return False
+        self.links[key] = {"key": key, "type": link_type, "ranges": ranges, "options": options or {}}
+        return True
+
+    async def get_link(self, key):
+        return self.links.get(key)
+
+
+def random_ids(rng: random.Random, limit: int = MAX_BATCH_SIZE):
+    """IDs shaped like real batches: runs of consecutive posts with gaps"""
+    ids, current = [], rng.randint(1, 10 ** rng.randint(1, 7))
+    for _ in range(rng.randint(1, 8)):
+        run = rng.randint(1, max(1, limit // 4))
+        ids.extend(range(current, current + run))
+        current += run + rng.choice((1, 2, rng.randint(1, 1000)))
+    rng.shuffle(ids)
+    return ids[:limit]
+
+
+def legacy_token(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("ascii")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_ranges_round_trip(seed):
+    ids = random_ids(random.Random(seed))
+    ranges = id_ranges(ids)
+    assert ranges_to_ids(ranges) == sorted(set(ids))
+    # Runs are sorted, disjoint and not adjacent
+    for (_, last), (first, _) in zip(ranges, ranges[1:]):
+        assert first > last + 1
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_inline_token_round_trip(seed):
+    ids = random_ids(random.Random(seed))
+    version, decoded = unpack_batch_token(pack_batch_ids(ids))
+    assert version == 1
+    assert decoded == sorted(set(ids))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batch_link_round_trip(seed):
+    db = FakeLinkDB()
+    ids = random_ids(random.Random(seed))
+
+    async def round_trip():
+        start_param = await encode_batch_link(db, ids)
+        assert start_param.startswith(BATCH_PREFIX)
+        assert len(start_param) <= START_PARAM_LIMIT
+        return await decode_batch_link(db, start_param[len(BATCH_PREFIX):])
+
+    assert asyncio.run(round_trip()) == sorted(set(ids))
+
+
+def test_stored_token_for_scattered_ids():
+    db = FakeLinkDB()
+    ids = list(range(1, 2 * MAX_BATCH_SIZE, 2))[:MAX_BATCH_SIZE]
+
+    async def round_trip():
+        start_param = await encode_batch_link(db, ids)
+        return start_param, await decode_batch_link(db, start_param[len(BATCH_PREFIX):])
+
+    start_param, decoded = asyncio.run(round_trip())
+    assert len(db.links) == 1
+    assert decoded == ids
+
+
+def test_legacy_tokens():
+    assert unpack_batch_token(legacy_token("5-9")) == (0, [5, 6, 7, 8, 9])
+    assert unpack_batch_token(legacy_token("7,3,11")) == (0, [7, 3, 11])
+
+
+# "AYA" is version 1 cut off inside a varint
+@pytest.mark.parametrize("token", ["", "!!!", legacy_token("abc"), legacy_token("9-5"), "AYA"])
+def test_invalid_tokens(token):
+    with pytest.raises(ValueError):
+        unpack_batch_token(token)
+
+
+def test_oversized_inline_token_is_rejected_fast():
+    # version 1, gap 0, length 2^28 - 1: eight characters for 268M IDs
+    started = time.perf_counter()
+    with pytest.raises(ValueError):
+        unpack_batch_token("AQD___8P")
+    assert time.perf_counter() - started < 0.01
+
+
+def test_oversized_run_total_is_rejected():
+    ids = list(range(1, MAX_BATCH_SIZE + 2))
+    with pytest.raises(ValueError):
+        unpack_batch_token(pack_batch_ids(ids))
+    # One under the limit still decodes
+    assert unpack_batch_token(pack_batch_ids(ids[:-1]))[1] == ids[:-1]
+
+
+@pytest.mark.parametrize("text", ["1-999999999", ",".join(["1"] * (MAX_BATCH_SIZE + 1))])
+def test_oversized_legacy_token_is_rejected(text):
+    with pytest.raises(ValueError):
+        unpack_batch_token(legacy_token(text))
+
+
+def test_oversized_stored_link_is_rejected():
+    db = FakeLinkDB()
+    asyncio.run(db.save_link("AgAAAAAAAAAA", "batch", [[1, 10 ** 9]]))
+    assert asyncio.run(decode_batch_link(db, "AgAAAAAAAAAA")) == []
+
+
+def test_ranges_to_ids_limit():
+    assert ranges_to_ids([(1, 3), (5, 5)], max_ids=4) == [1, 2, 3, 5]
+    with pytest.raises(ValueError):
+        ranges_to_ids([(1, 3), (5, 6)], max_ids=4)
@@ -0,0 +1,44 @@
+"""
+Database channel health tests
+
+A lost-access error moves the next check to the retry interval.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from pyrogram.errors import ChatAdminRequired
+
+from features.channel_health import ChannelHealth
+
+
+class FakeBot:
+    db_channel = -1001234567890
+    id = 1
+
+    def __init__(self):
+        self.checks = 0
+
+    async def get_chat_member(self, chat_id, user_id):
+        self.checks += 1
+        return SimpleNamespace(status="administrator")
+
+
+def test_report_error_reschedules_check():
+    async def main():
+        bot = FakeBot()
+        health = ChannelHealth(bot, interval=60, retry_interval=0.05)
+        health.healthy = True
+        health.start()
+        await asyncio.sleep(0.01)
+
+        health.report_error(ChatAdminRequired())
+        assert health.healthy is False
+        # Checked after the retry interval, not the 60 s healthy interval
+        await asyncio.sleep(0.2)
+        await health.stop()
+        return bot.checks, health.healthy
+
+    checks, healthy = asyncio.run(main())
+    assert checks == 1
+    assert healthy is True
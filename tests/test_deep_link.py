@@ -0,0 +1,72 @@
+"""
+Deep link delivery tests
+
+/start links go through the delivery plan cache, and the plan's settings
+reach the delivery.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from bot.bot_client import Bot
+from features.delivery_plans import DeliveryPlanCache
+
+CHANNEL_ID = -1001234567890
+
+PLAN = {
+    "type": "batch", "ids": [5, 6, 7], "protect_content": True, "hide_caption": True,
+    "delete_after": 600, "album_mode": True, "message": None, "link": None
+}
+
+
+class FakePlans:
+    def __init__(self):
+        self.requested = []
+
+    async def get(self, start_arg):
+        self.requested.append(start_arg)
+        return dict(PLAN)
+
+
+class FakeMessage:
+    from_user = SimpleNamespace(id=42)
+
+    def __init__(self):
+        self.replies = []
+
+    async def reply(self, text):
+        self.replies.append(text)
+        return SimpleNamespace(text=text)
+
+
+def fake_bot():
+    bot = SimpleNamespace(
+        db_channel=CHANNEL_ID,
+        delivery_plans=FakePlans(),
+        deliverable_ids=SimpleNamespace(filter=lambda channel_id, ids: list(ids)),
+        delivery=SimpleNamespace(jobs=[])
+    )
+    bot.delivery.submit = lambda job: bot.delivery.jobs.append(job) or True
+    bot.send_file = lambda *args: Bot.send_file(bot, *args)
+    bot.send_batch = lambda *args: Bot.send_batch(bot, *args)
+    return bot
+
+
+def test_batch_link_uses_the_plan():
+    bot = fake_bot()
+    asyncio.run(Bot.handle_deep_link(bot, FakeMessage(), "l_abc"))
+
+    assert bot.delivery_plans.requested == ["l_abc"]
+    job = bot.delivery.jobs[0]
+    assert job.message_ids == [5, 6, 7]
+    assert job.protect_content and job.hide_caption and job.album_mode
+    assert job.delete_after == 600
+
+
+def test_special_link_hook_drops_the_plan():
+    plans = DeliveryPlanCache(SimpleNamespace(db=None))
+    plans._store("link_abc", {"type": "special"}, 0)
+    plans._store("l_abc", {"type": "batch"}, 0)
+
+    plans.invalidate_special("abc")
+    assert list(plans._plans) == ["l_abc"]
@@ -0,0 +1,64 @@
+"""
+Delivery queue tests
+
+Bulk copies record only the sources that produced a message.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from features.delivery import DeliveryJob, DeliveryQueue
+
+CHANNEL_ID = -1001234567890
+
+
+class FakeCatalog:
+    def __init__(self):
+        self.recorded = []
+
+    async def record(self, channel_id, pairs):
+        self.recorded.extend(source for source, _ in pairs)
+
+
+class FakeBot:
+    """Channel with some deleted posts, copies skip them like Telegram does"""
+
+    def __init__(self, deleted):
+        self.deleted = set(deleted)
+        self.media_catalog = FakeCatalog()
+        self.next_id = 1000
+
+    async def copy_messages(self, chat_id, from_chat_id, message_ids, **kwargs):
+        sent = []
+        for message_id in message_ids:
+            if message_id not in self.deleted:
+                self.next_id += 1
+                sent.append(SimpleNamespace(id=self.next_id))
+        return sent
+
+    async def get_messages(self, chat_id, message_ids):
+        return [SimpleNamespace(id=i, empty=i in self.deleted) for i in message_ids]
+
+
+def deliver(bot, message_ids):
+    queue = DeliveryQueue(bot)
+    job = DeliveryJob(42, 42, message_ids, CHANNEL_ID, album_mode=False)
+    asyncio.run(queue._deliver_bulk(job, message_ids))
+    return job
+
+
+def test_full_chunk_maps_by_position():
+    bot = FakeBot(deleted=[])
+    job = deliver(bot, [1, 2, 3])
+    assert job.sent_ids == [1, 2, 3]
+    assert bot.media_catalog.recorded == [1, 2, 3]
+    assert job.failed == 0
+
+
+def test_skipped_sources_are_not_recorded():
+    bot = FakeBot(deleted=[2, 5])
+    job = deliver(bot, [1, 2, 3, 4, 5, 6])
+    assert job.sent_ids == [1, 3, 4, 6]
+    assert bot.media_catalog.recorded == [1, 3, 4, 6]
+    assert len(job.sent_message_ids) == 4
+    assert job.failed == 2
@@ -0,0 +1,56 @@
+"""
+Delivery plan cache tests
+
+Invalid links are only remembered for the short miss TTL.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from features.delivery_plans import DeliveryPlanCache
+
+
+class FakeDB:
+    settings_version = 0
+
+    def __init__(self):
+        self.fail = True
+        self.reads = 0
+
+    async def get_settings(self):
+        return {}
+
+    async def get_special_link(self, link_id):
+        # Database errors also come back as None
+        self.reads += 1
+        return None if self.fail else {"files": [1, 2], "message": None}
+
+
+def cache():
+    bot = SimpleNamespace(db=FakeDB())
+    return bot, DeliveryPlanCache(bot, ttl=300, miss_ttl=10)
+
+
+def test_miss_expires_after_miss_ttl():
+    bot, plans = cache()
+    assert asyncio.run(plans.get("link_abc")) is None
+    assert plans._plans["link_abc"][2] - time.monotonic() <= 10
+
+    # Within the miss TTL: not looked up again
+    assert asyncio.run(plans.get("link_abc")) is None
+    assert bot.db.reads == 1
+
+    # Once it expires the link resolves again
+    plan, version, _ = plans._plans["link_abc"]
+    plans._plans["link_abc"] = (plan, version, time.monotonic() - 1)
+    bot.db.fail = False
+    assert asyncio.run(plans.get("link_abc"))["ids"] == [1, 2]
+    assert bot.db.reads == 2
+
+
+def test_plan_uses_full_ttl():
+    bot, plans = cache()
+    bot.db.fail = False
+    asyncio.run(plans.get("link_abc"))
+    assert plans._plans["link_abc"][2] - time.monotonic() > 10
@@ -0,0 +1,91 @@
+"""
+Media catalog tests
+
+Which send_cached_media errors fall back to copy_message.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pyrogram.errors import FileReferenceExpired, UserIsBlocked
+
+from features.media_catalog import MediaCatalog
+
+CHANNEL_ID = -1001234567890
+
+
+class FakeDB:
+    async def get_catalog_entries(self, channel_id, message_ids):
+        return {i: {"media_type": "document", "file_id": f"file{i}", "caption": None} for i in message_ids}
+
+    async def save_catalog_entries(self, channel_id, entries):
+        return True
+
+
+class FakeBot:
+    def __init__(self, error):
+        self.db = FakeDB()
+        self.error = error
+        self.copied = []
+
+    async def send_cached_media(self, chat_id, file_id, **kwargs):
+        raise self.error
+
+    async def copy_message(self, chat_id, from_chat_id, message_id, **kwargs):
+        self.copied.append(message_id)
+        return SimpleNamespace(id=99, empty=False, service=None, text="copy", media=None)
+
+
+def test_stale_file_id_falls_back_to_copy():
+    bot = FakeBot(FileReferenceExpired())
+    catalog = MediaCatalog(bot)
+
+    asyncio.run(catalog.send(42, CHANNEL_ID, 7))
+    assert bot.copied == [7]
+    assert catalog.fallbacks == 1
+
+
+def test_other_errors_are_raised():
+    bot = FakeBot(UserIsBlocked())
+    catalog = MediaCatalog(bot)
+
+    with pytest.raises(UserIsBlocked):
+        asyncio.run(catalog.send(42, CHANNEL_ID, 7))
+    assert bot.copied == []
+    # The file_id is still good
+    assert (CHANNEL_ID, 7) in catalog._entries
+
+
+def test_posts_without_a_file_are_not_recorded_again():
+    bot = FakeBot(FileReferenceExpired())
+    saves = []
+
+    async def get_catalog_entries(channel_id, message_ids):
+        return {i: {"media_type": "poll", "file_id": None, "caption": None} for i in message_ids}
+
+    async def save_catalog_entries(channel_id, entries):
+        saves.append(entries)
+        return True
+
+    bot.db.get_catalog_entries = get_catalog_entries
+    bot.db.save_catalog_entries = save_catalog_entries
+    catalog = MediaCatalog(bot)
+
+    asyncio.run(catalog.send(42, CHANNEL_ID, 7))
+    asyncio.run(catalog.send(43, CHANNEL_ID, 7))
+    assert bot.copied == [7, 7]
+    assert saves == []
+
+
+def test_stale_file_id_is_recorded_again():
+    bot = FakeBot(FileReferenceExpired())
+    saves = []
+
+    async def save_catalog_entries(channel_id, entries):
+        saves.append(entries)
+        return True
+
+    bot.db.save_catalog_entries = save_catalog_entries
+    asyncio.run(MediaCatalog(bot).send(42, CHANNEL_ID, 7))
+    assert len(saves) == 1
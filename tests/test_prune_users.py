@@ -0,0 +1,81 @@
+"""
+/prune_users tests
+
+The command flushes pending dead recipients, then archives or purges them.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from bot.bot_client import Bot
+
+
+class FakeDB:
+    def __init__(self):
+        self.users = {1: True, 2: False, 3: False}
+        self.archive = {}
+
+    async def prune_unreachable_users(self, archive=True):
+        dead = [user_id for user_id, reachable in self.users.items() if not reachable]
+        for user_id in dead:
+            if archive:
+                self.archive[user_id] = self.users[user_id]
+            del self.users[user_id]
+        return len(dead)
+
+
+class FakePruner:
+    def __init__(self, db):
+        self.db = db
+        self.pending = {4: "UserIsBlocked"}
+
+    async def flush(self):
+        for user_id in self.pending:
+            self.db.users[user_id] = False
+        self.pending = {}
+
+
+class FakeMessage:
+    def __init__(self, text):
+        self.command = text[1:].split()
+        self.replies = []
+
+    async def reply(self, text):
+        reply = SimpleNamespace(text=text)
+
+        async def edit_text(new_text):
+            reply.text = new_text
+
+        reply.edit_text = edit_text
+        self.replies.append(reply)
+        return reply
+
+
+def prune(text):
+    db = FakeDB()
+    db.users[4] = True
+    bot = SimpleNamespace(db=db, pruner=FakePruner(db))
+    message = FakeMessage(text)
+    asyncio.run(Bot.handle_prune_users(bot, message))
+    return db, message
+
+
+def test_archive_is_the_default():
+    db, message = prune("/prune_users")
+    assert db.users == {1: True}
+    assert sorted(db.archive) == [2, 3, 4]
+    assert message.replies[-1].text.startswith("✅ Pruned 3 unreachable users!")
+    assert "Archived" in message.replies[-1].text
+
+
+def test_purge_skips_the_archive():
+    db, message = prune("/prune_users purge")
+    assert db.users == {1: True}
+    assert db.archive == {}
+    assert "Deleted permanently" in message.replies[-1].text
+
+
+def test_unknown_mode_changes_nothing():
+    db, message = prune("/prune_users all")
+    assert len(db.users) == 4
+    assert message.replies[-1].text.startswith("❌ Usage")
@@ -0,0 +1,92 @@
+"""
+Outbound governor tests
+
+Re-entrant calls, FloodWait scope and retries, without sleeping.
+"""
+
+import asyncio
+
+from pyrogram.errors import FloodWait, PeerIdInvalid
+
+from features.rate_limiter import OutboundGovernor
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_nested_calls_run_straight_through():
+    governor = OutboundGovernor(global_rate=1000, per_chat_rate=1000, per_chat_burst=1000)
+    errors = []
+    governor.error_hook = lambda chat_id, error, sole_peer: errors.append((chat_id, error))
+
+    async def inner():
+        raise PeerIdInvalid()
+
+    async def outer():
+        try:
+            await governor.call(-100, inner)
+        except PeerIdInvalid:
+            pass
+        return "sent"
+
+    assert run(governor.call(42, outer)) == "sent"
+    assert governor.nested == 1
+    assert governor.calls == 1
+    assert errors == []
+
+
+def test_chat_flood_wait_pauses_only_that_chat():
+    governor = OutboundGovernor(global_rate=1000, per_chat_rate=1000, per_chat_burst=1000)
+    global_rate = governor.global_bucket.rate
+    governor._on_flood_wait(42, 30)
+
+    assert governor.paused_until == 0.0
+    assert governor.global_bucket.rate == global_rate
+    assert governor.chat_buckets[42].paused_until > 0
+    assert governor.chat_buckets[42].rate == 500
+
+    async def other_chat():
+        return "ok"
+
+    # Another chat is not held up by chat 42's wait
+    assert run(asyncio.wait_for(governor.call(7, other_chat), 1)) == "ok"
+
+
+def test_flood_wait_without_chat_pauses_everything():
+    governor = OutboundGovernor(global_rate=1000)
+    governor._on_flood_wait(None, 30)
+
+    assert governor.paused_until > 0
+    assert governor.global_bucket.rate == 500
+
+
+def test_flood_wait_is_retried():
+    governor = OutboundGovernor(global_rate=1000, per_chat_rate=1000, per_chat_burst=1000)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FloodWait(value=0)
+        return "ok"
+
+    assert run(governor.call(42, flaky)) == "ok"
+    assert len(attempts) == 2
+    assert governor.retries == 1
+
+
+def test_error_hook_gets_sole_peer():
+    governor = OutboundGovernor(global_rate=1000, per_chat_rate=1000, per_chat_burst=1000)
+    errors = []
+    governor.error_hook = lambda chat_id, error, sole_peer: errors.append((chat_id, sole_peer))
+
+    async def fail():
+        raise PeerIdInvalid()
+
+    for sole_peer in (True, False):
+        try:
+            run(governor.call(42, fail, sole_peer=sole_peer))
+        except PeerIdInvalid:
+            pass
+    assert errors == [(42, True), (42, False)]
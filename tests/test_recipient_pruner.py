@@ -0,0 +1,38 @@
+"""
+Recipient pruner tests
+
+Which governor errors mark a user unreachable.
+"""
+
+from pyrogram.errors import PeerIdInvalid, UserIsBlocked, MessageIdInvalid
+
+from features.recipient_pruner import RecipientPruner
+
+
+def pruner():
+    return RecipientPruner(None)
+
+
+def test_dead_recipient_errors_are_recorded():
+    p = pruner()
+    p.report(42, UserIsBlocked())
+    p.report(43, PeerIdInvalid())
+    assert p._pending == {42: "UserIsBlocked", 43: "PeerIdInvalid"}
+
+
+def test_peer_id_invalid_of_multi_peer_call_is_ignored():
+    p = pruner()
+    p.report(42, PeerIdInvalid(), sole_peer=False)
+    assert p._pending == {}
+
+    # Only the user can have blocked the bot
+    p.report(42, UserIsBlocked(), sole_peer=False)
+    assert p._pending == {42: "UserIsBlocked"}
+
+
+def test_other_errors_and_chats_are_ignored():
+    p = pruner()
+    p.report(42, MessageIdInvalid())
+    p.report(-100123, UserIsBlocked())
+    p.report(None, UserIsBlocked())
+    assert p._pending == {}
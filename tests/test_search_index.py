@@ -0,0 +1,143 @@
+"""
+Search index tests
+
+Matching and paging limits on small hand-made entries, and query latency
+on the 100k-file benchmark corpus (benchmarks/search_corpus.py).
+"""
+
+import statistics
+import time
+
+import pytest
+
+from benchmarks.search_corpus import make_corpus, QUERIES
+from features.search_index import SearchIndex, MAX_CANDIDATES, MAX_RESULTS, MAX_USER_QUERIES
+
+# Per query, best of a few runs: the median must stay under it, every query under twice it
+LATENCY_BUDGET_MS = 1.0
+CORPUS_FILES = 100_000
+
+
+def entry(file_name, caption="", media_type="document"):
+    return {"media_type": media_type, "file_name": file_name, "caption": caption}
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex(None, max_queries=20)
+    index.add([
+        (1, entry("Dark.Knight.2008.1080p.mkv")),
+        (2, entry("Dark.Waters.S01E02.720p.mkv", "<b>Dark Waters</b> Episode 2")),
+        (3, entry("Knight.Tale.mp4")),
+        (4, entry(None, "Episode 12 of the knight saga", media_type="video")),
+        (5, entry("sticker.webp", media_type="sticker")),
+        (6, entry("W1.Special.mkv"))
+    ])
+    return index
+
+
+def test_every_word_must_match(index):
+    assert index.search("dark knight") == ([1], False)
+    assert index.search("dark nothing") == ([], False)
+
+
+def test_name_matches_rank_above_captions(index):
+    results, _ = index.search("knight")
+    assert results[:2] == [3, 1]
+    assert set(results) == {1, 3, 4}
+
+
+def test_prefixes_need_min_length(index):
+    assert set(index.search("epi")[0]) == {2, 4}
+    # Too short for a prefix, only the whole word matches
+    assert index.search("w")[0] == []
+    assert index.search("w1")[0] == [6]
+
+
+def test_skipped_media_and_removal(index):
+    assert index.search("sticker")[0] == []
+    index.remove([1])
+    assert index.search("dark")[0] == [2]
+
+
+def test_results_are_capped():
+    index = SearchIndex(None)
+    index.add((message_id, entry(f"Show.E{message_id}.mkv")) for message_id in range(1, 3001))
+    results, more = index.search("mkv")
+    assert len(results) == MAX_RESULTS and more
+    # Newest first among equal scores
+    assert results[0] == 3000
+
+
+def test_re_added_message_keeps_newest_first():
+    index = SearchIndex(None)
+    last = MAX_CANDIDATES + 200
+    index.add((message_id, entry(f"Show.E{message_id}.mkv")) for message_id in range(1, last + 1))
+    # An edited old post (now a better match) is re-added at the end of the postings
+    index.add([(1, entry("Show.E1.Repack.mkv", "mkv"))])
+
+    results, more = index.search("mkv")
+    assert more
+    # Only the newest MAX_CANDIDATES matches are ranked, the old post is not one of them
+    assert 1 not in results
+    assert results[:3] == [last, last - 1, last - 2]
+
+
+def test_windows_added_out_of_order_rank_newest_first():
+    index = SearchIndex(None)
+    # Concurrent sync windows can finish newest first
+    index.add((message_id, entry(f"Show.E{message_id}.mkv")) for message_id in range(1200, 2400))
+    index.add((message_id, entry(f"Show.E{message_id}.mkv")) for message_id in range(1, 1200))
+
+    results, more = index.search("mkv")
+    assert more
+    assert results[0] == 2399
+    assert min(results) > 2399 - MAX_CANDIDATES
+
+
+def test_paged_queries_are_limited_per_user(index):
+    query_ids = [index.remember(7, f"q{n}", [1, 2, 3]) for n in range(MAX_USER_QUERIES + 2)]
+    assert index.recall(query_ids[0]) is None
+    assert index.recall(query_ids[-1]) == (f"q{MAX_USER_QUERIES + 1}", [1, 2, 3], False)
+    assert len(index._user_queries[7]) == MAX_USER_QUERIES
+
+    # Global limit also forgets the user's entry
+    for n in range(30):
+        index.remember(100 + n, "other", [1])
+    assert 7 not in index._user_queries
+    assert len(index._queries) == index.max_queries
+
+
+def test_remember_caps_results(index):
+    query_id = index.remember(7, "big", list(range(5000)), True)
+    assert len(index.recall(query_id)[1]) == MAX_RESULTS
+
+
+@pytest.fixture(scope="module")
+def corpus_index():
+    index = SearchIndex(None)
+    index.add(make_corpus(CORPUS_FILES))
+    return index
+
+
+def test_query_latency(corpus_index):
+    timings = {}
+    for query in QUERIES:
+        runs = []
+        for _ in range(5):
+            started = time.perf_counter()
+            results, _ = corpus_index.search(query)
+            runs.append((time.perf_counter() - started) * 1000)
+            assert len(results) <= MAX_RESULTS
+        timings[query] = min(runs)
+
+    slowest = max(timings, key=timings.get)
+    assert statistics.median(timings.values()) < LATENCY_BUDGET_MS, timings
+    assert timings[slowest] < 2 * LATENCY_BUDGET_MS, f"{slowest!r} took {timings[slowest]:.2f} ms"
+
+
+def test_broad_query_ranks_newest_matches(corpus_index):
+    results, more = corpus_index.search("mkv")
+    assert more and len(results) == MAX_RESULTS
+    newest = max(corpus_index._postings["mkv"])
+    assert newest in results
@@ -4,8 +4,10 @@ Helper Functions - Utilities for the bot
 
 import base64
 import asyncio
-from pyrogram.errors import FloodWait
+import secrets
+from typing import Iterable, List, Optional, Tuple
 from pyrogram.types import Message
+from config import MAX_BATCH_SIZE
 
 # ========== ENCODING/DECODING ==========
 
@@ -21,37 +23,215 @@ async def decode(base64_string):
     string_bytes = base64.urlsafe_b64decode(base64_bytes)
     return string_bytes.decode("ascii")
 
+# ========== BATCH LINK CODEC ==========
+
+# Telegram drops /start parameters longer than 64 characters
+START_PARAM_LIMIT = 64
+BATCH_PREFIX = "batch_"
+
+# Codec version (first byte of a decoded batch token)
+# 1: inline ranges - varint(gap after previous range), varint(length - 1), ...
+# 2: stored - the token is the key of an ID list in the links collection
+BATCH_CODEC_RANGES = 1
+BATCH_CODEC_STORED = 2
+
+STORED_KEY_BYTES = 8
+
+
+def _b64encode(data: bytes) -> str:
+    """base64url without padding"""
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+def _b64decode(token: str) -> bytes:
+    return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def id_ranges(message_ids: Iterable[int]) -> List[Tuple[int, int]]:
+    """Sorted, de-duplicated IDs as (first, last) runs"""
+    ranges = []
+    for message_id in sorted(set(message_ids)):
+        if ranges and message_id == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], message_id)
+        else:
+            ranges.append((message_id, message_id))
+    return ranges
+
+def ranges_to_ids(ranges: Iterable, max_ids: Optional[int] = None) -> List[int]:
+    """
+    Expand (first, last) runs back to IDs
+
+    Raises:
+        ValueError: the runs hold more than max_ids IDs (checked before expanding)
+    """
+    ranges = list(ranges)
+    if max_ids is not None:
+        total = 0
+        for first, last in ranges:
+            if last < first:
+                raise ValueError("Invalid batch range")
+            total += last - first + 1
+            if total > max_ids:
+                raise ValueError(f"Batch holds more than {max_ids} IDs")
+    return [message_id for first, last in ranges for message_id in range(first, last + 1)]
+
+def pack_batch_ids(message_ids: Iterable[int]) -> str:
+    """Encode IDs as an inline (version 1) batch token"""
+    out = bytearray([BATCH_CODEC_RANGES])
+    previous = -1
+    for first, last in id_ranges(message_ids):
+        _write_varint(out, first - previous - 1)
+        _write_varint(out, last - first)
+        previous = last
+    return _b64encode(bytes(out))
+
+def unpack_batch_token(token: str, max_ids: int = MAX_BATCH_SIZE) -> Tuple[int, Optional[List[int]]]:
+    """
+    Decode a batch token without touching the database
+
+    The ID count is checked while decoding, so a short token can't
+    expand to millions of IDs.
+
+    Returns:
+        (version, ids) - ids is None for stored (version 2) tokens
+
+    Raises:
+        ValueError: token is not a valid batch token or holds more than max_ids IDs
+    """
+    try:
+        data = _b64decode(token)
+    except Exception:
+        raise ValueError("Invalid batch token")
+    if not data:
+        raise ValueError("Empty batch token")
+
+    version = data[0]
+    if version == BATCH_CODEC_STORED:
+        return version, None
+
+    if version == BATCH_CODEC_RANGES:
+        ranges = []
+        pos, previous, total = 1, -1, 0
+        try:
+            while pos < len(data):
+                gap, pos = _read_varint(data, pos)
+                length, pos = _read_varint(data, pos)
+                total += length + 1
+                if total > max_ids:
+                    raise ValueError(f"Batch token holds more than {max_ids} IDs")
+                first = previous + 1 + gap
+                previous = first + length
+                ranges.append((first, previous))
+        except IndexError:
+            raise ValueError("Truncated batch token")
+        return version, ranges_to_ids(ranges)
+
+    # Legacy links: base64 of "1,2,3" or "first-last" (first byte is an ASCII digit)
+    text = data.decode("ascii", errors="replace")
+    if "-" in text:
+        first, last = map(int, text.split("-", 1))
+        if first < 0 or last < first:
+            raise ValueError("Invalid batch token")
+        if last - first + 1 > max_ids:
+            raise ValueError(f"Batch token holds more than {max_ids} IDs")
+        return 0, list(range(first, last + 1))
+    if text.count(",") >= max_ids:
+        raise ValueError(f"Batch token holds more than {max_ids} IDs")
+    ids = [int(x) for x in text.split(",") if x.isdigit()]
+    if not ids:
+        raise ValueError("Invalid batch token")
+    return 0, ids
+
+async def encode_batch_link(db, message_ids: Iterable[int]) -> Optional[str]:
+    """
+    Build the start parameter for a batch of message IDs
+
+    Inline tokens are used while "batch_<token>" fits in START_PARAM_LIMIT,
+    larger batches are stored in the links collection and get a short key.
+    """
+    message_ids = list(message_ids)
+    token = pack_batch_ids(message_ids)
+    if len(BATCH_PREFIX) + len(token) <= START_PARAM_LIMIT:
+        return BATCH_PREFIX + token
+
+    ranges = [list(run) for run in id_ranges(message_ids)]
+    for _ in range(3):
+        token = _b64encode(bytes([BATCH_CODEC_STORED]) + secrets.token_bytes(STORED_KEY_BYTES))
+        if await db.save_link(token, "batch", ranges):
+            return BATCH_PREFIX + token
+    return None
+
+async def decode_batch_link(db, token: str) -> List[int]:
+    """
+    Message IDs of a batch token (inline, stored or legacy base64)
+
+    Returns:
+        [] if the token is invalid, holds more than MAX_BATCH_SIZE IDs
+        or the stored link is gone
+    """
+    try:
+        version, ids = unpack_batch_token(token)
+    except ValueError:
+        return []
+    if ids is not None:
+        return ids
+
+    link = await db.get_link(token)
+    if not link:
+        return []
+    try:
+        return ranges_to_ids(link.get("ranges", []), max_ids=MAX_BATCH_SIZE)
+    except ValueError:
+        return []
+
 # ========== MESSAGE FETCHING ==========
 
-async def get_messages(client, message_ids):
-    """Fetch messages from database channel"""
+async def get_messages(client, message_ids, concurrency: int = 1):
+    """
+    Fetch messages from database channel
+    
+    200 IDs per request, up to `concurrency` requests at a time.
+    Messages come back in the order of message_ids (failed chunks are skipped).
+    """
     # FIXED: Get db_channel from client, not from bot import
-    if not hasattr(client, 'db_channel'):
+    if not getattr(client, 'db_channel', None):
         return []
     
-    messages = []
-    total = len(message_ids)
+    # db_channel is a chat ID (or a Chat on older setups)
+    chat_id = getattr(client.db_channel, "id", client.db_channel)
+    message_ids = list(message_ids)
+    chunks = [message_ids[i:i + 200] for i in range(0, len(message_ids), 200)]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
     
-    while len(message_ids) > 0:
-        temp_ids = message_ids[:200]
-        message_ids = message_ids[200:]
-        
-        try:
-            msgs = await client.get_messages(
-                chat_id=client.db_channel.id,
-                message_ids=temp_ids
-            )
-            messages.extend(msgs)
-        except FloodWait as e:
-            await asyncio.sleep(e.value)
-            msgs = await client.get_messages(
-                chat_id=client.db_channel.id,
-                message_ids=temp_ids
-            )
-            messages.extend(msgs)
-        except Exception as e:
-            print(f"Error fetching messages: {e}")
-            continue
+    async def fetch(temp_ids):
+        async with semaphore:
+            try:
+                # FloodWait is retried by the client's outbound governor
+                return await client.get_messages(
+                    chat_id=chat_id,
+                    message_ids=temp_ids
+                )
+            except Exception as e:
+                print(f"Error fetching messages: {e}")
+                return []
+    
+    messages = []
+    for msgs in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+        messages.extend(msgs)
     
     return messages
 
@@ -80,23 +260,38 @@ async def delete_files(messages, client, notification_msg, link):
 
 # ========== FORCE SUBSCRIBE CHECK ==========
 
-async def is_subscribed(client, user_id, channel_ids):
-    """Check if user is subscribed to all channels"""
+def get_channel_ids(channels):
+    """Channel IDs from a list of IDs or force-sub channel documents"""
+    channel_ids = []
+    for channel in channels or []:
+        channel_id = channel.get("channel_id") if isinstance(channel, dict) else channel
+        if channel_id:
+            channel_ids.append(channel_id)
+    return channel_ids
+
+async def get_subscription_statuses(client, user_id, channels):
+    """Get {channel_id: is_member} for every channel (cached, misses checked concurrently)"""
+    channel_ids = get_channel_ids(channels)
     if not channel_ids:
-        return True
+        return {}
+    
+    membership = getattr(client, "membership", None)
+    if membership:
+        return await membership.check(user_id, channel_ids)
     
-    for channel_id in channel_ids:
-        if not channel_id or channel_id == 0:
-            continue
-            
+    async def check(channel_id):
         try:
             member = await client.get_chat_member(channel_id, user_id)
-            if member.status in ["kicked", "left"]:
-                return False
+            return getattr(member.status, "value", member.status) not in ("kicked", "left", "banned")
         except:
             return False
     
-    return True
+    return dict(zip(channel_ids, await asyncio.gather(*(check(channel_id) for channel_id in channel_ids))))
+
+async def is_subscribed(client, user_id, channel_ids):
+    """Check if user is subscribed to all channels"""
+    statuses = await get_subscription_statuses(client, user_id, channel_ids)
+    return all(statuses.values())
 
 # ========== FILE SIZE FORMATTER ==========
 